@@ -75,6 +75,7 @@ let translations = {};
 let currentLang = '';
 
 const STORAGE_KEY = 'homeVideoDB.progress';
+const PROGRESS_SYNC_DELAY = 15000;
 const HERO_ROTATE_INTERVAL = 3000;
 const HERO_TRANSITION_DURATION = 800;
 const HERO_TRANSITION_HALF = HERO_TRANSITION_DURATION / 2;
@@ -102,6 +103,7 @@ let subtitleTracks = new Map();
 let subtitlePreference = loadSubtitlePreference();
 let currentVideo = null;
 let progress = loadProgress();
+let progressSyncTimer = null;
 let libraryData = { videos: [], unmatched: [], lastScan: null };
 let manualActiveId = null;
 let isRescanning = false;
@@ -137,6 +139,7 @@ async function init() {
     updateDownloadToggleVisibility();
     await loadLibrary();
     await loadStorageInfo();
+    syncProgress();
     if (isFeatureEnabled('torrentSearch')) {
         try {
             await refreshDownloadStatus(true);
@@ -1052,6 +1055,30 @@ function saveProgress(data) {
     } catch (error) {
         console.warn('İzleme geçmişi kaydedilemedi', error);
     }
+    scheduleProgressSync();
+}
+
+// Sunucu ilerlemeyi data/progress.json'a yazar; altyazı zamanlayıcısı izlenen videoları öne alır
+function syncProgress({ beacon = false } = {}) {
+    const body = JSON.stringify({ progress });
+    if (beacon && navigator.sendBeacon) {
+        navigator.sendBeacon('/api/progress', new Blob([body], { type: 'application/json' }));
+        return;
+    }
+    fetch('/api/progress', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body
+    }).catch(error => console.warn('İzleme geçmişi sunucuya gönderilemedi', error));
+}
+
+// timeupdate saniyede birkaç kez tetiklenir; sunucuya en fazla PROGRESS_SYNC_DELAY'de bir gönderilir
+function scheduleProgressSync() {
+    if (progressSyncTimer) return;
+    progressSyncTimer = setTimeout(() => {
+        progressSyncTimer = null;
+        syncProgress();
+    }, PROGRESS_SYNC_DELAY);
 }
 
 function formatTime(seconds) {
@@ -1258,6 +1285,13 @@ async function requestRescan(force = false) {
 }
 
 function attachEvents() {
+    // Sekme kapanırken bekleyen ilerleme sunucuya iletilsin
+    window.addEventListener('pagehide', () => {
+        if (!progressSyncTimer) return;
+        clearTimeout(progressSyncTimer);
+        progressSyncTimer = null;
+        syncProgress({ beacon: true });
+    });
     modalClose.addEventListener('click', closeModal);
     modal.addEventListener('click', (event) => {
         if (event.target === modal || event.target.classList.contains('modal-backdrop')) {
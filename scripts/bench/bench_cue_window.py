@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İpucu indeksi (.cues sidecar) ile zaman aralığı okuma hızı ölçümü.
+
+Sentetik, uzun WebVTT dosyaları üretilip sidecar'ları yazılır; rastgele aralıklar için
+read_cue_window, dosyanın tamamını okuyup ipuçlarını süzen basit yaklaşımla karşılaştırılır
+ve iki sonucun aynı ipuçlarını içerdiği doğrulanır.
+
+    python3 scripts/bench/bench_cue_window.py
+    python3 scripts/bench/bench_cue_window.py --cues 2000 50000 --windows 500 --json
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from typing import Dict, List, Set
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ta_downloader  # noqa: E402
+
+WINDOW_MS = 5 * 60 * 1000
+_CUE_START_RE = re.compile(r"^(\S+) -->", re.M)
+
+
+def synthetic_vtt(cues: int) -> bytes:
+    """Kimlik satırlı, ara sıra üst üste binen ipuçlarından oluşan bir WebVTT üretir."""
+    lines = ["WEBVTT", "", "NOTE sentetik", ""]
+    for i in range(cues):
+        start = 30000 + i * 2500
+        end = start + (6000 if i % 7 == 0 else 2200)
+        lines += [str(i + 1), f"{ta_downloader._vtt_time(start)} --> {ta_downloader._vtt_time(end)}",
+                  f"Satır {i}", ""]
+    return "\n".join(lines).encode("utf-8")
+
+
+def window_full(path: str, start_ms: int, end_ms: int) -> Set[str]:
+    """Karşılaştırma: tüm dosyayı okuyup aralıkla kesişen ipuçlarını seçer."""
+    with open(path, "rb") as f:
+        data = f.read()
+    starts = set()
+    for cue_start, cue_end, _ in ta_downloader._vtt_cues(data.decode("utf-8").split("\n")):
+        if cue_end > start_ms and cue_start < end_ms:
+            starts.add(ta_downloader._vtt_time(cue_start))
+    return starts
+
+
+def window_indexed(path: str, start_ms: int, end_ms: int) -> Set[str]:
+    chunk = ta_downloader.read_cue_window(path, start_ms, end_ms)
+    if chunk is None:
+        raise SystemExit(f"Sidecar okunamadı: {path}")
+    # Dilim, aralıktan önce biten birkaç ipucu içerebilir (bitişlerin kümülatif en büyüğü)
+    return set(_CUE_START_RE.findall(chunk.decode("utf-8")))
+
+
+def run(sizes: List[int], windows: int, seed: int) -> List[Dict[str, object]]:
+    rng = random.Random(seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for cues in sizes:
+            path = os.path.join(tmp, f"{cues}.vtt")
+            data = synthetic_vtt(cues)
+            with open(path, "wb") as f:
+                f.write(data)
+            build_start = time.perf_counter()
+            ta_downloader.write_cue_index(path, data)
+            build_s = time.perf_counter() - build_start
+
+            last_ms = 30000 + cues * 2500
+            ranges = [(s, s + WINDOW_MS) for s in (rng.randrange(0, last_ms) for _ in range(windows))]
+            for start_ms, end_ms in ranges[:50]:
+                if not window_full(path, start_ms, end_ms) <= window_indexed(path, start_ms, end_ms):
+                    raise SystemExit(f"Eksik ipucu: {cues} ipucu, {start_ms}-{end_ms} ms")
+
+            timings = {}
+            for name, func in (("indexed", window_indexed), ("full", window_full)):
+                begin = time.perf_counter()
+                for start_ms, end_ms in ranges:
+                    func(path, start_ms, end_ms)
+                timings[name] = (time.perf_counter() - begin) / len(ranges)
+            results.append({
+                "cues": cues,
+                "bytes": len(data),
+                "sidecar_bytes": os.path.getsize(path + ta_downloader.CUE_INDEX_SUFFIX),
+                "build_ms": round(build_s * 1000, 2),
+                "indexed_ms": round(timings["indexed"] * 1000, 3),
+                "full_ms": round(timings["full"] * 1000, 3),
+                "speedup": round(timings["full"] / timings["indexed"], 1),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İpucu indeksi ile zaman aralığı okuma hız ölçümü")
+    parser.add_argument("--cues", type=int, nargs="*", default=[1000, 5000, 20000], help="Dosya başına ipucu sayıları")
+    parser.add_argument("--windows", type=int, default=200, help="Boyut başına okunacak aralık sayısı")
+    parser.add_argument("--seed", type=int, default=1, help="Rastgele aralıklar için tohum")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args()
+
+    results = run(args.cues, args.windows, args.seed)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'ipucu':>8}{'KB':>8}{'cues KB':>9}{'kurma ms':>10}{'indeks ms':>11}{'tam ms':>9}{'hız':>8}")
+    for row in results:
+        print(f"{row['cues']:>8}{row['bytes'] // 1024:>8}{row['sidecar_bytes'] // 1024:>9}{row['build_ms']:>10}"
+              f"{row['indexed_ms']:>11}{row['full_ms']:>9}{row['speedup']:>7}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+parse_Subs / parse_download_forms / parse_candidates için ayrıştırma hızı ölçümü.
+
+Her sayfa önce iki yöntemle (fast, bs4) ayrıştırılıp çıktıların aynı olduğu doğrulanır,
+ardından her yöntem için sayfa/s ve MB/s raporlanır.
+
+    python3 scripts/bench/bench_parsers.py
+    python3 scripts/bench/bench_parsers.py --pages kayitli_arama.html --repeat 50 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ta_downloader  # noqa: E402
+from fixtures import FIXTURES, load_fixture  # noqa: E402
+
+PARSERS = ["parse_Subs", "parse_download_forms", "parse_candidates"]
+
+
+def _pick_parsers(name: str, html: str) -> List[str]:
+    # Arama sayfaları satırlar, altyazı sayfaları formlar için ölçülür
+    if "altsonsez" in html and "search" in name:
+        return ["parse_Subs"]
+    if 'action="/ind"' in html:
+        return ["parse_download_forms", "parse_candidates"]
+    return PARSERS
+
+
+def measure(func: Callable[[str], object], html: str, repeat: int) -> float:
+    """En iyi tekrarın süresini (saniye) döndürür."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(pages: List[Tuple[str, str]], repeat: int) -> List[Dict[str, object]]:
+    results = []
+    for name, html in pages:
+        size_mb = len(html.encode("utf-8")) / (1024 * 1024)
+        for parser_name in _pick_parsers(name, html):
+            fast = getattr(ta_downloader, parser_name + "_fast")
+            reference = getattr(ta_downloader, parser_name + "_bs4")
+            if fast(html) != reference(html):
+                raise SystemExit(f"Çıktılar farklı: {parser_name} / {name}")
+            row: Dict[str, object] = {"page": name, "parser": parser_name, "bytes": len(html.encode("utf-8"))}
+            for backend, func in (("fast", fast), ("bs4", reference)):
+                seconds = measure(func, html, repeat)
+                row[backend] = {
+                    "ms": round(seconds * 1000, 3),
+                    "pages_per_s": round(1 / seconds, 1),
+                    "mb_per_s": round(size_mb / seconds, 2),
+                }
+            row["speedup"] = round(row["bs4"]["ms"] / row["fast"]["ms"], 2)  # type: ignore[index]
+            results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML ayrıştırma hız ölçümü")
+    parser.add_argument("--pages", nargs="*", help="Ölçülecek kayıtlı HTML sayfaları (varsayılan: fixtures/)")
+    parser.add_argument("--repeat", type=int, default=20, help="Sayfa başına tekrar sayısı")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = [(name, load_fixture(name)) for name in FIXTURES if name.endswith(".html")]
+
+    results = run(pages, args.repeat)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'sayfa':<22}{'ayrıştırıcı':<24}{'fast ms':>10}{'bs4 ms':>10}{'fast MB/s':>11}{'hız':>7}")
+    for row in results:
+        print(f"{row['page']:<22}{row['parser']:<24}{row['fast']['ms']:>10}{row['bs4']['ms']:>10}"
+              f"{row['fast']['mb_per_s']:>11}{row['speedup']:>6}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ta_downloader için çevrimdışı uçtan uca benchmark.
+
+Yerel taklit sunucuya (standin.py) karşı gerçek
+search_query → parse_Subs → process_most_downloaded_subtitles →
+download_from_page_results → extract_and_cleanup_archives zincirini çalıştırır;
+aşama başına p50/p95 gecikme, eşzamanlılık altında sorgu/s ve en yüksek RSS raporlanır.
+
+    python3 scripts/bench/bench_pipeline.py --queries 200 --workers 8 --latency-ms 40 --error-rate 0.02
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ta_downloader  # noqa: E402
+from standin import StandInConfig, start_standin  # noqa: E402
+
+STAGES = ["search", "parse", "select", "pages", "download", "extract"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_pipeline(session, query: str, out_dir: str, timings: Dict[str, List[float]], lock: threading.Lock) -> bool:
+    """Bir sorguyu aşama aşama çalıştırır; en az bir altyazı çıkarıldıysa True döner."""
+    local: Dict[str, float] = {}
+
+    def timed(stage, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            local[stage] = time.perf_counter() - start
+
+    try:
+        html = timed("search", ta_downloader.search_query, session, query)
+        candidates = timed("parse", ta_downloader.parse_Subs, html)
+        if not candidates:
+            return False
+        most_downloaded = timed("select", ta_downloader.get_Most_Downloaded_Subtitle, candidates)
+        pages = timed("pages", ta_downloader.process_most_downloaded_subtitles, session, most_downloaded)
+        downloads = timed("download", ta_downloader.download_from_page_results, session, pages)
+        archives = {lang: entry["file"] for lang, entry in downloads.items()}
+        extracted = timed("extract", ta_downloader.extract_subtitle_archives, archives, query, out_dir)
+        return any(extracted.values())
+    finally:
+        with lock:
+            for stage, seconds in local.items():
+                timings[stage].append(seconds)
+
+
+def run(args) -> Dict[str, object]:
+    config = StandInConfig(args.latency_ms, args.jitter_ms, args.error_rate,
+                           search_fixture=args.search_fixture, seed=args.seed)
+    server = start_standin(config)
+    host, port = server.server_address[:2]
+    ta_downloader.BASE = f"http://{host}:{port}"
+    ta_downloader.PARSER_BACKEND = args.parser
+
+    session = ta_downloader.build_session(pool_size=max(10, args.workers))
+    work_dir = tempfile.mkdtemp(prefix="ta-bench-")
+    timings: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    totals: List[float] = []
+    outcomes = {"ok": 0, "empty": 0, "error": 0}
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        query = f"film {i}" if (args.miss_every <= 0 or i % args.miss_every) else f"yok {i}"
+        start = time.perf_counter()
+        try:
+            ok = run_pipeline(session, query, os.path.join(work_dir, str(i)), timings, lock)
+            key = "ok" if ok else "empty"
+        except Exception:
+            key = "error"
+        with lock:
+            totals.append(time.perf_counter() - start)
+            outcomes[key] += 1
+
+    started = time.perf_counter()
+    try:
+        # Aşama fonksiyonlarının ilerleme çıktıları ölçümü kirletmesin
+        with contextlib.redirect_stdout(io.StringIO()):
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                list(pool.map(one, range(args.queries)))
+    finally:
+        elapsed = time.perf_counter() - started
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "queries": args.queries,
+        "workers": args.workers,
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "parser": args.parser,
+        "wall_s": round(elapsed, 3),
+        "qps": round(args.queries / elapsed, 2) if elapsed else 0.0,
+        "outcomes": outcomes,
+        "stages_ms": {
+            stage: {
+                "p50": round(percentile(values, 50) * 1000, 2),
+                "p95": round(percentile(values, 95) * 1000, 2),
+                "n": len(values),
+            }
+            for stage, values in list(timings.items()) + [("total", totals)]
+        },
+        "requests": dict(config.requests),
+        # Linux'ta ru_maxrss KB cinsindendir
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ta_downloader çevrimdışı uçtan uca benchmark")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Taklit sunucunun istek başına gecikmesi")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Taklit sunucunun hata oranı (0-1)")
+    parser.add_argument("--miss-every", type=int, default=10, help="Her N. sorgu sonuçsuz arama olsun (0: hiç)")
+    parser.add_argument("--search-fixture", default="search_small.html")
+    parser.add_argument("--parser", choices=["fast", "bs4"], default="fast")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Sonucu JSON olarak yazdır")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{report['queries']} sorgu, {report['workers']} iş parçacığı, {report['wall_s']} s → {report['qps']} sorgu/s")
+    print(f"Sonuçlar: {report['outcomes']}  İstekler: {report['requests']}  En yüksek RSS: {report['peak_rss_mb']} MB")
+    print(f"{'aşama':<10}{'p50 ms':>10}{'p95 ms':>10}{'n':>7}")
+    for stage, stats in report["stages_ms"].items():  # type: ignore[union-attr]
+        print(f"{stage:<10}{stats['p50']:>10}{stats['p95']:>10}{stats['n']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cue_times / fit_timing / retime (numpy) için zamanlama düzeltme hızı ölçümü.
+
+Sentetik WebVTT dosyaları (23.976 ↔ 25 fps kayması olan) üretilir; her biri süreye göre
+puanlanıp yeniden zamanlanır. Çıktı, ipucu başına re.sub yapan basit bir Python döngüsüyle
+karşılaştırılıp aynı olduğu doğrulanır. numpy yoksa ölçüm atlanır.
+
+    python3 scripts/bench/bench_retime.py
+    python3 scripts/bench/bench_retime.py --cues 1000 5000 --repeat 20 --json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ta_downloader  # noqa: E402
+
+RUNTIME_MINUTES = 120
+_TIME_RE = re.compile(r"(?:(\d+):)?(\d{2}):(\d{2})\.(\d{3})")
+
+
+def synthetic_vtt(cues: int, runtime_ms: float, drift: float) -> bytes:
+    """Süreyi yaklaşık %97 kaplayan, drift oranıyla kaymış cues ipuçlu bir WebVTT üretir."""
+    lines = ["WEBVTT", ""]
+    span = runtime_ms * 0.97 * drift
+    for i in range(cues):
+        start = 45000 + int(i * span / cues)
+        lines += [f"{ta_downloader._vtt_time(start)} --> {ta_downloader._vtt_time(start + 1800)} align:start",
+                  f"Satır {i}", ""]
+    return "\n".join(lines).encode("utf-8")
+
+
+def retime_loop(data: bytes, ratio: float, offset_ms: int) -> bytes:
+    """Karşılaştırma için ipucu başına çalışan saf Python sürümü."""
+    def shift(m: "re.Match[str]") -> str:
+        hours, minutes, seconds, millis = (int(g or 0) for g in m.groups())
+        ms = ((hours * 60 + minutes) * 60 + seconds) * 1000 + millis
+        return ta_downloader._vtt_time(max(int(round(ms * ratio)) + offset_ms, 0))
+
+    lines = data.decode("utf-8").split("\n")
+    for i, line in enumerate(lines):
+        if "-->" in line:
+            lines[i] = _TIME_RE.sub(shift, line, count=2)
+    return "\n".join(lines).encode("utf-8")
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """En iyi tekrarın süresini (saniye) döndürür."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes: List[int], repeat: int) -> List[Dict[str, object]]:
+    runtime_ms = RUNTIME_MINUTES * 60 * 1000
+    results = []
+    for cues in sizes:
+        data = synthetic_vtt(cues, runtime_ms, 25 / 23.976)
+        times = ta_downloader.cue_times(data)
+        fit = ta_downloader.fit_timing(*times, runtime_ms)
+        fast = ta_downloader.retime(data, fit["ratio"], fit["offsetMs"], times)  # type: ignore[arg-type]
+        if fast != retime_loop(data, fit["ratio"], fit["offsetMs"]):  # type: ignore[arg-type]
+            raise SystemExit(f"Çıktılar farklı: {cues} ipucu")
+
+        def full() -> bytes:
+            cue_data = ta_downloader.cue_times(data)
+            timing = ta_downloader.fit_timing(*cue_data, runtime_ms)
+            return ta_downloader.retime(data, timing["ratio"], timing["offsetMs"], cue_data)  # type: ignore[arg-type]
+
+        numpy_s = measure(full, repeat)
+        loop_s = measure(lambda: retime_loop(data, fit["ratio"], fit["offsetMs"]), repeat)  # type: ignore[arg-type]
+        results.append({
+            "cues": cues,
+            "bytes": len(data),
+            "ratio": round(fit["ratio"], 5),  # type: ignore[arg-type]
+            "score": fit["score"],
+            "numpy_ms": round(numpy_s * 1000, 3),
+            "loop_ms": round(loop_s * 1000, 3),
+            "speedup": round(loop_s / numpy_s, 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Altyazı zamanlama düzeltme hız ölçümü")
+    parser.add_argument("--cues", type=int, nargs="*", default=[500, 2000, 8000], help="Dosya başına ipucu sayıları")
+    parser.add_argument("--repeat", type=int, default=10, help="Boyut başına tekrar sayısı")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args()
+
+    if not ta_downloader.timing_available():
+        print("numpy yüklü değil; ölçüm atlandı (pip install numpy)")
+        return
+
+    results = run(args.cues, args.repeat)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'ipucu':>8}{'KB':>8}{'oran':>10}{'puan':>7}{'numpy ms':>10}{'döngü ms':>10}{'hız':>7}")
+    for row in results:
+        print(f"{row['cues']:>8}{row['bytes'] // 1024:>8}{row['ratio']:>10}{row['score']:>7}"
+              f"{row['numpy_ms']:>10}{row['loop_ms']:>10}{row['speedup']:>6}x")
+
+
+if __name__ == "__main__":
+    main()
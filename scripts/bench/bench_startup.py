@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ta_downloader açılış (cold start) süresi ölçümü ve bütçe kontrolü.
+
+Her ölçüm yeni bir yorumlayıcıda yapılır:
+  - baseline: boş yorumlayıcı (python -c pass)
+  - help:     python scripts/ta_downloader.py --help  (requests/bs4 yüklenmemeli)
+  - import:   -X importtime ile ta_downloader modülünün toplam içe aktarma süresi
+  - query:    yerel taklit sunucuya karşı tek sorguluk tam çalıştırma (önbelleksiz, indekssiz)
+
+help ve query süreleri baseline düşülerek bütçeyle karşılaştırılır; aşılırsa veya --help
+requests/bs4'ü yüklerse çıkış kodu 1'dir.
+
+    python3 scripts/bench/bench_startup.py
+    python3 scripts/bench/bench_startup.py --runs 9 --query-budget-ms 250 --json
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(BENCH_DIR, "..")
+SCRIPT = os.path.join(SCRIPTS_DIR, "ta_downloader.py")
+sys.path.insert(0, BENCH_DIR)
+
+from standin import StandInConfig, start_standin  # noqa: E402
+
+# --help yolunda yüklenmemesi gereken modüller
+HEAVY_MODULES = ("requests", "bs4", "urllib3", "sqlite3")
+_IMPORTTIME_RE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+
+QUERY_SNIPPET = """
+import sys
+sys.path.insert(0, {scripts!r})
+import ta_downloader
+ta_downloader.BASE = {base!r}
+sys.argv = ["ta_downloader.py", "-q", "film 1", "-o", {out!r}, "--no-cache", "--no-index", "--delay", "0"]
+ta_downloader.main()
+"""
+
+
+def timed_run(args: List[str]) -> float:
+    start = time.perf_counter()
+    proc = subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise SystemExit(f"Komut başarısız ({proc.returncode}): {' '.join(args[:4])}")
+    return elapsed
+
+
+def median_ms(args: List[str], runs: int) -> float:
+    return round(statistics.median(timed_run(args) for _ in range(runs)) * 1000, 2)
+
+
+def importtime(args: List[str]) -> Dict[str, int]:
+    """-X importtime çıktısından üst düzey modüllerin toplam sürelerini (µs) döndürür."""
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + args,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if m:
+            modules[m.group(4)] = max(modules.get(m.group(4), 0), int(m.group(2)))
+    return modules
+
+
+def run(args) -> Dict[str, object]:
+    python = sys.executable
+    baseline = median_ms([python, "-c", "pass"], args.runs)
+    help_ms = median_ms([python, SCRIPT, "--help"], args.runs)
+
+    help_modules = importtime([SCRIPT, "--help"])
+    leaked = [name for name in HEAVY_MODULES if name in help_modules]
+    import_modules = importtime(["-c", f"import sys; sys.path.insert(0, {SCRIPTS_DIR!r}); import ta_downloader"])
+    import_ms = round(import_modules.get("ta_downloader", 0) / 1000, 2)
+
+    server = start_standin(StandInConfig(latency_ms=0, jitter_ms=0, error_rate=0.0))
+    host, port = server.server_address[:2]
+    work_dir = tempfile.mkdtemp(prefix="ta-startup-")
+    try:
+        snippet = QUERY_SNIPPET.format(scripts=SCRIPTS_DIR, base=f"http://{host}:{port}", out=work_dir)
+        query_ms = median_ms([python, "-c", snippet], args.runs)
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    checks = {
+        "help": {"ms": help_ms, "overMs": round(help_ms - baseline, 2), "budgetMs": args.help_budget_ms},
+        "query": {"ms": query_ms, "overMs": round(query_ms - baseline, 2), "budgetMs": args.query_budget_ms},
+    }
+    failures = [f"{name}: {check['overMs']} ms > {check['budgetMs']} ms"
+                for name, check in checks.items() if check["overMs"] > check["budgetMs"]]
+    if leaked:
+        failures.append(f"--help şu modülleri yükledi: {', '.join(leaked)}")
+    return {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "baseline_ms": baseline,
+        "import_ms": import_ms,
+        "checks": checks,
+        "help_heavy_modules": leaked,
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ta_downloader açılış süresi benchmark'ı")
+    parser.add_argument("--runs", type=int, default=5, help="Her ölçüm için yorumlayıcı başlatma sayısı (medyan alınır)")
+    parser.add_argument("--help-budget-ms", type=float, default=120.0,
+                        help="--help için boş yorumlayıcının üstüne izin verilen süre")
+    parser.add_argument("--query-budget-ms", type=float, default=300.0,
+                        help="Tek sorguluk çalıştırma için boş yorumlayıcının üstüne izin verilen süre")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yaz")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"Python {result['python']}, {result['runs']} çalıştırmanın medyanı")
+        print(f"{'ölçüm':<10}{'ms':>10}{'+baseline':>12}{'bütçe':>10}")
+        print(f"{'baseline':<10}{result['baseline_ms']:>10}")
+        print(f"{'import':<10}{result['import_ms']:>10}")
+        for name, check in result["checks"].items():  # type: ignore[union-attr]
+            print(f"{name:<10}{check['ms']:>10}{check['overMs']:>12}{check['budgetMs']:>10}")
+        for failure in result["failures"]:  # type: ignore[union-attr]
+            print(f"✗ {failure}")
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
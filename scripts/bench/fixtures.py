@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+turkcealtyazi.org sayfalarının yapısını taklit eden benchmark sayfaları.
+
+Kayıtlı sayfalar scripts/bench/fixtures/ altındadır; yeniden üretmek için:
+    python3 scripts/bench/fixtures.py --write
+"""
+
+import argparse
+import io
+import os
+import random
+import zipfile
+from typing import List
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_TITLES = [
+    "Avengers: Endgame", "Kış Uykusu", "The Matrix", "Babam ve Oğlum", "Dune: Part Two",
+    "Ahlat Ağacı", "Interstellar", "G.O.R.A.", "Parasite", "Bir Zamanlar Anadolu'da",
+]
+_RIPS = ["BluRay", "WEB-DL", "WEBRip", "HDTV", "DVDRip", "BRRip"]
+_TRANSLATORS = ["çevirmen", "altyazıcı", "sub_team", "İlker", "Gülşah", "mert_34"]
+
+_PAGE_HEAD = """<!DOCTYPE html>
+<html lang="tr"><head><meta charset="utf-8"><title>{title} - Türkçe Altyazı</title>
+<link rel="stylesheet" href="/css/site.css">
+<script type="text/javascript">var sayfa = {{"tip": "{kind}", "satir": "<div class='altsonsez'>"}};</script>
+<style>.altsonsez1 {{ background: #eee; }}</style>
+</head><body>
+<div id="ust"><div class="menu"><ul>{menu}</ul></div>
+<form action="/find.php" method="get"><input type="hidden" name="cat" value="sub"><input name="find" value=""></form></div>
+<!-- içerik başlıyor -->
+<div id="icerik">
+"""
+_PAGE_FOOT = """</div>
+<div id="alt"><p>&copy; turkcealtyazi &ndash; t&uuml;m haklar&#305; sakl&#305;d&#305;r</p></div>
+<script>(function(){{ var x = "</div>"; }})();</script>
+</body></html>
+"""
+
+
+def _menu(rng: random.Random) -> str:
+    return "".join(f'<li><a href="/kategori/{i}.html">Kategori {i}</a></li>' for i in range(rng.randint(8, 16)))
+
+
+def search_page(rows: int, seed: int = 1) -> str:
+    """rows adet altsonsez satırı içeren bir find.php sonuç sayfası üretir."""
+    rng = random.Random(seed)
+    parts: List[str] = [_PAGE_HEAD.format(title="Arama", kind="arama", menu=_menu(rng))]
+    parts.append('<div class="altbaslik"><h1>Arama sonuçları</h1></div>\n')
+    for i in range(rows):
+        altid = 700000 + seed * 1000 + i
+        title = rng.choice(_TITLES)
+        slug = title.lower().replace(" ", "-").replace(":", "")
+        flag = rng.choice(["flagtr", "flagtr", "flagen"])
+        translators = " &amp; ".join(
+            f'<a href="/profil/{t}">{t}</a>' for t in rng.sample(_TRANSLATORS, rng.randint(0, 2))
+        )
+        downloads = f"{rng.randint(0, 250000):,}".replace(",", rng.choice([",", "."]))
+        parts.append(
+            f'<div class="altsonsez{1 + i % 2}">\n'
+            f'  <div class="fl"><span class="{flag}" title="dil"></span></div>\n'
+            f'  <div class="ripdiv"><a href="/sub/{altid}/{slug}.html" title="{title} altyazı">'
+            f'<strong>{title}</strong> ({rng.randint(1970, 2024)})</a><br>'
+            f'<span class="alsezon">{rng.choice(_RIPS)}</span></div>\n'
+            f'  <div class="alcevirmen">{translators}</div>\n'
+            f'  <div class="alindirme">{downloads}</div>\n'
+            f'  <div class="altarih">{rng.randint(1, 28)}.{rng.randint(1, 12)}.20{rng.randint(10, 24)}</div>\n'
+            f'  <!-- satır {i} -->\n'
+            f'</div>\n'
+        )
+    parts.append(_PAGE_FOOT.format())
+    return "".join(parts)
+
+
+def subtitle_page(altid: int, seed: int = 1) -> str:
+    """Tek bir /ind indirme formu içeren altyazı sayfası üretir."""
+    rng = random.Random(seed)
+    parts: List[str] = [_PAGE_HEAD.format(title="Altyazı", kind="altyazi", menu=_menu(rng))]
+    parts.append(f'<div class="altyazi-bilgi"><h3>Altyazı #{altid}</h3>')
+    parts.append("".join(f"<p>Açıklama satırı {i} &mdash; {rng.choice(_TITLES)}</p>" for i in range(30)))
+    parts.append(
+        f'<div class="indirme"><form action="/ind" method="post">'
+        f'<input type="hidden" name="idid" value="{altid + 189}">'
+        f'<input type="hidden" name="altid" value="{altid}">'
+        f'<input type="hidden" name="sidid" value="{rng.getrandbits(128):032x}">'
+        f'<button type="submit"><b>İndir</b></button></form></div></div>\n'
+    )
+    parts.append(_PAGE_FOOT.format())
+    return "".join(parts)
+
+
+def srt_text(cues: int, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    lines = ["Merhaba, nasılsın?", "Şöyle bir şey düşündüm.", "Ağır ol, İstanbul'a gidiyoruz!", "Çok güzel.", "Hayır..."]
+    blocks = []
+    start = 1000
+    for i in range(1, cues + 1):
+        end = start + rng.randint(800, 4000)
+        blocks.append(f"{i}\r\n{_srt_time(start)} --> {_srt_time(end)}\r\n{rng.choice(lines)}\r\n")
+        start = end + rng.randint(100, 3000)
+    return "\r\n".join(blocks)
+
+
+def _srt_time(ms: int) -> str:
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+
+
+def subtitle_archive(cues: int = 900, seed: int = 1) -> bytes:
+    """/ind yanıtı gibi: Windows-1254 kodlu bir .srt ve bir readme içeren ZIP."""
+    buffer = io.BytesIO()
+    members = [
+        ("Film.2019.1080p.BluRay.srt", srt_text(cues, seed).encode("cp1254")),
+        ("okubeni.txt", "turkcealtyazi.org".encode("cp1254")),
+    ]
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            # Sabit tarih: fixture dosyası her üretimde aynı kalsın
+            archive.writestr(zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0)), data, zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+
+FIXTURES = {
+    "search_small.html": lambda: search_page(12, seed=1),
+    "search_large.html": lambda: search_page(400, seed=2),
+    "subtitle_page.html": lambda: subtitle_page(735846, seed=3),
+    "subtitle.zip": lambda: subtitle_archive(),
+}
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def load_fixture_bytes(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def write_fixtures(directory: str = FIXTURES_DIR) -> None:
+    os.makedirs(directory, exist_ok=True)
+    for name, build in FIXTURES.items():
+        content = build()
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(content)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fixture sayfalarını üretir")
+    parser.add_argument("--write", action="store_true", help="Sayfaları fixtures/ klasörüne yaz")
+    parser.add_argument("--dir", default=FIXTURES_DIR, help="Hedef klasör")
+    args = parser.parse_args()
+    if args.write:
+        write_fixtures(args.dir)
+        print(f"Fixture sayfaları yazıldı: {args.dir}")
+    else:
+        parser.print_help()
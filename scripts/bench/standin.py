@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+turkcealtyazi.org için yerel HTTP taklidi: find.php, /sub/<id>/... ve /ind uçlarını kayıtlı
+fixture sayfalarıyla yanıtlar. Gecikme ve hata enjeksiyonu ayarlanabilir.
+
+    python3 scripts/bench/standin.py --port 8765 --latency-ms 80 --error-rate 0.05
+"""
+
+import argparse
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from fixtures import load_fixture, load_fixture_bytes
+
+
+class StandInConfig:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, search_fixture: str = "search_small.html",
+                 miss_marker: str = "yok", seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.search_page = load_fixture(search_fixture).encode("utf-8")
+        self.empty_page = b"<html><body><div id='icerik'>Sonu\xc3\xa7 bulunamad\xc4\xb1</div></body></html>"
+        self.subtitle_page = load_fixture("subtitle_page.html").encode("utf-8")
+        self.archive = load_fixture_bytes("subtitle.zip")
+        self.miss_marker = miss_marker
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+
+    def count(self, endpoint: str) -> None:
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def delay_and_fail(self) -> bool:
+        """Yapay gecikmeyi uygular; isteğin hata ile yanıtlanması gerekiyorsa True döner."""
+        with self.lock:
+            delay = self.latency_ms + self.rng.uniform(0, self.jitter_ms)
+            fail = self.rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return fail
+
+
+def make_handler(config: StandInConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):  # noqa: A002
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str = "text/html; charset=utf-8",
+                  headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _fail(self) -> None:
+            self._send(config.error_status, b"<html><body>Service Unavailable</body></html>", headers={"Retry-After": "1"})
+
+        def do_GET(self):
+            parsed = urllib.parse.urlsplit(self.path)
+            if parsed.path == "/find.php":
+                config.count("search")
+                if config.delay_and_fail():
+                    return self._fail()
+                query = urllib.parse.parse_qs(parsed.query).get("find", [""])[0]
+                return self._send(200, config.empty_page if config.miss_marker in query else config.search_page)
+            if parsed.path.startswith("/sub/"):
+                config.count("page")
+                if config.delay_and_fail():
+                    return self._fail()
+                return self._send(200, config.subtitle_page)
+            config.count("other")
+            return self._send(200, b"<html><body>ok</body></html>")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            form = urllib.parse.parse_qs(self.rfile.read(length).decode("utf-8", "replace"))
+            if self.path != "/ind":
+                return self._send(404, b"not found")
+            config.count("download")
+            if config.delay_and_fail():
+                return self._fail()
+            altid = form.get("altid", ["0"])[0]
+            return self._send(200, config.archive, "application/zip",
+                              {"Content-Disposition": f'attachment; filename="altyazi_{altid}.zip"'})
+
+    return Handler
+
+
+def start_standin(config: StandInConfig, port: int = 0) -> ThreadingHTTPServer:
+    """Taklit sunucuyu arka plan iş parçacığında başlatır; adres server.server_address'tedir."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="turkcealtyazi.org yerel taklit sunucusu")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Her isteğe eklenen sabit gecikme")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Gecikmeye eklenen rastgele en fazla ek süre")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Hata ile yanıtlanan isteklerin oranı (0-1)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--search-fixture", default="search_small.html")
+    args = parser.parse_args()
+
+    config = StandInConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.error_status, args.search_fixture)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(config))
+    print(f"Taklit sunucu: http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
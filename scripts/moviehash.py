@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+media/ altındaki videolar için OpenSubtitles tarzı moviehash hesaplayıcı.
+
+moviehash = dosya boyutu + ilk ve son 64 KB'ın 64 bitlik küçük-endian sözcüklerinin toplamı
+(mod 2^64), 16 haneli onaltılık. Başlık aramasının yerine birebir dosya eşlemesi için kullanılır.
+
+Her dosyadan yalnızca iki 64 KB'lık bölge okunur: dosya mmap ile eşlenir, iki bölge için
+MADV_WILLNEED ile okuma aynı anda istenir ve toplama struct.unpack_from ile C'de yapılır.
+Sayfa hataları GIL'i tuttuğu için işler iş parçacıkları yerine süreç havuzuna dağıtılır; böylece
+diske aynı anda birçok istek gider ve süre diskin arama süresiyle sınırlı kalır. Önbellekte
+olmayan dosyalar inode sırasıyla (diskteki yerleşime yakın) gönderilir.
+
+Sonuçlar data/moviehash.sqlite'ta (inode, mtime, boyut) anahtarıyla tutulur; değişmeyen dosya bir
+daha okunmaz, yeniden adlandırılan dosyanın yalnızca yolu güncellenir.
+
+    python3 scripts/moviehash.py
+    python3 scripts/moviehash.py "Film (2004)/Film.mkv" --json
+"""
+
+import argparse
+import concurrent.futures
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import ta_downloader
+from ta_downloader import DEFAULT_MEDIA_DIR
+
+DEFAULT_MOVIEHASH_PATH = os.path.join(ta_downloader.DATA_DIR, "moviehash.sqlite")
+
+# server/libraryManager.js ile aynı
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".avi", ".wmv", ".m4v", ".webm")
+HASH_CHUNK_SIZE = 64 * 1024
+_WORDS = struct.Struct(f"<{HASH_CHUNK_SIZE // 8}Q")
+_MASK = 0xFFFFFFFFFFFFFFFF
+# Havuzu kurmaya değmeyecek kadar az dosya varsa aynı süreçte hesaplanır
+_POOL_MIN_FILES = 4
+
+
+def moviehash(path: str) -> Optional[str]:
+    """Dosyanın moviehash'i; iki parçadan küçük (128 KB altı) dosyalar için None."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < 2 * HASH_CHUNK_SIZE:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            tail = size - HASH_CHUNK_SIZE
+            if hasattr(mm, "madvise"):
+                # Baş ve son bölge için okumayı birlikte başlat (ilk sayfa hatasını beklemeden)
+                mm.madvise(mmap.MADV_WILLNEED, 0, HASH_CHUNK_SIZE)
+                aligned = tail - tail % mmap.PAGESIZE
+                mm.madvise(mmap.MADV_WILLNEED, aligned, size - aligned)
+            total = size + sum(_WORDS.unpack_from(mm, 0)) + sum(_WORDS.unpack_from(mm, tail))
+    return f"{total & _MASK:016x}"
+
+
+def _hash_job(job: Tuple[str, str]) -> Tuple[str, Optional[str], Optional[str]]:
+    """Süreç havuzu işi: (göreli yol, hash, hata)."""
+    relative, path = job
+    try:
+        return relative, moviehash(path), None
+    except (OSError, ValueError) as e:
+        return relative, None, str(e)
+
+
+def iter_video_files(media_dir: str, prefix: str = "") -> Iterable[Tuple[str, os.stat_result]]:
+    """
+    media_dir altındaki videoların (göreli yol, stat) çiftleri; listMediaFiles ile aynı atlama
+    kuralları. Yanında .aria2 kontrol dosyası olan (halen inen) videolar da atlanır.
+    """
+    try:
+        entries = sorted(os.scandir(os.path.join(media_dir, prefix)), key=lambda entry: entry.name)
+    except FileNotFoundError:
+        return
+    names = {entry.name for entry in entries}
+    for entry in entries:
+        lower = entry.name.lower()
+        if entry.name.startswith(".") or lower.endswith(".aria2") or "sample" in lower or "rarbg" in lower:
+            continue
+        relative = os.path.join(prefix, entry.name)
+        if entry.is_dir():
+            yield from iter_video_files(media_dir, relative)
+        elif os.path.splitext(lower)[1] in VIDEO_EXTENSIONS and f"{entry.name}.aria2" not in names:
+            try:
+                yield relative, entry.stat()
+            except FileNotFoundError:
+                continue
+
+
+class MovieHashCache:
+    """
+    (inode, mtime_ns, boyut) → moviehash eşlemesi. path sütunu bilgi amaçlıdır ve her taramada
+    güncellenir; anahtar dosyanın kimliği olduğu için taşınan dosyalar yeniden okunmaz.
+    """
+
+    def __init__(self, path: str = DEFAULT_MOVIEHASH_PATH):
+        self.path = path
+        self.conn = ta_downloader._open_db(path)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            " inode INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, hash TEXT,"
+            " path TEXT NOT NULL, hashed_at REAL NOT NULL, PRIMARY KEY (inode, mtime_ns, size))"
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @staticmethod
+    def _key(st: os.stat_result) -> Tuple[int, int, int]:
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def lookup(self, st: os.stat_result) -> Tuple[bool, Optional[str]]:
+        """(önbellekte mi, hash); küçük dosyalar için hash None olarak saklanır."""
+        row = self.conn.execute(
+            "SELECT hash FROM hashes WHERE inode = ? AND mtime_ns = ? AND size = ?", self._key(st)
+        ).fetchone()
+        return (True, row[0]) if row else (False, None)
+
+    def hash_files(self, media_dir: str, files: List[Tuple[str, os.stat_result]], workers: int = 8,
+                   prune: bool = False) -> Tuple[Dict[str, Optional[str]], Dict[str, int]]:
+        """
+        Verilen (göreli yol, stat) dosyalarının hash'lerini önbellekten ya da hesaplayarak döndürür.
+        prune=True ise (tam tarama) listede olmayan dosyaların kayıtları silinir.
+
+        Returns:
+            ({göreli yol: hash}, {'hashed', 'cached', 'failed', 'removed'})
+        """
+        counts = {"hashed": 0, "cached": 0, "failed": 0, "removed": 0}
+        hashes: Dict[str, Optional[str]] = {}
+        stats: Dict[str, os.stat_result] = {}
+        todo: List[Tuple[str, os.stat_result]] = []
+        for relative, st in files:
+            found, value = self.lookup(st)
+            if found:
+                hashes[relative] = value
+                self.conn.execute("UPDATE hashes SET path = ? WHERE inode = ? AND mtime_ns = ? AND size = ?",
+                                  (relative,) + self._key(st))
+                counts["cached"] += 1
+            else:
+                todo.append((relative, st))
+            stats[relative] = st
+        self.conn.commit()
+
+        todo.sort(key=lambda item: (item[1].st_dev, item[1].st_ino))
+        jobs = [(relative, os.path.join(media_dir, relative)) for relative, _ in todo]
+        if workers > 1 and len(jobs) >= _POOL_MIN_FILES:
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+            results = executor.map(_hash_job, jobs, chunksize=max(1, min(16, len(jobs) // (workers * 4))))
+        else:
+            executor = None
+            results = map(_hash_job, jobs)
+        try:
+            for done, (relative, value, error) in enumerate(results, 1):
+                if error is not None:
+                    print(f"   ✗ {relative} okunamadı: {error}", file=sys.stderr)
+                    counts["failed"] += 1
+                    continue
+                hashes[relative] = value
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO hashes (inode, mtime_ns, size, hash, path, hashed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)", self._key(stats[relative]) + (value, relative, time.time())
+                )
+                counts["hashed"] += 1
+                # Kesilen büyük bir tarama yapılan işi kaybetmesin
+                if done % 64 == 0:
+                    self.conn.commit()
+        finally:
+            self.conn.commit()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        if prune:
+            live = {self._key(st) for st in stats.values()}
+            stale = [key for key in self.conn.execute("SELECT inode, mtime_ns, size FROM hashes") if key not in live]
+            self.conn.executemany("DELETE FROM hashes WHERE inode = ? AND mtime_ns = ? AND size = ?", stale)
+            self.conn.commit()
+            counts["removed"] = len(stale)
+        return hashes, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Videolar için OpenSubtitles tarzı moviehash (önbellekli)")
+    parser.add_argument("paths", nargs="*", help="Yalnızca bu videolar (media'ya göreli ya da mutlak yol); "
+                                                 "verilmezse tüm media klasörü")
+    parser.add_argument("--media", default=DEFAULT_MEDIA_DIR, help="Video klasörü")
+    parser.add_argument("--db", default=DEFAULT_MOVIEHASH_PATH, help="Hash önbelleği")
+    parser.add_argument("--workers", type=int, default=8, help="Paralel süreç sayısı (1: havuz yok)")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON satırları olarak yazdır")
+    args = parser.parse_args()
+
+    media_dir = os.path.abspath(args.media)
+    if args.paths:
+        files = []
+        for given in args.paths:
+            relative = os.path.relpath(os.path.abspath(os.path.join(media_dir, given)), media_dir)
+            try:
+                files.append((relative, os.stat(os.path.join(media_dir, relative))))
+            except OSError as e:
+                print(f"   ✗ {given}: {e}", file=sys.stderr)
+    else:
+        files = list(iter_video_files(media_dir))
+
+    cache = MovieHashCache(args.db)
+    try:
+        started = time.perf_counter()
+        hashes, counts = cache.hash_files(media_dir, files, args.workers, prune=not args.paths)
+    finally:
+        cache.close()
+    print(f"{len(files)} video ({time.perf_counter() - started:.2f} sn): {counts['hashed']} hesaplandı, "
+          f"{counts['cached']} önbellekten, {counts['failed']} hatalı, {counts['removed']} eski kayıt silindi.",
+          file=sys.stderr)
+
+    emit = ta_downloader._json_writer(sys.stdout)
+    for relative, st in files:
+        if relative not in hashes:
+            continue
+        if args.json:
+            emit({"path": relative, "hash": hashes[relative], "size": st.st_size})
+        else:
+            print(f"{hashes[relative] or '-':<16}  {st.st_size:>14}  {relative}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kütüphanedeki altyazılar için tam metin (SQLite FTS5) replik arama indeksi.
+
+media/ altındaki .srt/.vtt dosyaları ta_downloader.normalize_subtitle ile çözülüp ipucu ipucu
+data/subtitle_index.sqlite'a yazılır. Her ipucu video kimliği (videos.json'daki fileName
+eşleşmesinden), dil ve başlangıç/bitiş zamanıyla (ms) tutulur. Güncellemede (inode, mtime, boyut)
+değişmeyen dosyalar yeniden okunmaz; silinen dosyaların ipuçları indeksten çıkarılır.
+
+Arama ifadesi Türkçe harfler katlanarak (ı/i, ş/s, ç/c...) eşlenir; tam tümce geçen ipuçları
+önde olmak üzere sonuçlar bm25 puanına göre sıralanır. Oynatıcı startMs ile doğrudan o sahneye
+atlayabilir.
+
+    python3 scripts/subtitle_index.py --update
+    python3 scripts/subtitle_index.py -s "i'll be back" --lang en --limit 5
+"""
+
+import argparse
+import html
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import ta_downloader
+from subtitle_scheduler import (DEFAULT_MEDIA_DIR, DEFAULT_VIDEOS_PATH, SUBTITLE_EXTENSIONS, load_library,
+                                subtitle_language)
+
+DEFAULT_SUBTITLE_INDEX_PATH = os.path.join(ta_downloader.DATA_DIR, "subtitle_index.sqlite")
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\w+")
+# Tümce olarak geçmeyen sözcükler arasında izin verilen en fazla sözcük
+NEAR_DISTANCE = 10
+
+
+def fold_text(text: str) -> str:
+    """
+    Aramada eşlenen biçim: küçük harf, ı/İ → i. Diğer aksanları (ş, ç, ğ, ö, ü) FTS5'in
+    unicode61 remove_diacritics ayarı katlar.
+    """
+    return text.replace("İ", "i").replace("ı", "i").lower()
+
+
+def read_cues(path: str) -> List[Tuple[int, int, str]]:
+    """
+    Diskteki altyazıyı (SRT/VTT/ASS, herhangi bir karakter kümesi) (start_ms, end_ms, düz metin)
+    listesine çevirir; biçim etiketleri atılır, satırlar birleştirilir. İpucu yoksa ValueError.
+    """
+    cues = []
+    with open(path, "rb") as f:
+        for start, end, lines in ta_downloader.iter_subtitle_cues(f, path):
+            text = " ".join(line.strip() for line in lines)
+            if "<" in text or "&" in text:
+                text = html.unescape(_TAG_RE.sub("", text)).strip()
+            if text:
+                cues.append((start, end, text))
+    if not cues:
+        raise ValueError("altyazı ipucu bulunamadı")
+    return cues
+
+
+def iter_subtitle_files(media_dir: str, prefix: str = "") -> Iterable[str]:
+    """media_dir altındaki altyazıların göreli yollarını listMediaFiles ile aynı atlama kurallarıyla döndürür."""
+    try:
+        entries = sorted(os.scandir(os.path.join(media_dir, prefix)), key=lambda entry: entry.name)
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        lower = entry.name.lower()
+        if entry.name.startswith(".") or lower.endswith(".aria2") or "sample" in lower or "rarbg" in lower:
+            continue
+        relative = os.path.join(prefix, entry.name)
+        if entry.is_dir():
+            yield from iter_subtitle_files(media_dir, relative)
+        elif os.path.splitext(lower)[1] in SUBTITLE_EXTENSIONS:
+            yield relative
+
+
+def video_owners(library: Dict[str, object]) -> Dict[str, List[Tuple[str, str]]]:
+    """Klasör → [(küçük harfli video adı, video id)], en uzun ad önce (öneki çakışan videolar için)."""
+    owners: Dict[str, List[Tuple[str, str]]] = {}
+    for video in library.get("videos") or []:  # type: ignore[union-attr]
+        file_name = video.get("fileName") if isinstance(video, dict) else None
+        if not file_name:
+            continue
+        base = os.path.splitext(os.path.basename(str(file_name)))[0].lower()
+        owners.setdefault(os.path.dirname(str(file_name)), []).append((base, str(video.get("id"))))
+    for bases in owners.values():
+        bases.sort(key=lambda item: -len(item[0]))
+    return owners
+
+
+def owner_of(relative: str, owners: Dict[str, List[Tuple[str, str]]]) -> Tuple[Optional[str], str]:
+    """Altyazı dosyasının (video id, dil) bilgisi; eşleşen video yoksa id None, dil bilinmiyorsa 'und'."""
+    stem = os.path.splitext(os.path.basename(relative))[0]
+    for base, video_id in owners.get(os.path.dirname(relative), []):
+        if stem.lower().startswith(base):
+            return video_id, subtitle_language(stem, base) or "und"
+    return None, "und"
+
+
+class SubtitleIndex:
+    """
+    media/ altyazılarının FTS5 indeksi.
+
+    files tablosu dosya başına (yol, video, dil, inode, mtime_ns, boyut) tutar; cues tablosu ipucu
+    zamanlarını ve metnini, cue_fts ise cues.body (katlanmış metin) üzerine harici içerikli FTS5
+    dizinini içerir. Bir dosya değişince yalnızca onun ipuçları silinip yeniden eklenir.
+    """
+
+    def __init__(self, path: str = DEFAULT_SUBTITLE_INDEX_PATH):
+        self.path = path
+        self.conn = ta_downloader._open_db(path)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, video_id TEXT, lang TEXT NOT NULL,"
+            " inode INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,"
+            " cues INTEGER NOT NULL, indexed_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS files_video ON files (video_id);"
+            "CREATE TABLE IF NOT EXISTS cues ("
+            " id INTEGER PRIMARY KEY, file_id INTEGER NOT NULL, start_ms INTEGER NOT NULL,"
+            " end_ms INTEGER NOT NULL, text TEXT NOT NULL, body TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS cues_file ON cues (file_id);"
+        )
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS cue_fts USING fts5("
+                " body, content='cues', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+        except sqlite3.OperationalError as e:
+            raise RuntimeError(f"Bu SQLite sürümünde FTS5 yok ({sqlite3.sqlite_version}): {e}") from e
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _drop_cues(self, file_id: int) -> None:
+        # Harici içerikli FTS5'te silinen satırların eski metni 'delete' komutuyla verilmelidir
+        self.conn.execute(
+            "INSERT INTO cue_fts (cue_fts, rowid, body) SELECT 'delete', id, body FROM cues WHERE file_id = ?", (file_id,)
+        )
+        self.conn.execute("DELETE FROM cues WHERE file_id = ?", (file_id,))
+
+    def _store(self, relative: str, video_id: Optional[str], lang: str, st: os.stat_result,
+               cues: List[Tuple[int, int, str]]) -> None:
+        row = self.conn.execute("SELECT id FROM files WHERE path = ?", (relative,)).fetchone()
+        values = (video_id, lang, st.st_ino, st.st_mtime_ns, st.st_size, len(cues), time.time())
+        if row is None:
+            file_id = self.conn.execute(
+                "INSERT INTO files (video_id, lang, inode, mtime_ns, size, cues, indexed_at, path)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)", values + (relative,)
+            ).lastrowid
+        else:
+            file_id = row[0]
+            self._drop_cues(file_id)
+            self.conn.execute(
+                "UPDATE files SET video_id = ?, lang = ?, inode = ?, mtime_ns = ?, size = ?, cues = ?, indexed_at = ?"
+                " WHERE id = ?", values + (file_id,)
+            )
+        self.conn.executemany(
+            "INSERT INTO cues (file_id, start_ms, end_ms, text, body) VALUES (?, ?, ?, ?, ?)",
+            ((file_id, start, end, text, fold_text(text)) for start, end, text in cues),
+        )
+        self.conn.execute("INSERT INTO cue_fts (rowid, body) SELECT id, body FROM cues WHERE file_id = ?", (file_id,))
+
+    def update(self, media_dir: str, library: Optional[Dict[str, object]] = None) -> Dict[str, int]:
+        """
+        media_dir'i tarayıp indeksi günceller. library (videos.json) verilirse dosyalar videolara
+        bağlanır. {'indexed', 'skipped', 'removed', 'failed', 'cues'} sayılarını döndürür.
+        """
+        owners = video_owners(library or {})
+        known = {path: (file_id, video_id, lang, inode, mtime_ns, size) for file_id, path, video_id, lang, inode, mtime_ns, size
+                 in self.conn.execute("SELECT id, path, video_id, lang, inode, mtime_ns, size FROM files")}
+        counts = {"indexed": 0, "skipped": 0, "removed": 0, "failed": 0, "cues": 0}
+        seen = set()
+        for relative in iter_subtitle_files(media_dir):
+            seen.add(relative)
+            try:
+                st = os.stat(os.path.join(media_dir, relative))
+            except FileNotFoundError:
+                continue
+            video_id, lang = owner_of(relative, owners)
+            previous = known.get(relative)
+            if previous is not None and previous[3:] == (st.st_ino, st.st_mtime_ns, st.st_size):
+                if previous[1:3] != (video_id, lang):
+                    self.conn.execute("UPDATE files SET video_id = ?, lang = ? WHERE id = ?", (video_id, lang, previous[0]))
+                    self.conn.commit()
+                counts["skipped"] += 1
+                continue
+            try:
+                cues = read_cues(os.path.join(media_dir, relative))
+            except (OSError, ValueError) as e:
+                print(f"   ✗ {relative} indekslenemedi: {e}", file=sys.stderr)
+                counts["failed"] += 1
+                continue
+            self._store(relative, video_id, lang, st, cues)
+            self.conn.commit()
+            counts["indexed"] += 1
+            counts["cues"] += len(cues)
+        for relative, previous in known.items():
+            if relative not in seen:
+                self._drop_cues(previous[0])
+                self.conn.execute("DELETE FROM files WHERE id = ?", (previous[0],))
+                counts["removed"] += 1
+        self.conn.commit()
+        return counts
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        """
+        Serbest metni katlanmış sözcüklerden bir FTS5 ifadesine çevirir: tam tümce YA DA sözcüklerin
+        aynı ipucunda birbirine yakın geçmesi. İkisine de uyan ipuçları bm25'te öne çıkar.
+        """
+        words = _WORD_RE.findall(fold_text(query))
+        if len(words) < 2:
+            return f'"{words[0]}"' if words else ""
+        quoted = " ".join(f'"{word}"' for word in words)
+        return f'"{" ".join(words)}" OR NEAR({quoted}, {NEAR_DISTANCE})'
+
+    def search(self, query: str, limit: int = 20, lang: Optional[str] = None, video_id: Optional[str] = None,
+               raw: bool = False) -> List[Dict[str, object]]:
+        """
+        Replik arar; bm25'e göre en iyi limit sonucu döndürür. raw=True ise query doğrudan FTS5
+        ifadesi olarak kullanılır (NEAR, OR, önek* ...).
+
+        Returns:
+            [{'videoId', 'lang', 'path', 'startMs', 'endMs', 'text', 'score'}]
+        """
+        expression = query if raw else self.match_expression(query)
+        if not expression:
+            return []
+        sql = ("SELECT f.video_id, f.lang, f.path, c.start_ms, c.end_ms, c.text, cue_fts.rank"
+               " FROM cue_fts JOIN cues c ON c.id = cue_fts.rowid JOIN files f ON f.id = c.file_id"
+               " WHERE cue_fts MATCH ?")
+        params: List[object] = [expression]
+        if lang:
+            sql += " AND f.lang = ?"
+            params.append(lang)
+        if video_id:
+            sql += " AND f.video_id = ?"
+            params.append(video_id)
+        sql += " ORDER BY cue_fts.rank LIMIT ?"
+        params.append(limit)
+        return [
+            {"videoId": vid, "lang": file_lang, "path": path, "startMs": start, "endMs": end, "text": text,
+             "score": round(-rank, 4)}
+            for vid, file_lang, path, start, end, text, rank in self.conn.execute(sql, params)
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        files, videos = self.conn.execute("SELECT COUNT(*), COUNT(DISTINCT video_id) FROM files").fetchone()
+        cues = self.conn.execute("SELECT COUNT(*) FROM cues").fetchone()[0]
+        return {"files": files, "videos": videos, "cues": cues}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kütüphane altyazılarında replik arama (SQLite FTS5)")
+    parser.add_argument("-s", "--search", help="Aranacak replik")
+    parser.add_argument("--update", action="store_true", help="Aramadan önce indeksi güncelle (arama yoksa varsayılan)")
+    parser.add_argument("--db", default=DEFAULT_SUBTITLE_INDEX_PATH, help="İndeks dosyası")
+    parser.add_argument("--media", default=DEFAULT_MEDIA_DIR, help="Video klasörü")
+    parser.add_argument("--videos", default=DEFAULT_VIDEOS_PATH, help="Kütüphane dosyası (video kimlikleri için)")
+    parser.add_argument("--lang", help="Yalnızca bu dildeki altyazılarda ara")
+    parser.add_argument("--video", help="Yalnızca bu videoda ara (video id)")
+    parser.add_argument("--limit", type=int, default=20, help="En fazla sonuç sayısı")
+    parser.add_argument("--raw", action="store_true", help="Aramayı doğrudan FTS5 ifadesi olarak kullan")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON satırları olarak yazdır")
+    args = parser.parse_args()
+
+    index = SubtitleIndex(args.db)
+    try:
+        if args.update or not args.search:
+            try:
+                library = load_library(args.videos)
+            except FileNotFoundError:
+                library = {"videos": []}
+            started = time.perf_counter()
+            counts = index.update(args.media, library)
+            stats = index.stats()
+            print(f"İndeks güncellendi ({time.perf_counter() - started:.2f} sn): {counts['indexed']} dosya eklendi, "
+                  f"{counts['skipped']} değişmemiş, {counts['removed']} silindi, {counts['failed']} hatalı. "
+                  f"Toplam {stats['files']} dosya, {stats['cues']} ipucu.", file=sys.stderr)
+        if not args.search:
+            return
+        try:
+            hits = index.search(args.search, args.limit, args.lang, args.video, args.raw)
+        except sqlite3.OperationalError as e:
+            # --raw ile verilen ifade FTS5 sözdizimine uymuyor
+            print(f"Hata: geçersiz arama ifadesi: {e}", file=sys.stderr)
+            sys.exit(1)
+        emit = ta_downloader._json_writer(sys.stdout)
+        for hit in hits:
+            if args.json:
+                emit(hit)
+            else:
+                print(f"{ta_downloader._vtt_time(hit['startMs'])}  {hit['lang']}  {hit['videoId'] or hit['path']}  {hit['text']}")  # type: ignore[arg-type]
+        if not hits and not args.json:
+            print("Sonuç bulunamadı.", file=sys.stderr)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kütüphane genelinde altyazı ön-getirme zamanlayıcısı.
+
+data/videos.json'daki her videonun eksik dillerini bulur, kuyruğu önceliğe göre sıralar
+(izlenmekte olanlar, yeni eklenenler, hiç denenmemişler, en son en eski denenenler) ve
+ta_downloader ile site başına istek bütçesi içinde işler. Altyazılar videonun yanına
+<ad>.<dil>.vtt olarak yazılır (altyazı deposundan sabit bağlantı); sunucu bir sonraki taramada
+bunları listeler.
+
+Kuyruk her videodan sonra data/ta_cache/schedule.json'a kaydedilir. Süreç öldürülür ya da bütçe
+biterse sonraki çalıştırma kaldığı yerden devam eder (--fresh yeni kuyruk kurar).
+subtitleScriptLastAttempt / subtitleScriptLastSuccess alanları sunucudaki 12 saatlik bekleme
+kuralıyla uyumlu biçimde güncellenir; sunucunun tarama sırasında aynı videoyu tekrar denememesi
+için bu yeterlidir. Damgalar çalışan sunucuya POST /api/subtitles/refresh ile gönderilir
+(--notify); videos.json yalnızca sunucu kapalıyken doğrudan yazılır.
+
+İzleme ilerlemesi tarayıcıda (localStorage 'homeVideoDB.progress') tutulur; arayüz onu
+POST /api/progress ile sunucuya gönderir, sunucu da {videoId: {time, duration, updatedAt}}
+biçiminde data/progress.json'a yazar. Başka bir döküm --progress ile verilebilir.
+
+    python3 scripts/subtitle_scheduler.py --budget 120
+    python3 scripts/subtitle_scheduler.py --plan
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+import ta_downloader
+from ta_downloader import LANGUAGES, parse_langs
+
+DEFAULT_VIDEOS_PATH = os.path.join(ta_downloader.DATA_DIR, "videos.json")
+DEFAULT_PROGRESS_PATH = os.path.join(ta_downloader.DATA_DIR, "progress.json")
+DEFAULT_CHECKPOINT_PATH = os.path.join(ta_downloader.DATA_DIR, "ta_cache", "schedule.json")
+DEFAULT_MEDIA_DIR = ta_downloader.DEFAULT_MEDIA_DIR
+DEFAULT_NOTIFY_URL = f"http://127.0.0.1:{os.environ.get('PORT', '3000')}/api/subtitles/refresh"
+
+# server/libraryManager.js ile aynı kurallar
+SCRIPT_COOLDOWN_HOURS = 12
+SUBTITLE_EXTENSIONS = (".vtt", ".srt")
+_YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+_RELEASE_TAG_RE = re.compile(r"\b(480p|720p|1080p|2160p|4k|hdr|bluray|webrip|web-dl|remux|x264|x265|h264|h265)\b",
+                             re.IGNORECASE)
+
+# libraryManager.formatRuntime çıktısı: "2 sa 1 dk", "45 dk"
+_DURATION_RE = re.compile(r"^\s*(?:(\d+)\s*sa)?\s*(?:(\d+)\s*dk)?\s*$")
+
+# Öncelik katmanları (küçük olan önce)
+TIER_WATCHING, TIER_NEW, TIER_NEVER_TRIED, TIER_RETRY = range(4)
+TIER_NAMES = {TIER_WATCHING: "watching", TIER_NEW: "new", TIER_NEVER_TRIED: "never_tried", TIER_RETRY: "retry"}
+
+
+def iso_now() -> str:
+    """JavaScript'in new Date().toISOString() biçimi."""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def parse_time(value) -> Optional[float]:
+    """ISO tarih ya da milisaniye cinsinden zaman damgasını epoch saniyesine çevirir."""
+    if isinstance(value, (int, float)):
+        return float(value) / 1000
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def load_library(path: str) -> Dict[str, object]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    # Eski format: düz video listesi
+    if isinstance(data, list):
+        data = {"videos": data, "unmatched": [], "lastScan": None}
+    data.setdefault("videos", [])
+    return data
+
+
+def write_json_atomic(path: str, data: object) -> None:
+    """JSON.stringify(data, null, 2) biçiminde yazar; yarım kalmış dosya bırakmamak için rename kullanılır."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_progress(path: Optional[str]) -> Dict[str, Dict[str, float]]:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, dict) else {}
+
+
+def file_titles(file_name: str) -> Tuple[str, str]:
+    """parseFileName karşılığı: dosya adından (ham başlık, temiz başlık)."""
+    base = os.path.splitext(os.path.basename(file_name))[0]
+    cleaned = " ".join(re.sub(r"[._]+", " ", base).split())
+    sanitized = " ".join(_RELEASE_TAG_RE.sub(" ", _YEAR_RE.sub(" ", cleaned, count=1)).split())
+    return cleaned, sanitized or cleaned or base
+
+
+def title_candidates(video: Dict[str, object]) -> List[str]:
+    """Sunucudaki sırayla başlık adayları: orijinal ad, dosya adından ham ve temiz ad, Türkçe ad."""
+    raw_title, title = file_titles(str(video.get("fileName") or ""))
+    return ta_downloader.normalize_variants(
+        [str(t) for t in (video.get("originalTitle"), raw_title, title, video.get("title")) if t])
+
+
+_LANGUAGE_ALIASES = {alias: lang for lang, info in LANGUAGES.items() for alias in (lang, info["key"])}
+
+
+def subtitle_language(stem: str, base: str) -> Optional[str]:
+    """<base>.<dil>... adlı altyazı dosyasının (uzantısız stem) dilini; tanınmıyorsa None döndürür."""
+    hint = re.split(r"[._-]", stem[len(base):].lstrip("._-"))[0].lower()
+    return _LANGUAGE_ALIASES.get(hint)
+
+
+def existing_languages(video: Dict[str, object], media_dir: str) -> Set[str]:
+    """videos.json'daki ve videonun yanındaki <ad>.<dil>.(vtt|srt) dosyalarındaki diller."""
+    langs = {str(item.get("lang")) for item in video.get("subtitles") or [] if isinstance(item, dict)}  # type: ignore[union-attr]
+    file_name = str(video.get("fileName") or "")
+    directory = os.path.join(media_dir, os.path.dirname(file_name))
+    base = os.path.splitext(os.path.basename(file_name))[0].lower()
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return langs
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in SUBTITLE_EXTENSIONS or not stem.lower().startswith(base):
+            continue
+        lang = subtitle_language(stem, base)
+        if lang:
+            langs.add(lang)
+    return langs
+
+
+def runtime_minutes(video: Dict[str, object]) -> Optional[float]:
+    """TMDB süresini (runtimeMinutes) ya da biçimlendirilmiş duration alanını dakika olarak döndürür."""
+    runtime = video.get("runtimeMinutes")
+    if isinstance(runtime, (int, float)) and runtime > 0:
+        return float(runtime)
+    m = _DURATION_RE.match(str(video.get("duration") or ""))
+    if not m or not any(m.groups()):
+        return None
+    return float(int(m.group(1) or 0) * 60 + int(m.group(2) or 0)) or None
+
+
+def plan_entry(video: Dict[str, object], media_dir: str, langs: List[str], progress: Dict[str, Dict[str, float]],
+               now: float, cooldown: float, new_days: float) -> Optional[Dict[str, object]]:
+    """Videonun kuyruk kaydını döndürür; yapılacak iş yoksa (dosya yok, dil eksiği yok, beklemede) None."""
+    file_name = video.get("fileName")
+    if not file_name or not os.path.isfile(os.path.join(media_dir, str(file_name))):
+        return None
+    have = existing_languages(video, media_dir)
+    missing = [lang for lang in langs if lang not in have]
+    queries = title_candidates(video)
+    if not missing or not queries:
+        return None
+    last_attempt = parse_time(video.get("subtitleScriptLastAttempt"))
+    if last_attempt is not None and now - last_attempt < cooldown:
+        return None
+
+    watched = progress.get(str(video.get("id"))) or {}
+    created = parse_time(video.get("createdAt")) or 0.0
+    if watched.get("time"):
+        tier, recency = TIER_WATCHING, parse_time(watched.get("updatedAt")) or now
+    elif now - created < new_days * 24 * 60 * 60:
+        tier, recency = TIER_NEW, created
+    elif last_attempt is None:
+        tier, recency = TIER_NEVER_TRIED, created
+    else:
+        # En uzun süredir denenmeyen önce
+        tier, recency = TIER_RETRY, -last_attempt
+    return {"id": video.get("id"), "fileName": file_name, "langs": missing, "queries": queries,
+            "runtime": runtime_minutes(video), "tier": TIER_NAMES[tier], "priority": [tier, -recency]}
+
+
+def build_plan(library: Dict[str, object], media_dir: str, langs: List[str], progress: Dict[str, Dict[str, float]],
+               now: float, cooldown: float, new_days: float, order: Optional[List[str]] = None) -> List[Dict[str, object]]:
+    """
+    Kuyruğu kurar. order verilirse (kontrol noktasından devam) o sıra korunur ve yalnızca hâlâ
+    işi olan videolar kalır; verilmezse öncelik sırasına göre dizilir.
+    """
+    videos = {str(video.get("id")): video for video in library["videos"] if isinstance(video, dict)}  # type: ignore[union-attr]
+    ids = order if order is not None else list(videos)
+    entries = []
+    for video_id in ids:
+        video = videos.get(video_id)
+        entry = plan_entry(video, media_dir, langs, progress, now, cooldown, new_days) if video else None
+        if entry is not None:
+            entries.append(entry)
+    if order is None:
+        entries.sort(key=lambda entry: entry["priority"])
+    return entries
+
+
+def estimate_requests(entry: Dict[str, object]) -> int:
+    """Bir videonun yeniden denemesiz en kötü istek sayısı: her varyant için arama, her dil için sayfa + indirme."""
+    return len(entry["queries"]) + 2 * len(entry["langs"])  # type: ignore[arg-type]
+
+
+def notify_server(url: str, file_name: str, **fields) -> Optional[int]:
+    """POST /api/subtitles/refresh'e {fileName, ...fields} gönderir; HTTP durum kodu, sunucu kapalıysa None."""
+    body = {"fileName": file_name.replace(os.sep, "/"), **fields}
+    request = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def update_video(videos_path: str, video_id: str, file_name: str, succeeded: bool, notify_url: str = "") -> bool:
+    """
+    Zaman damgalarını günceller. Sunucu çalışıyorsa damgaları o yazar: kütüphaneyi bellekte tutup bütün
+    dosyayı kaydettiğinden, buradan yeniden yazmak aradaki değişikliklerinden birini ezebilirdi.
+    videos.json yalnızca sunucuya ulaşılamazsa (ya da notify_url boşsa) doğrudan güncellenir.
+    Sunucu damgaları kabul ettiyse True.
+    """
+    if notify_url:
+        status = notify_server(notify_url, file_name, attempted=True, succeeded=succeeded)
+        if status is not None:
+            # 404: video henüz sunucunun kütüphanesinde değil; taramada eklenince bekleme kuralı zaten işlemez
+            return 200 <= status < 300
+    library = load_library(videos_path)
+    for video in library["videos"]:  # type: ignore[union-attr]
+        if isinstance(video, dict) and str(video.get("id")) == video_id:
+            stamp = iso_now()
+            video["subtitleScriptLastAttempt"] = stamp
+            if succeeded:
+                video["subtitleScriptLastSuccess"] = stamp
+            write_json_atomic(videos_path, library)
+            break
+    return False
+
+
+def video_destination(file_name: str) -> Dict[str, str]:
+    """Videonun media'ya göreli adından ta_downloader hedefi: altyazılar <ad>.<dil>.<uzantı> olarak yanına yazılır."""
+    return {"dir": os.path.dirname(file_name), "base": os.path.splitext(os.path.basename(file_name))[0]}
+
+
+def manifest_files(result: Dict[str, object]) -> Dict[str, str]:
+    """run_query manifestinden {dil: göreli yol}."""
+    return {str(entry["lang"]): str(entry["path"]) for entry in result.get("manifest") or []}  # type: ignore[union-attr]
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, object]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def run_schedule(session, entries: List[Dict[str, object]], args, budget: "ta_downloader.HostBudget",
+                 checkpoint: Dict[str, object]) -> Dict[str, int]:
+    """
+    Kuyruğu sırayla işler, her videodan sonra kontrol noktasını kaydeder ve stdout'a bir JSON satırı yazar.
+    Bütçe bir sonraki videoya yetmeyecekse durur.
+    """
+    emit = ta_downloader._json_writer(sys.stdout)
+    done: Dict[str, str] = checkpoint["done"]  # type: ignore[assignment]
+    counts = {"processed": 0, "ok": 0, "remaining": 0}
+    with contextlib.redirect_stdout(sys.stderr):
+        for position, entry in enumerate(entries):
+            video_id = str(entry["id"])
+            if args.limit and counts["processed"] >= args.limit:
+                counts["remaining"] = len(entries) - position
+                break
+            if budget.remaining(ta_downloader.BASE) < estimate_requests(entry):
+                counts["remaining"] = len(entries) - position
+                print(f"⏸ İstek bütçesi doldu; {counts['remaining']} video sonraki çalıştırmaya kaldı.")
+                break
+
+            print(f"\n▶ {entry['fileName']} [{entry['tier']}] için diller: {', '.join(entry['langs'])}")  # type: ignore[arg-type]
+            metrics = ta_downloader.RunMetrics(str(entry["queries"][0]))  # type: ignore[index]
+            record: Dict[str, object] = {"id": video_id, "fileName": entry["fileName"], "langs": entry["langs"]}
+            try:
+                result = ta_downloader.run_query(session, entry["queries"], langs=entry["langs"],  # type: ignore[arg-type]
+                                                 metrics=metrics, runtime=entry.get("runtime"),  # type: ignore[arg-type]
+                                                 dest=video_destination(str(entry["fileName"])), media_dir=args.media)
+            except ta_downloader.BudgetExhausted as e:
+                # Yarım kalan video işaretlenmez; sonraki çalıştırma baştan dener
+                counts["remaining"] = len(entries) - position
+                print(f"⏸ {e}; {counts['remaining']} video sonraki çalıştırmaya kaldı.")
+                break
+            except Exception as e:
+                record.update(ok=False, status="error", error=str(e), files={})
+            else:
+                files = manifest_files(result)
+                record.update(ok=True, status=result["status"], files=files)
+            record["requests"] = metrics.to_dict()["http"]["requests"]  # type: ignore[index]
+            update_video(args.videos, video_id, str(entry["fileName"]), bool(record["files"]), args.notify)
+
+            done[video_id] = str(record["status"])
+            write_json_atomic(args.checkpoint, checkpoint)
+            counts["processed"] += 1
+            counts["ok"] += bool(record["files"])
+            emit(record)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="videos.json'daki eksik altyazılar için arka plan ön-getirme zamanlayıcısı")
+    parser.add_argument("--videos", default=DEFAULT_VIDEOS_PATH, help="Kütüphane dosyası (data/videos.json)")
+    parser.add_argument("--media", default=DEFAULT_MEDIA_DIR, help="Video klasörü (fileName alanları buna göredir)")
+    parser.add_argument("--progress", default=DEFAULT_PROGRESS_PATH,
+                        help="İzleme ilerlemesi dökümü ({videoId: {time, duration, updatedAt}}); yoksa yok sayılır")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH, help="Kaldığı yerden devam için kuyruk dosyası")
+    parser.add_argument("--fresh", action="store_true", help="Kontrol noktasını yok sayıp kuyruğu yeniden kur")
+    parser.add_argument("--plan", action="store_true", help="Kuyruğu JSON satırları olarak yazdır ve çık (istek atılmaz)")
+    parser.add_argument("--langs", type=parse_langs, default=list(LANGUAGES),
+                        help=f"Tamamlanacak diller (varsayılan: {','.join(LANGUAGES)})")
+    parser.add_argument("--budget", type=int, default=200,
+                        help="Bu çalıştırmada siteye gönderilecek en fazla istek (yeniden denemeler dahil)")
+    parser.add_argument("--limit", type=int, default=0, help="En fazla işlenecek video sayısı (0: sınırsız)")
+    parser.add_argument("--delay", type=float, default=2.0, help="Siteye istekler arası ortalama bekleme (saniye)")
+    parser.add_argument("--cooldown-hours", type=float, default=SCRIPT_COOLDOWN_HOURS,
+                        help="Son denemeden bu kadar saat geçmemiş videoları atla")
+    parser.add_argument("--new-days", type=float, default=7, help="Bu kadar gün içinde eklenen videolar 'yeni' sayılır")
+    parser.add_argument("--notify", default=DEFAULT_NOTIFY_URL,
+                        help="Zaman damgalarının gönderileceği sunucu adresi (boş ya da sunucu kapalı: videos.json doğrudan yazılır)")
+    ta_downloader.add_session_store_arguments(parser)
+    args = parser.parse_args()
+
+    library = load_library(args.videos)
+    progress = load_progress(args.progress)
+    now = time.time()
+    cooldown = args.cooldown_hours * 60 * 60
+    checkpoint = None if args.fresh else load_checkpoint(args.checkpoint)
+    if checkpoint is not None and checkpoint.get("langs") == args.langs:
+        order = [video_id for video_id in checkpoint["queue"] if video_id not in checkpoint["done"]]  # type: ignore[union-attr]
+        entries = build_plan(library, args.media, args.langs, progress, now, cooldown, args.new_days, order)
+        print(f"↻ Kontrol noktasından devam: {len(checkpoint['done'])} video tamamlanmış, "  # type: ignore[arg-type]
+              f"{len(entries)} video kaldı.", file=sys.stderr)
+    else:
+        entries = build_plan(library, args.media, args.langs, progress, now, cooldown, args.new_days)
+        checkpoint = {"createdAt": iso_now(), "langs": args.langs, "queue": [str(e["id"]) for e in entries], "done": {}}
+
+    if args.plan:
+        emit = ta_downloader._json_writer(sys.stdout)
+        for entry in entries:
+            emit({key: value for key, value in entry.items() if key != "priority"})
+        return
+    if not entries:
+        print("Eksik altyazısı olan video yok.", file=sys.stderr)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(args.checkpoint)
+        return
+
+    budget = ta_downloader.HostBudget(args.budget)
+    session = ta_downloader.build_session(rate=1.0 / args.delay if args.delay > 0 else None, budget=budget)
+    ta_downloader.attach_session_stores(session, args)
+    write_json_atomic(args.checkpoint, checkpoint)
+
+    counts = run_schedule(session, entries, args, budget, checkpoint)
+    if not counts["remaining"]:
+        os.remove(args.checkpoint)
+    spent = args.budget - budget.remaining(ta_downloader.BASE)
+    print(f"\nZamanlayıcı: {counts['processed']} video işlendi, {counts['ok']} videoya altyazı eklendi, "
+          f"{spent}/{args.budget} istek kullanıldı.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+media/ için inotify tabanlı altyazı izleyicisi (Linux).
+
+Tüm klasör ağacı inotify ile izlenir; bir video tamamlandığında yalnızca o dosya için altyazı
+getirilir, tam ağaç taraması yapılmaz:
+  - video dosyası yazılıp kapatıldığında (IN_CLOSE_WRITE) ya da klasöre taşındığında (IN_MOVED_TO),
+  - aria2'nin <ad>.aria2 kontrol dosyası silindiğinde (indirme bitti; çok dosyalı torrentlerde
+    <klasör>.aria2 silinince klasördeki tüm videolar),
+  - içinde video olan bir klasör media/ altına taşındığında.
+Aynı dosyanın olayları birleştirilir ve son olaydan --debounce saniye sonra tek iş olarak
+işlenir. O anda hâlâ bir .aria2 kontrol dosyası varsa dosya atlanır (indirme bitince yeniden gelir).
+
+Eksik diller videonun yanındaki <ad>.<dil>.(vtt|srt) dosyalarına ve videos.json'a göre bulunur;
+altyazılar subtitle_scheduler ile aynı biçimde videonun yanına yazılır ve sunucuya
+POST /api/subtitles/refresh ile deneme damgalarıyla birlikte haber verilir (sunucu kapalıysa
+damgalar videos.json'a doğrudan yazılır, altyazıları bir sonraki tarama görür).
+Her işlenen dosya için stdout'a bir JSON satırı yazılır.
+
+    python3 scripts/subtitle_watcher.py
+    python3 scripts/subtitle_watcher.py --debounce 10 --notify ""
+"""
+
+import argparse
+import contextlib
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+import struct
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import ta_downloader
+from moviehash import VIDEO_EXTENSIONS, iter_video_files
+from subtitle_scheduler import (DEFAULT_MEDIA_DIR, DEFAULT_NOTIFY_URL, DEFAULT_VIDEOS_PATH, existing_languages,
+                                load_library, manifest_files, notify_server, runtime_minutes, title_candidates,
+                                update_video, video_destination)
+from ta_downloader import LANGUAGES, parse_langs
+
+ARIA2_SUFFIX = ".aria2"
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """libc inotify çağrıları için ince ctypes sarmalayıcı (harici paket gerekmez)."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise RuntimeError("inotify bu sistemde yok (yalnızca Linux); subtitle_scheduler.py kullanın")
+        libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read(self, timeout: Optional[float]) -> List[Tuple[int, int, str]]:
+        """timeout saniye içinde gelen olaylar: [(wd, mask, ad)]."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def skipped(name: str) -> bool:
+    """listMediaFiles'ın atladığı adlar (gizli, sample/rarbg); .aria2 burada ayrıca ele alınır."""
+    lower = name.lower()
+    return name.startswith(".") or "sample" in lower or "rarbg" in lower
+
+
+def downloading(media_dir: str, relative: str) -> bool:
+    """Dosyanın ya da üst klasörlerinden birinin aria2 kontrol dosyası duruyorsa indirme sürüyordur."""
+    parts = relative.split(os.sep)
+    return any(os.path.exists(os.path.join(media_dir, *parts[:depth]) + ARIA2_SUFFIX) for depth in range(1, len(parts) + 1))
+
+
+class MediaWatcher:
+    """
+    media/ ağacındaki klasörleri izler ve tamamlanan videoları birleştirilmiş, geciktirilmiş
+    (debounce) bir kuyrukta toplar. due() süresi dolan göreli yolları döndürür.
+    """
+
+    def __init__(self, media_dir: str, debounce: float = 5.0):
+        self.media_dir = media_dir
+        self.debounce = debounce
+        self.inotify = Inotify()
+        self.dirs: Dict[int, str] = {}
+        self.pending: Dict[str, float] = {}
+        self.watch_tree("")
+
+    def close(self) -> None:
+        self.inotify.close()
+
+    def watch_tree(self, relative: str) -> None:
+        for directory, subdirs, _ in os.walk(os.path.join(self.media_dir, relative)):
+            subdirs[:] = [name for name in subdirs if not skipped(name)]
+            try:
+                wd = self.inotify.add_watch(directory)
+            except OSError as e:
+                print(f"   ✗ {directory} izlenemiyor: {e}", file=sys.stderr)
+                continue
+            relative_dir = os.path.relpath(directory, self.media_dir)
+            self.dirs[wd] = "" if relative_dir == os.curdir else relative_dir
+
+    def queue(self, relative: str) -> None:
+        # Her yeni olay süreyi yeniden başlatır: yazma bitene kadar iş bekler
+        self.pending[relative] = time.monotonic() + self.debounce
+
+    def queue_tree(self, relative: str) -> None:
+        for video, _ in iter_video_files(self.media_dir, relative):
+            self.queue(video)
+
+    def handle(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            # Olaylar kaçtı: yeni klasörleri izlemeye al, son bir saatte değişen videoları kuyruğa ekle
+            print("⚠ inotify kuyruğu taştı; son değişen videolar yeniden kontrol ediliyor", file=sys.stderr)
+            self.watch_tree("")
+            cutoff = time.time() - 60 * 60
+            for video, st in iter_video_files(self.media_dir):
+                if st.st_mtime >= cutoff:
+                    self.queue(video)
+            return
+        if mask & (IN_IGNORED | IN_DELETE_SELF):
+            self.dirs.pop(wd, None)
+            return
+        directory = self.dirs.get(wd)
+        if directory is None or not name or skipped(name):
+            return
+        relative = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self.watch_tree(relative)
+                # Hazır bir klasör taşındıysa içindeki videolar da tamamdır
+                self.queue_tree(relative)
+            return
+        if name.endswith(ARIA2_SUFFIX):
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                target = relative[:-len(ARIA2_SUFFIX)]
+                if os.path.isdir(os.path.join(self.media_dir, target)):
+                    self.queue_tree(target)
+                elif os.path.splitext(target)[1].lower() in VIDEO_EXTENSIONS:
+                    self.queue(target)
+            return
+        if mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS:
+            self.queue(relative)
+
+    def poll(self) -> None:
+        """Bir sonraki iş zamanına kadar (kuyruk boşsa süresiz) olay bekler ve işler."""
+        timeout = max(0.0, min(self.pending.values()) - time.monotonic()) if self.pending else None
+        for wd, mask, name in self.inotify.read(timeout):
+            self.handle(wd, mask, name)
+
+    def due(self) -> List[str]:
+        now = time.monotonic()
+        ready = sorted(relative for relative, deadline in self.pending.items() if deadline <= now)
+        for relative in ready:
+            del self.pending[relative]
+        return ready
+
+
+def fetch_for(session, relative: str, args) -> Optional[Dict[str, object]]:
+    """
+    Tek bir video için eksik dillerin altyazısını getirip yanına yazar. Dosya artık yoksa ya da
+    hâlâ iniyorsa None; eksik dil yoksa status 'complete' olan bir kayıt döndürür.
+    """
+    if not os.path.isfile(os.path.join(args.media, relative)) or downloading(args.media, relative):
+        return None
+    try:
+        library = load_library(args.videos)
+    except (FileNotFoundError, ValueError):
+        library = {"videos": []}
+    file_name = relative.replace(os.sep, "/")
+    video = next((v for v in library["videos"] if isinstance(v, dict) and v.get("fileName") == file_name), None)  # type: ignore[union-attr]
+    target: Dict[str, object] = video or {"fileName": file_name}
+    missing = [lang for lang in args.langs if lang not in existing_languages(target, args.media)]
+    record: Dict[str, object] = {"fileName": file_name, "id": video.get("id") if video else None, "langs": missing}
+    if not missing:
+        return {**record, "ok": True, "status": "complete", "files": {}}
+
+    print(f"\n▶ {file_name} için diller: {', '.join(missing)}")
+    metrics = ta_downloader.RunMetrics(file_name)
+    try:
+        result = ta_downloader.run_query(session, title_candidates(target), langs=missing, metrics=metrics,
+                                         runtime=runtime_minutes(target), dest=video_destination(file_name),
+                                         media_dir=args.media)
+    except Exception as e:
+        record.update(ok=False, status="error", error=str(e), files={})
+    else:
+        files = manifest_files(result)
+        record.update(ok=True, status=result["status"], files=files)
+    if video is not None:
+        # Damgalarla birlikte sunucu altyazı listesini de yeniler
+        record["notified"] = update_video(args.videos, str(video["id"]), file_name, bool(record["files"]), args.notify)
+    elif record["files"] and args.notify:
+        record["notified"] = notify_server(args.notify, file_name) == 200
+    record["requests"] = metrics.to_dict()["http"]["requests"]  # type: ignore[index]
+    return record
+
+
+def watch(watcher: MediaWatcher, session, args) -> None:
+    """Olay döngüsü; SIGTERM/SIGINT ile çıkılır. Bir video --retry-minutes içinde yeniden denenmez."""
+    emit = ta_downloader._json_writer(sys.stdout)
+    attempted: Dict[str, float] = {}
+    with contextlib.redirect_stdout(sys.stderr):
+        print(f"👀 {args.media} izleniyor ({len(watcher.dirs)} klasör)")
+        while True:
+            watcher.poll()
+            for relative in watcher.due():
+                last = attempted.get(relative)
+                if last is not None and time.monotonic() - last < args.retry_minutes * 60:
+                    continue
+                record = fetch_for(session, relative, args)
+                if record is None:
+                    continue
+                if record["status"] != "complete":
+                    attempted[relative] = time.monotonic()
+                emit(record)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="media/ klasöründe tamamlanan videolar için inotify ile altyazı getirici")
+    parser.add_argument("--media", default=DEFAULT_MEDIA_DIR, help="İzlenecek video klasörü")
+    parser.add_argument("--videos", default=DEFAULT_VIDEOS_PATH, help="Kütüphane dosyası (data/videos.json)")
+    parser.add_argument("--langs", type=parse_langs, default=list(LANGUAGES),
+                        help=f"Tamamlanacak diller (varsayılan: {','.join(LANGUAGES)})")
+    parser.add_argument("--debounce", type=float, default=5.0,
+                        help="Bir dosyanın son olayından sonra işlenmeden önce beklenecek süre (saniye)")
+    parser.add_argument("--retry-minutes", type=float, default=60,
+                        help="Altyazı bulunamayan bir video bu kadar dakika içinde yeniden denenmez")
+    parser.add_argument("--notify", default=DEFAULT_NOTIFY_URL,
+                        help="Damgaların ve yeni altyazıların bildirileceği sunucu adresi (boş: videos.json doğrudan yazılır)")
+    parser.add_argument("--delay", type=float, default=1.0, help="Siteye istekler arası ortalama bekleme (saniye)")
+    ta_downloader.add_session_store_arguments(parser)
+    args = parser.parse_args()
+    args.media = os.path.abspath(args.media)
+
+    try:
+        watcher = MediaWatcher(args.media, args.debounce)
+    except (RuntimeError, OSError) as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        sys.exit(1)
+    session = ta_downloader.build_session(rate=1.0 / args.delay if args.delay > 0 else None)
+    ta_downloader.attach_session_stores(session, args)
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        watch(watcher, session, args)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,108 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from __future__ import annotations
+
+import abc
 import argparse
+import array
+import base64
+import bisect
+import codecs
+import contextlib
+import contextvars
+import hashlib
+import heapq
+import html.entities
+import importlib
+import io
+import itertools
+import json
 import os
+import queue
 import re
+import struct
 import sys
+import threading
 import time
+import unicodedata
 import urllib.parse
-import zipfile
-from typing import List, Dict, Optional
+from html.parser import HTMLParser
+from typing import List, Dict, Optional, Iterable, Tuple
+
+
+class _LazyModule:
+    """
+    Modülü ilk öznitelik erişiminde içe aktarır. Böylece --help gibi ağ gerektirmeyen yollar ve
+    yalnızca belirli aşamalarda gereken modüller (bs4, sqlite3, zipfile...) açılış süresine eklenmez.
+    """
+
+    def __init__(self, name: str, install_hint: Optional[str] = None):
+        self._name = name
+        self._install_hint = install_hint
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            try:
+                self._module = importlib.import_module(self._name)
+            except ImportError:
+                if self._install_hint is None:
+                    raise
+                print("This script requires 'requests' and 'beautifulsoup4'. Install with:", file=sys.stderr)
+                print(f"    {self._install_hint}", file=sys.stderr)
+                sys.exit(1)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
 
-try:
-    import requests
-    from bs4 import BeautifulSoup  # type: ignore
-except Exception as e:
-    print("This script requires 'requests' and 'beautifulsoup4'. Install with:", file=sys.stderr)
-    print("    pip install requests beautifulsoup4", file=sys.stderr)
-    sys.exit(1)
+
+requests = _LazyModule("requests", "pip install requests beautifulsoup4")
+bs4 = _LazyModule("bs4", "pip install requests beautifulsoup4")
+sqlite3 = _LazyModule("sqlite3")
+zipfile = _LazyModule("zipfile")
+tempfile = _LazyModule("tempfile")
+zlib = _LazyModule("zlib")
+futures = _LazyModule("concurrent.futures")
+random = _LazyModule("random")
+cProfile = _LazyModule("cProfile")
+tracemalloc = _LazyModule("tracemalloc")
+email_utils = _LazyModule("email.utils")
+socket = _LazyModule("socket")
+numpy = _LazyModule("numpy")  # isteğe bağlı: yalnızca zamanlama uyumu için (pip install numpy)
 
 
 BASE = "https://turkcealtyazi.org"
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+DEFAULT_CACHE_PATH = os.path.join(DATA_DIR, "ta_cache", "responses.sqlite")
+DEFAULT_INDEX_PATH = os.path.join(DATA_DIR, "ta_cache", "index.sqlite")
+DEFAULT_STORE_DIR = os.path.join(DATA_DIR, "ta_cache", "store")
+DEFAULT_PROVIDER_STATS_PATH = os.path.join(DATA_DIR, "ta_cache", "providers.sqlite")
+DEFAULT_LEASE_PATH = os.path.join(DATA_DIR, "ta_cache", "leases.sqlite")
+DEFAULT_MEDIA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "media")
+# İşlerdeki "dest" klasörleri buna göredir (sunucunun MEDIA_DIR'i; --media ile değiştirilir)
+MEDIA_DIR = DEFAULT_MEDIA_DIR
+
 
+def build_session(timeout: int = 20, rate: Optional[float] = None, burst: int = 2,
+                  pool_size: int = 10, pool_connections: Optional[int] = None,
+                  retry: Optional["RetryPolicy"] = None, budget: Optional["HostBudget"] = None) -> requests.Session:
+    """
+    rate: host başına saniyedeki istek sayısı (None/0 ise sınırsız). Site 429/503 ile geri
+          ittiğinde hız yarıya iner, başarılı isteklerle yavaş yavaş rate'e geri çıkar (AIMD).
+    pool_size: host başına açık tutulacak en fazla bağlantı (iş parçacığı sayısı kadar olmalı).
+    pool_connections: bağlantı havuzu tutulacak en fazla host sayısı (varsayılan pool_size).
+    retry: GET/HEAD ve idempotent=True verilen istekler için yeniden deneme politikası
+           (None ise varsayılan RetryPolicy; yeniden deneme istenmiyorsa RetryPolicy(retries=0)).
+    budget: host başına en fazla istek sayısı; her deneme ayrı sayılır, bitince BudgetExhausted.
+    """
+    from urllib3.util.request import ACCEPT_ENCODING  # brotli/zstd kuruluysa "br"/"zstd" de içerir
 
-def build_session(timeout: int = 20) -> requests.Session:
     s = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections or pool_size, pool_maxsize=pool_size)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
     # Reasonable headers to look like a browser and keep referer
     s.headers.update({
         "User-Agent": (
@@ -32,10 +111,18 @@ def build_session(timeout: int = 20) -> requests.Session:
         ),
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
+        "Accept-Encoding": ACCEPT_ENCODING,
         "Connection": "keep-alive",
     })
     # Attach default timeout to session via a simple wrapper
-    s.request = _with_timeout(s.request, timeout)  # type: ignore
+    request_func = _with_cancel(_with_metrics(s.request))
+    limiter = HostRateLimiter(rate, burst) if rate else None
+    if limiter is not None:
+        request_func = _with_rate_limit(request_func, limiter)
+    if budget is not None:
+        request_func = _with_budget(request_func, budget)
+    request_func = _with_retries(request_func, retry or RetryPolicy(), limiter)
+    s.request = _with_timeout(request_func, timeout)  # type: ignore
     return s
 
 
@@ -48,344 +135,1864 @@ def _with_timeout(request_func, default_timeout):
     return wrapped
 
 
-def search_query(session: requests.Session, query: str) -> str:
-    params = {"cat": "sub", "find": query}
-    url = f"{BASE}/find.php"
-    resp = session.get(url, params=params)
-    resp.raise_for_status()
-    return resp.text
+class TokenBucket:
+    """
+    Thread-safe token bucket: saniyede `rate` jeton dolar, en fazla `burst` jeton birikir.
+    slow_down()/speed_up() hızı AIMD ile ayarlar: geri itmede yarıya iner (en az base_rate/16),
+    her başarılı istekte base_rate'in onda biri kadar artarak base_rate'e döner.
+    """
 
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.base_rate = rate
+        self.min_rate = rate / 16
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
 
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            _sleep(wait)
 
-def parse_Subs(html: str) -> List[Dict[str, str]]:
+    def slow_down(self) -> float:
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            # Birikmiş jetonlar da bırakılır; aksi halde burst kadar istek hemen tekrar gider
+            self.tokens = min(self.tokens, 0.0)
+            return self.rate
+
+    def speed_up(self) -> None:
+        with self.lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 10)
+
+
+class HostRateLimiter:
+    """Her host için ayrı bir TokenBucket tutar; aynı siteye giden tüm iş parçacıkları aynı bütçeyi paylaşır."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urllib.parse.urlsplit(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def acquire(self, url: str) -> None:
+        self.bucket(url).acquire()
+
+
+def _with_rate_limit(request_func, limiter: HostRateLimiter):
+    """Wrap requests.Session.request so every request waits for a token from its host's bucket."""
+    def wrapped(method, url, **kwargs):
+        limiter.acquire(url)
+        return request_func(method, url, **kwargs)
+    return wrapped
+
+
+class BudgetExhausted(RuntimeError):
+    """Host'un istek bütçesi bittiğinde istek gönderilmeden fırlatılır."""
+
+
+class HostBudget:
+    """Her host için oturum boyunca gönderilebilecek en fazla istek sayısı (yeniden denemeler dahil)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.spent: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def remaining(self, url: str) -> int:
+        host = urllib.parse.urlsplit(url).netloc
+        with self.lock:
+            return max(0, self.limit - self.spent.get(host, 0))
+
+    def charge(self, url: str) -> None:
+        host = urllib.parse.urlsplit(url).netloc
+        with self.lock:
+            spent = self.spent.get(host, 0)
+            if spent >= self.limit:
+                raise BudgetExhausted(f"{host} için istek bütçesi ({self.limit}) doldu")
+            self.spent[host] = spent + 1
+
+
+def _with_budget(request_func, budget: HostBudget):
+    """Wrap requests.Session.request so every attempt is charged to its host's budget."""
+    def wrapped(method, url, **kwargs):
+        budget.charge(url)
+        return request_func(method, url, **kwargs)
+    return wrapped
+
+
+class Cancelled(RuntimeError):
+    """Etkin iptal olayı işaretlendikten sonraki ilk istekte (ya da beklemede) fırlatılır."""
+
+
+# Sağlayıcı yarışında kaybeden iş parçacıklarını durdurmak için; her iş parçacığı kendi olayını ayarlar
+_current_cancel: "contextvars.ContextVar[Optional[threading.Event]]" = contextvars.ContextVar("ta_cancel", default=None)
+
+
+class DeadlineExceeded(Cancelled):
+    """Çalıştırmanın ya da etkin aşamanın süre payı dolduğunda fırlatılır; o ana kadar alınan diller korunur."""
+
+
+# Süre bütçesinin aşamalara bölünmesi: bir aşama başlarken kalan süre bu ve sonraki aşamaların
+# ağırlıklarına oranla paylaştırılır, erken biten aşamanın artanı sonrakilere kalır. Listede olmayan
+# aşamalar (parse, select, race...) içinde bulundukları aşamanın payını kullanır.
+# Ağırlıklar aşamanın tipik istek sayısını izler (arama 1 büyük sayfa, sayfa/indirme dil başına 1);
+# yerel aşamalara (extract, write) yalnızca küçük bir pay ayrılır.
+DEADLINE_STAGES = (("index", 1.0), ("search", 1.5), ("pages", 2.0), ("download", 2.0), ("extract", 0.5), ("write", 0.25))
+
+
+class Deadline:
     """
-    HTML'den altyazı bilgilerini parse eder.
-    Her altyazı için şu bilgileri döndürür:
-    - url: Altyazı adresi (/sub/ ile başlayan)
-    - title: Altyazı başlığı
-    - language: 'tr' veya 'en'
-    - translator: Çevirmen bilgisi (varsa)
-    - downloads: İndirme sayısı (integer)
-    - downloads_formatted: Formatlanmış indirme sayısı (string, virgüllü)
+    Bir çalıştırmanın uçtan uca süre bütçesi (saniye). Etkin aşamanın payı dolunca yeni deneme ve
+    beklemeler DeadlineExceeded ile kesilir; süren isteklerin zaman aşımı kalan paya kırpılır.
+    for_stage() aşamaya özel bir kopya döndürür; süresi dolan aşamalar tüm kopyalarda ortak olan
+    `hits` listesinde toplanır.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    subtitles = []
-    
-    # Altyazı satırlarını bul (genellikle div class içinde)
-    subtitle_rows = soup.find_all("div", class_=re.compile(r"altsonsez|row-class"))
-    
-    for row in subtitle_rows:
-        try:
-            subtitle_info = {}
-            
-            # Altyazı linkini bul
-            link_element = row.find("a", href=re.compile(r"\d+/.*\.html"))
-            if not link_element:
-                continue
-                
-            href = link_element.get("href", "")
-            if href:
-                # href zaten /sub/ ile başlıyorsa olduğu gibi bırak, yoksa ekle
-                if not href.startswith("/sub/"):
-                    subtitle_info["url"] = "/sub/" + href.lstrip("/")
-                else:
-                    subtitle_info["url"] = href
-                    
-                # Başlığı al
-                title_text = link_element.get_text(strip=True)
-                subtitle_info["title"] = title_text if title_text else "Bilinmeyen Altyazı"
-            
-            # Dil bilgisini bul (flag sınıfından)
-            flag_element = row.find("span", class_=re.compile(r"flag(tr|en)"))
-            if flag_element:
-                flag_class = flag_element.get("class", [])
-                if "flagtr" in flag_class:
-                    subtitle_info["language"] = "tr"
-                elif "flagen" in flag_class:
-                    subtitle_info["language"] = "en"
-                else:
-                    subtitle_info["language"] = "unknown"
-            else:
-                subtitle_info["language"] = "unknown"
-            
-            # Çevirmen bilgisini bul
-            translator_div = row.find("div", class_="alcevirmen")
-            if translator_div:
-                translator_links = translator_div.find_all("a")
-                translators = []
-                for t_link in translator_links:
-                    t_text = t_link.get_text(strip=True)
-                    if t_text:
-                        translators.append(t_text)
-                subtitle_info["translator"] = " & ".join(translators) if translators else "Bilinmiyor"
-            else:
-                subtitle_info["translator"] = "Bilinmiyor"
-            
-            # İndirme sayısını bul
-            download_div = row.find("div", class_="alindirme")
-            if download_div:
-                download_text = download_div.get_text(strip=True)
-                # Virgül ve nokta karakterlerini temizleyerek sayıya çevir
-                try:
-                    download_count = download_text.replace(",", "").replace(".", "")
-                    subtitle_info["downloads"] = int(download_count) if download_count.isdigit() else 0
-                    subtitle_info["downloads_formatted"] = download_text
-                except:
-                    subtitle_info["downloads"] = 0
-                    subtitle_info["downloads_formatted"] = "0"
-            else:
-                subtitle_info["downloads"] = 0
-                subtitle_info["downloads_formatted"] = "0"
-            
-            # Eğer temel bilgiler varsa listeye ekle
-            if "url" in subtitle_info and "title" in subtitle_info:
-                subtitles.append(subtitle_info)
-                
-        except Exception as e:
-            # Bir satırda hata olursa diğerlerine devam et
-            continue
-    
-    return subtitles
 
-def get_Most_Downloaded_Subtitle(subtitles: List[Dict[str, str]]) -> Dict[str, Optional[Dict[str, str]]]:
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.started = time.monotonic()
+        self.expires_at = self.started + seconds
+        self.stage_name: Optional[str] = None
+        self.stage_expires_at = self.expires_at
+        self.hits: List[str] = []
+
+    def for_stage(self, name: str) -> "Deadline":
+        weights = dict(DEADLINE_STAGES)
+        if name not in weights:
+            return self
+        names = [stage for stage, _ in DEADLINE_STAGES]
+        later = sum(weight for _, weight in DEADLINE_STAGES[names.index(name):])
+        now = time.monotonic()
+        child = Deadline.__new__(Deadline)
+        child.__dict__.update(self.__dict__)
+        child.stage_name = name
+        child.stage_expires_at = now + max(0.0, self.expires_at - now) * weights[name] / later
+        return child
+
+    def remaining(self) -> float:
+        return max(0.0, min(self.expires_at, self.stage_expires_at) - time.monotonic())
+
+    def expire(self) -> None:
+        stage = self.stage_name or "run"
+        self.hits.append(stage)
+        raise DeadlineExceeded(f"süre doldu ({stage})")
+
+    def clip(self, timeout):
+        """İstek zaman aşımını (sayı ya da (bağlantı, okuma) çifti) kalan süreyle sınırlar."""
+        remaining = max(0.001, self.remaining())
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if part is None else min(part, remaining) for part in timeout)
+        return min(timeout, remaining)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"budgetMs": round(self.budget * 1000), "elapsedMs": round((time.monotonic() - self.started) * 1000, 1),
+                "exceeded": list(dict.fromkeys(self.hits))}
+
+
+# run_query/provider_query --deadline ile ayarlar; RunMetrics.stage aşama payını buraya koyar
+_current_deadline: "contextvars.ContextVar[Optional[Deadline]]" = contextvars.ContextVar("ta_deadline", default=None)
+
+
+def check_cancelled() -> None:
+    event = _current_cancel.get()
+    if event is not None and event.is_set():
+        raise Cancelled("iptal edildi")
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.remaining() <= 0:
+        deadline.expire()
+
+
+def _sleep(seconds: float) -> None:
     """
-    En çok indirilen Türkçe ve İngilizce altyazıları döndürür.
-    Döndürülen sözlük formatı:
-    {
-        'turkish': {...} veya None,
-        'english': {...} veya None
-    }
+    time.sleep; etkin iptal olayı işaretlenirse beklemeyi keser ve Cancelled fırlatır. Bekleme
+    etkin süre payını aşacaksa hiç beklemeden DeadlineExceeded fırlatılır.
     """
-    if not subtitles:
-        return {"turkish": None, "english": None}
-    
-    # Türkçe altyazıları filtrele
-    turkish_subs = [sub for sub in subtitles if sub.get("language") == "tr"]
-    # İngilizce altyazıları filtrele
-    english_subs = [sub for sub in subtitles if sub.get("language") == "en"]
-    
-    # En çok indirilen Türkçe altyazı
-    most_downloaded_turkish = None
-    if turkish_subs:
-        most_downloaded_turkish = max(turkish_subs, key=lambda x: x.get("downloads", 0))
-    
-    # En çok indirilen İngilizce altyazı
-    most_downloaded_english = None
-    if english_subs:
-        most_downloaded_english = max(english_subs, key=lambda x: x.get("downloads", 0))
-    
-    return {
-        "turkish": most_downloaded_turkish,
-        "english": most_downloaded_english
-    }
+    deadline = _current_deadline.get()
+    if deadline is not None and seconds >= deadline.remaining():
+        deadline.expire()
+    event = _current_cancel.get()
+    if event is None:
+        time.sleep(seconds)
+    elif event.wait(seconds):
+        raise Cancelled("iptal edildi")
 
 
-def fetch_subtitle_page(session: requests.Session, subtitle_url: str) -> str:
+def _with_cancel(request_func):
     """
-    Altyazı sayfasına istek atıp HTML'i döndürür.
-    subtitle_url: /sub/735846/avengers-endgame.html gibi
+    Wrap requests.Session.request so no new attempt starts once the current cancel event is set
+    or the active deadline has run out; each attempt's timeout is clipped to the time left.
     """
-    if not subtitle_url.startswith("/"):
-        subtitle_url = "/" + subtitle_url
-    
-    full_url = BASE + subtitle_url
-    resp = session.get(full_url)
-    resp.raise_for_status()
-    return resp.text
+    def wrapped(method, url, **kwargs):
+        check_cancelled()
+        deadline = _current_deadline.get()
+        if deadline is None:
+            return request_func(method, url, **kwargs)
+        kwargs["timeout"] = deadline.clip(kwargs.get("timeout"))
+        try:
+            return request_func(method, url, **kwargs)
+        except requests.Timeout:
+            # Kırpılmış zaman aşımı dolduysa bu bir ağ hatası değil, süre bütçesinin sonudur
+            check_cancelled()
+            raise
+    return wrapped
 
 
-def process_most_downloaded_subtitles(session: requests.Session, most_downloaded_result: Dict[str, Optional[Dict[str, str]]]) -> Dict[str, Optional[str]]:
+class RetryPolicy:
     """
-    En çok indirilen altyazıların sayfalarına istek atıp HTML'lerini getirir.
-    
-    Args:
-        session: HTTP session
-        most_downloaded_result: get_Most_Downloaded_Subtitle fonksiyonundan gelen sonuç
-        
-    Returns:
-        {
-            'turkish_html': HTML string veya None,
-            'english_html': HTML string veya None
-        }
+    Sınırlı üstel geri çekilmeli yeniden deneme politikası.
+    n. denemeden önce min(max_backoff, backoff * 2**n) saniyeye kadar rastgele (full jitter) beklenir;
+    yanıt Retry-After taşıyorsa (en fazla max_backoff olmak üzere) ona uyulur.
     """
-    result: Dict[str, Optional[str]] = {
-        "turkish_html": None,
-        "english_html": None
-    }
-    
-    # Türkçe altyazı sayfasını getir
-    turkish_sub = most_downloaded_result.get("turkish")
-    if turkish_sub is not None:
-        try:
-            turkish_url = turkish_sub["url"]
-            print(f"Türkçe altyazı sayfası getiriliyor: {turkish_url}")
-            result["turkish_html"] = fetch_subtitle_page(session, turkish_url)
-            print("✓ Türkçe sayfa başarıyla getirildi")
-        except Exception as e:
-            print(f"✗ Türkçe sayfa getirilemedi: {e}")
-    
-    # İngilizce altyazı sayfasını getir
-    english_sub = most_downloaded_result.get("english")
-    if english_sub is not None:
-        try:
-            english_url = english_sub["url"]
-            print(f"İngilizce altyazı sayfası getiriliyor: {english_url}")
-            result["english_html"] = fetch_subtitle_page(session, english_url)
-            print("✓ İngilizce sayfa başarıyla getirildi")
-        except Exception as e:
-            print(f"✗ İngilizce sayfa getirilemedi: {e}")
-    
-    return result
 
+    RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+    PUSHBACK_STATUSES = frozenset([429, 503])
+    IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
 
-def parse_download_forms(html: str) -> List[Dict[str, str]]:
+    def __init__(self, retries: int = 3, backoff: float = 0.5, max_backoff: float = 30.0):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(self.max_backoff, max(0.0, retry_after))
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After başlığını (saniye ya da HTTP tarihi) saniyeye çevirir."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email_utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _with_retries(request_func, policy: RetryPolicy, limiter: Optional[HostRateLimiter]):
     """
-    Altyazı sayfasındaki download formlarını parse eder.
-    
-    Returns:
-        [{'idid': '736104', 'altid': '735915', 'sidid': '98f7497f2cc091a94da701cf1bb09aac'}, ...]
+    Wrap requests.Session.request with bounded retries for idempotent requests.
+    idempotent=True ile POST gibi istekler de yeniden denenebilir (ör. /ind indirmesi).
+    429/503 yanıtlarında host'un hız sınırlayıcısı yavaşlatılır; olaylar RunMetrics'e yazılır.
     """
-    if not html:
-        return []
-    
-    soup = BeautifulSoup(html, "html.parser")
-    forms = []
-    
-    # action="/ind" olan formları bul
-    download_forms = soup.find_all("form", attrs={"action": "/ind"})
-    
-    for form in download_forms:
-        idid_input = form.find("input", attrs={"name": "idid"})
-        altid_input = form.find("input", attrs={"name": "altid"}) 
-        sidid_input = form.find("input", attrs={"name": "sidid"})
-        
-        if idid_input and altid_input and sidid_input:
-            form_data = {
-                "idid": idid_input.get("value", ""),
-                "altid": altid_input.get("value", ""),
-                "sidid": sidid_input.get("value", "")
-            }
-            forms.append(form_data)
-    
-    return forms
+    def wrapped(method, url, **kwargs):
+        idempotent = kwargs.pop("idempotent", method.upper() in RetryPolicy.IDEMPOTENT_METHODS)
+        retries = policy.retries if idempotent else 0
+        attempt = 0
+        while True:
+            last = attempt >= retries
+            try:
+                resp = request_func(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last:
+                    raise
+                _retry_wait(policy.delay(attempt), attempt, url, error=type(e).__name__)
+                attempt += 1
+                continue
 
+            status = resp.status_code
+            bucket = limiter.bucket(url) if limiter is not None else None
+            if status in RetryPolicy.PUSHBACK_STATUSES and bucket is not None:
+                new_rate = bucket.slow_down()
+                metrics = current_metrics()
+                if metrics is not None:
+                    metrics.record_event("slowdown", url=url, status=status, rate=round(new_rate, 3))
+            elif bucket is not None and status < 400:
+                bucket.speed_up()
 
-def download_from_page_results(session: requests.Session, page_results: Dict[str, Optional[str]], out_dir: str = "./subs") -> Dict[str, Optional[str]]:
+            if last or status not in RetryPolicy.RETRY_STATUSES:
+                return resp
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            resp.close()
+            _retry_wait(policy.delay(attempt, retry_after), attempt, url, status=status)
+            attempt += 1
+    return wrapped
+
+
+def _retry_wait(delay: float, attempt: int, url: str, status: Optional[int] = None,
+                error: Optional[str] = None) -> None:
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.record_retry()
+        metrics.record_event("retry", url=url, attempt=attempt + 1, status=status, error=error,
+                             delayMs=round(delay * 1000))
+    print(f"↻ Yeniden deneniyor ({attempt + 1}. deneme, {status or error}), {delay:.2f} sn bekleniyor: {url}",
+          file=sys.stderr)
+    _sleep(delay)
+
+
+# --profile / --tracemalloc ile ayarlanan aşama başına döküm klasörleri
+PROFILE_DIR: Optional[str] = None
+TRACEMALLOC_DIR: Optional[str] = None
+
+
+class RunMetrics:
     """
-    page_results içindeki HTML'lerden form bilgilerini çıkarıp indirme yapar.
-    
-    Returns:
-        {
-            'turkish_file': dosya yolu veya None,
-            'english_file': dosya yolu veya None
-        }
+    Bir çalıştırmanın (tek sorgu) aşama başına süre, bayt, HTTP durum/yeniden deneme sayıları,
+    önbellek isabetleri ve aday sayılarını toplar; to_dict() tek bir JSON kaydı üretir.
     """
-    result: Dict[str, Optional[str]] = {
-        "turkish_file": None,
-        "english_file": None
-    }
-    
-    # Türkçe altyazı için
-    turkish_html = page_results.get("turkish_html")
-    if turkish_html is not None:
-        try:
-            print("🇹🇷 Türkçe altyazı form bilgileri çıkarılıyor...")
-            turkish_forms = parse_download_forms(turkish_html)
-            
-            if turkish_forms:
-                # İlk formu kullan (genellikle tek form var)
-                form_data = turkish_forms[0]
-                print(f"   Form bilgileri: idid={form_data['idid']}, altid={form_data['altid']}")
-                
-                # POST request at
-                url = f"{BASE}/ind"
-                headers = {
-                    "Referer": f"{BASE}/sub/{form_data['altid']}/",
-                    "Origin": BASE,
-                    "Content-Type": "application/x-www-form-urlencoded"
-                }
-                
-                with session.post(url, data=form_data, headers=headers, stream=True) as r:
-                    r.raise_for_status()
-                    
-                    # Dosya adını belirle
-                    cd = r.headers.get("Content-Disposition", "")
-                    filename = None
-                    m = re.search(r'filename="?([^"]+)"?', cd)
-                    if m:
-                        filename = m.group(1)
-                    else:
-                        filename = f"turkish_{form_data['altid']}.zip"
-                    
-                    # Dosyayı kaydet
-                    os.makedirs(out_dir, exist_ok=True)
-                    filepath = os.path.join(out_dir, sanitize_filename(filename))
-                    
-                    with open(filepath, "wb") as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                    
-                    result["turkish_file"] = filepath
-                    print(f"✓ Türkçe altyazı indirildi: {filepath}")
-            else:
-                print("✗ Türkçe sayfada form bulunamadı")
-                
-        except Exception as e:
-            print(f"✗ Türkçe altyazı indirilemedi: {e}")
-    
-    # İngilizce altyazı için
-    english_html = page_results.get("english_html")
-    if english_html is not None:
+
+    MAX_EVENTS = 50
+
+    def __init__(self, query: str):
+        self.run_id = os.urandom(6).hex()
+        self.query = query
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, object]] = {}
+        self.current_stage = "other"
+        self.cache = {"hit": 0, "revalidated": 0, "miss": 0, "store": 0}
+        self.candidates: Dict[str, int] = {}
+        self.retries = 0
+        self.events: List[Dict[str, object]] = []
+        self.lock = threading.Lock()
+
+    def _stage_entry(self, name: str) -> Dict[str, object]:
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = {"ms": 0.0, "requests": 0, "bytes": 0, "statuses": {}, "retries": 0}
+        return entry
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Bloğun süresini `name` aşamasına yazar; bu sırada yapılan HTTP istekleri de bu aşamaya sayılır."""
+        previous = self.current_stage
+        self.current_stage = name
+        deadline = _current_deadline.get()
+        deadline_token = _current_deadline.set(deadline.for_stage(name)) if deadline is not None else None
+        profiler = cProfile.Profile() if PROFILE_DIR else None
+        if TRACEMALLOC_DIR:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
         try:
-            print("🇺🇸 İngilizce altyazı form bilgileri çıkarılıyor...")
-            english_forms = parse_download_forms(english_html)
-            
-            if english_forms:
-                # İlk formu kullan
-                form_data = english_forms[0]
-                print(f"   Form bilgileri: idid={form_data['idid']}, altid={form_data['altid']}")
-                
-                # POST request at
-                url = f"{BASE}/ind"
-                headers = {
-                    "Referer": f"{BASE}/sub/{form_data['altid']}/",
-                    "Origin": BASE,
-                    "Content-Type": "application/x-www-form-urlencoded"
-                }
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                entry = self._stage_entry(name)
+                entry["ms"] = round(entry["ms"] + elapsed * 1000, 3)  # type: ignore[operator]
+                if TRACEMALLOC_DIR:
+                    entry["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            self.current_stage = previous
+            if deadline_token is not None:
+                _current_deadline.reset(deadline_token)
+            self._dump(name, profiler)
+
+    def _dump(self, name: str, profiler: Optional[cProfile.Profile]) -> None:
+        prefix = f"{self.run_id}-{name}"
+        if profiler is not None and PROFILE_DIR:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.dump_stats(os.path.join(PROFILE_DIR, f"{prefix}.prof"))
+        if TRACEMALLOC_DIR:
+            os.makedirs(TRACEMALLOC_DIR, exist_ok=True)
+            tracemalloc.take_snapshot().dump(os.path.join(TRACEMALLOC_DIR, f"{prefix}.tracemalloc"))
+
+    def record_request(self, status: Optional[int], nbytes: int) -> None:
+        with self.lock:
+            entry = self._stage_entry(self.current_stage)
+            entry["requests"] += 1  # type: ignore[operator]
+            entry["bytes"] += nbytes  # type: ignore[operator]
+            statuses = entry["statuses"]
+            key = str(status) if status is not None else "error"
+            statuses[key] = statuses.get(key, 0) + 1  # type: ignore[union-attr]
+
+    def add_bytes(self, nbytes: int) -> None:
+        with self.lock:
+            entry = self._stage_entry(self.current_stage)
+            entry["bytes"] += nbytes  # type: ignore[operator]
+
+    def record_retry(self) -> None:
+        with self.lock:
+            self.retries += 1
+            entry = self._stage_entry(self.current_stage)
+            entry["retries"] += 1  # type: ignore[operator]
+
+    def record_event(self, kind: str, **fields) -> None:
+        """Yeniden deneme / yavaşlama gibi olayları kaydeder (ilk MAX_EVENTS tanesi tutulur)."""
+        with self.lock:
+            if len(self.events) < self.MAX_EVENTS:
+                event = {"event": kind, "stage": self.current_stage,
+                         "atMs": round((time.perf_counter() - self.started) * 1000, 3)}
+                event.update({key: value for key, value in fields.items() if value is not None})
+                self.events.append(event)
+
+    def record_cache(self, outcome: str) -> None:
+        with self.lock:
+            self.cache[outcome] += 1
+
+    def to_dict(self) -> Dict[str, object]:
+        stages = self.stages
+        return {
+            "runId": self.run_id,
+            "query": self.query,
+            "startedAt": self.started_at,
+            "wallMs": round((time.perf_counter() - self.started) * 1000, 3),
+            "stages": stages,
+            "http": {
+                "requests": sum(stage["requests"] for stage in stages.values()),  # type: ignore[misc]
+                "bytes": sum(stage["bytes"] for stage in stages.values()),  # type: ignore[misc]
+                "retries": self.retries,
+                "slowdowns": sum(1 for event in self.events if event["event"] == "slowdown"),
+            },
+            "cache": dict(self.cache),
+            "candidates": dict(self.candidates),
+            "events": list(self.events),
+        }
+
+
+_current_metrics: "contextvars.ContextVar[Optional[RunMetrics]]" = contextvars.ContextVar("ta_metrics", default=None)
+
+
+def current_metrics() -> Optional[RunMetrics]:
+    return _current_metrics.get()
+
+
+@contextlib.contextmanager
+def metrics_stage(name: str):
+    """Etkin bir RunMetrics varsa aşamayı ölçer, yoksa hiçbir şey yapmaz."""
+    metrics = current_metrics()
+    if metrics is None:
+        yield
+        return
+    with metrics.stage(name):
+        yield
+
+
+def _with_metrics(request_func):
+    """Wrap requests.Session.request so every response's status and size land in the current RunMetrics."""
+    def wrapped(method, url, **kwargs):
+        metrics = current_metrics()
+        if metrics is None:
+            return request_func(method, url, **kwargs)
+        try:
+            resp = request_func(method, url, **kwargs)
+        except requests.RequestException:
+            metrics.record_request(None, 0)
+            raise
+        # Akış (stream) yanıtlarının gövdesi okunurken post_download_form bayt ekler
+        nbytes = 0 if kwargs.get("stream") else len(resp.content)
+        metrics.record_request(resp.status_code, nbytes)
+        return resp
+    return wrapped
+
+
+def _open_db(path: str) -> sqlite3.Connection:
+    """İş parçacıkları arasında paylaşılabilen (çağıran kilitler) bir SQLite bağlantısı açar."""
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+class ResponseCache:
+    """
+    GET yanıtları için SQLite tabanlı kalıcı önbellek.
+
+    Anahtar, normalize edilmiş URL + parametrelerdir. Süresi (ttl) dolan kayıtlar ETag /
+    Last-Modified varsa koşullu istekle yeniden doğrulanır; toplam boyut max_bytes'ı aşınca
+    en uzun süredir kullanılmayan kayıtlar silinir.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = 24 * 60 * 60,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = _open_db(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, url TEXT NOT NULL, body BLOB NOT NULL, size INTEGER NOT NULL,"
+            " etag TEXT, last_modified TEXT, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.conn.commit()
+
+    @staticmethod
+    def normalize_url(url: str, params: Optional[Dict[str, str]] = None) -> str:
+        parts = urllib.parse.urlsplit(url)
+        query = urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        query.extend((params or {}).items())
+        query.sort()
+        return urllib.parse.urlunsplit((
+            parts.scheme.lower(),
+            parts.netloc.lower(),
+            parts.path or "/",
+            urllib.parse.urlencode(query),
+            "",
+        ))
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        body, etag, last_modified, stored_at = row
+        return {
+            "text": body.decode("utf-8"),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": (time.time() - stored_at) < self.ttl,
+        }
+
+    def put(self, key: str, url: str, text: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        body = text.encode("utf-8")
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, body, size, etag, last_modified, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, body, len(body), etag, last_modified, now, now),
+            )
+            self._evict()
+            self.conn.commit()
+
+    def touch(self, key: str) -> None:
+        """304 yanıtından sonra kaydın tazelik süresini yeniler."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self.conn.commit()
+
+    def _evict(self) -> None:
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+
+def normalize_query(query: str) -> str:
+    """Sorguyu indeks anahtarı olarak kullanmak için normalize eder (NFKC, boşluk, büyük/küçük harf)."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip().casefold()
+
+
+class ResolutionIndex:
+    """
+    Sorgu → altyazı çözümlemelerini saklayan kalıcı SQLite indeksi.
+
+    Her (sorgu, dil) için seçilen altyazı sayfası, indirme sayısı, /ind form verisi ve indirilen
+    dosyanın özeti tutulur; böylece sonraki çalıştırmalar arama ve sayfa adımlarını atlayıp
+    doğrudan /ind'e gidebilir. Sonuç bulunamayan (sorgu, dil) çiftleri miss_ttl süresince
+    hiç aranmaz.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, miss_ttl: float = 3 * 24 * 60 * 60):
+        self.path = path
+        self.miss_ttl = miss_ttl
+        self.lock = threading.Lock()
+        self.conn = _open_db(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS resolutions ("
+            " query TEXT NOT NULL, lang TEXT NOT NULL, url TEXT NOT NULL, downloads INTEGER NOT NULL,"
+            " form TEXT NOT NULL, file_hash TEXT, resolved_at REAL NOT NULL, PRIMARY KEY (query, lang))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS misses ("
+            " query TEXT NOT NULL, lang TEXT NOT NULL, expires_at REAL NOT NULL, PRIMARY KEY (query, lang))"
+        )
+        self.conn.commit()
+
+    def lookup(self, query: str, langs: List[str]) -> Dict[str, Dict[str, object]]:
+        key = normalize_query(query)
+        found: Dict[str, Dict[str, object]] = {}
+        with self.lock:
+            for lang in langs:
+                row = self.conn.execute(
+                    "SELECT url, downloads, form, file_hash FROM resolutions WHERE query = ? AND lang = ?",
+                    (key, lang),
+                ).fetchone()
+                if row is not None:
+                    url, downloads, form, file_hash = row
+                    found[lang] = {"url": url, "downloads": downloads, "form": json.loads(form), "file_hash": file_hash}
+        return found
+
+    def misses(self, query: str, langs: List[str]) -> List[str]:
+        key = normalize_query(query)
+        now = time.time()
+        with self.lock:
+            return [
+                lang for lang in langs
+                if self.conn.execute(
+                    "SELECT 1 FROM misses WHERE query = ? AND lang = ? AND expires_at > ?", (key, lang, now)
+                ).fetchone()
+            ]
+
+    def record(self, query: str, lang: str, url: str, downloads: int,
+               form: Dict[str, str], file_hash: Optional[str]) -> None:
+        key = normalize_query(query)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO resolutions (query, lang, url, downloads, form, file_hash, resolved_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, lang, url, downloads, json.dumps(form), file_hash, time.time()),
+            )
+            self.conn.execute("DELETE FROM misses WHERE query = ? AND lang = ?", (key, lang))
+            self.conn.commit()
+
+    def record_miss(self, query: str, lang: str) -> None:
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO misses (query, lang, expires_at) VALUES (?, ?, ?)",
+                (normalize_query(query), lang, time.time() + self.miss_ttl),
+            )
+            self.conn.commit()
+
+    def forget(self, query: str, lang: str) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM resolutions WHERE query = ? AND lang = ?", (normalize_query(query), lang))
+            self.conn.commit()
+
+
+# Sahibi askıda kalan bir kiralama en geç bu süre sonra geçersiz sayılır; bekleyenler bu aralıkla yoklar
+LEASE_TTL = 10 * 60
+LEASE_POLL = 0.5
+_lease_ids = itertools.count(1)
+
+
+class FlightLeases:
+    """
+    Süreçler arası tek uçuş: aynı (normalize sorgu, dil) için aynı anda yalnızca bir çalıştırma.
+
+    Kiralamalar SQLite'ta tutulur ve bir işin bütün dilleri tek işlemde ya hep ya hiç alınır; kısmi
+    alıp bekleme olmadığı için iki iş birbirini kilitleyemez. Bekleyen iş, ilk iş bitince yeniden
+    dener ve sonucu indeks ile depodan istek atmadan alır. Aynı makinede sahibinin süreci ölmüş ya da
+    süresi (ttl) dolmuş kiralamalar bayat sayılıp devralınır. Tutulan kiralamanın süresi ttl/3'te bir
+    uzatılır; böylece ttl'den uzun süren bir iş ortasında devralınmaz, ttl yalnızca uzatamayan
+    (ör. başka makinede kaybolan) sahipler için geçerlidir.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEASE_PATH, ttl: float = LEASE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.host = socket.gethostname()
+        self.lock = threading.Lock()
+        self.conn = _open_db(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            " query TEXT NOT NULL, lang TEXT NOT NULL, owner TEXT NOT NULL, host TEXT NOT NULL, pid INTEGER NOT NULL,"
+            " acquired_at REAL NOT NULL, expires_at REAL NOT NULL, PRIMARY KEY (query, lang))"
+        )
+        self.conn.commit()
+
+    def _stale(self, host: str, pid: int, expires_at: float, now: float) -> bool:
+        if expires_at <= now:
+            return True
+        if host != self.host:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    def try_acquire(self, query: str, langs: List[str], owner: str) -> List[Tuple[str, str]]:
+        """
+        Dillerin hepsini owner adına almayı dener. Başarılıysa boş liste, değilse kiralamayı tutan
+        (dil, sahip) çiftleri döner ve hiçbir dil alınmaz.
+        """
+        key = normalize_query(query)
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                blockers = []
+                for lang in langs:
+                    row = self.conn.execute(
+                        "SELECT owner, host, pid, expires_at FROM leases WHERE query = ? AND lang = ?", (key, lang)
+                    ).fetchone()
+                    if row is not None and row[0] != owner and not self._stale(row[1], row[2], row[3], now):
+                        blockers.append((lang, str(row[0])))
+                if not blockers:
+                    self.conn.executemany(
+                        "INSERT OR REPLACE INTO leases (query, lang, owner, host, pid, acquired_at, expires_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [(key, lang, owner, self.host, os.getpid(), now, now + self.ttl) for lang in langs],
+                    )
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+        return blockers
+
+    def renew(self, query: str, langs: List[str], owner: str) -> None:
+        key = normalize_query(query)
+        expires_at = time.time() + self.ttl
+        with self.lock:
+            self.conn.executemany("UPDATE leases SET expires_at = ? WHERE query = ? AND lang = ? AND owner = ?",
+                                  [(expires_at, key, lang, owner) for lang in langs])
+            self.conn.commit()
+
+    def _keep_alive(self, query: str, langs: List[str], owner: str, stop: threading.Event) -> None:
+        while not stop.wait(self.ttl / 3):
+            try:
+                self.renew(query, langs, owner)
+            except sqlite3.Error as e:
+                # Bir sonraki turda yeniden denenir; ttl'nin üçte ikisi daha pay var
+                print(f"⚠️ Kiralama uzatılamadı ({query}): {e}", file=sys.stderr)
+
+    def release(self, query: str, langs: List[str], owner: str) -> None:
+        key = normalize_query(query)
+        with self.lock:
+            self.conn.executemany("DELETE FROM leases WHERE query = ? AND lang = ? AND owner = ?",
+                                  [(key, lang, owner) for lang in langs])
+            self.conn.commit()
+
+    @contextlib.contextmanager
+    def hold(self, query: str, langs: List[str]):
+        """
+        Kiralamaları alana kadar bekler (iptal edilebilir), blok bitince bırakır. Bekleme olduysa
+        etkin RunMetrics'e 'flight_wait' olayı yazılır.
+        """
+        owner = f"{self.host}:{os.getpid()}:{next(_lease_ids)}"
+        waited_since: Optional[float] = None
+        holder = None
+        while True:
+            blockers = self.try_acquire(query, langs, owner)
+            if not blockers:
+                break
+            if waited_since is None:
+                waited_since = time.perf_counter()
+                holder = blockers[0][1]
+                held = ", ".join(lang for lang, _ in blockers)
+                print(f"⏳ '{query}' ({held}) başka bir işte indiriliyor; sonucu bekleniyor...")
+            _sleep(LEASE_POLL)
+        metrics = current_metrics()
+        if waited_since is not None and metrics is not None:
+            metrics.record_event("flight_wait", holder=holder,
+                                 ms=round((time.perf_counter() - waited_since) * 1000, 1))
+        stop = threading.Event()
+        renewer = threading.Thread(target=self._keep_alive, args=(query, langs, owner, stop),
+                                   name="flight-lease", daemon=True)
+        renewer.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            renewer.join()
+            self.release(query, langs, owner)
+
+
+def subtitle_digest(data: bytes) -> str:
+    """Normalize edilmiş metnin SHA-256'sı: BOM, satır sonu biçimi ve satır sonu boşlukları yok sayılır."""
+    text = data.decode("utf-8", "surrogateescape").lstrip("\ufeff")
+    lines = [line.rstrip() for line in text.splitlines()]
+    while lines and not lines[-1]:
+        lines.pop()
+    return hashlib.sha256("\n".join(lines).encode("utf-8", "surrogateescape")).hexdigest()
+
+
+class SubtitleStore:
+    """
+    İçerik adresli altyazı deposu. Her altyazı normalize metninin özetiyle objects/<ab>/<özet><uzantı>
+    altında bir kez tutulur; kullanım yerlerine (çıktı klasörü, media/) sabit bağlantı olarak konur,
+    farklı dosya sisteminde kopyalanır. Hangi altid'in hangi nesneleri verdiği de saklanır; aynı
+    altyazıya çözümlenen sonraki sorgular sayfa ve indirme adımlarını atlar.
+
+    gc() hiçbir yere bağlı olmayan ve min_age'den uzun süredir kullanılmayan nesneleri siler.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_DIR):
+        self.path = path
+        self.objects_dir = os.path.join(path, "objects")
+        self.lock = threading.Lock()
+        self.conn = _open_db(os.path.join(path, "store.sqlite"))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            " altid TEXT NOT NULL, lang TEXT NOT NULL, position INTEGER NOT NULL, digest TEXT NOT NULL,"
+            " ext TEXT NOT NULL, info TEXT NOT NULL, PRIMARY KEY (altid, lang, position))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS placements ("
+            " path TEXT PRIMARY KEY, digest TEXT NOT NULL, ext TEXT NOT NULL, placed_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def object_path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest + ext)
+
+    def put(self, data: bytes, ext: str) -> str:
+        """İçeriği depoya ekler (zaten varsa yalnızca kullanım zamanını yeniler) ve özetini döndürür."""
+        digest = subtitle_digest(data)
+        target = self.object_path(digest, ext)
+        if os.path.exists(target):
+            os.utime(target)
+            if ext == ".vtt" and CueIndex.load(target) is None:
+                write_cue_index(target)
+            return digest
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+        if ext == ".vtt":
+            write_cue_index(target, data)
+        return digest
+
+    def read(self, digest: str, ext: str) -> bytes:
+        with open(self.object_path(digest, ext), "rb") as f:
+            return f.read()
+
+    def place(self, digest: str, ext: str, dest: str) -> str:
+        """
+        Nesneyi dest'e sabit bağlantı olarak koyar (dest varsa atomik olarak değiştirilir).
+        Bağlantı kurulamazsa (farklı dosya sistemi vb.) kopyalar. .vtt nesnelerinin ipucu indeksi
+        de aynı şekilde dest'in yanına konur.
+        """
+        source = self.object_path(digest, ext)
+        os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+        tmp_path = f"{dest}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.link(source, tmp_path)
+            linked = True
+        except OSError:
+            with open(source, "rb") as src, open(tmp_path, "wb") as out:
+                out.write(src.read())
+            linked = False
+        os.replace(tmp_path, dest)
+        if ext == ".vtt":
+            self._place_cue_index(source, dest, linked)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO placements (path, digest, ext, placed_at) VALUES (?, ?, ?, ?)",
+                (os.path.abspath(dest), digest, ext, time.time()),
+            )
+            self.conn.commit()
+        return dest
+
+    @staticmethod
+    def _place_cue_index(source: str, dest: str, linked: bool) -> None:
+        # Sabit bağlantıda inode aynı olduğundan nesnenin sidecar'ı dest için de geçerlidir
+        if linked and (CueIndex.load(source) is not None or write_cue_index(source)):
+            tmp_path = f"{dest}{CUE_INDEX_SUFFIX}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                os.link(source + CUE_INDEX_SUFFIX, tmp_path)
+                os.replace(tmp_path, dest + CUE_INDEX_SUFFIX)
+                return
+            except OSError:
+                pass
+        write_cue_index(dest)
+
+    def remember(self, altid: str, lang: str, items: List[Dict[str, object]]) -> None:
+        """altid'in verdiği altyazıları (sırasıyla) kaydeder."""
+        with self.lock:
+            self.conn.execute("DELETE FROM sources WHERE altid = ? AND lang = ?", (altid, lang))
+            for position, item in enumerate(items):
+                info = {key: item[key] for key in ("format", "charset", "cues", "timing") if key in item}
+                self.conn.execute(
+                    "INSERT INTO sources (altid, lang, position, digest, ext, info) VALUES (?, ?, ?, ?, ?, ?)",
+                    (altid, lang, position, item["sha256"], item["ext"], json.dumps(info)),
+                )
+            self.conn.commit()
+
+    def recall(self, altid: str, lang: str) -> Optional[List[Dict[str, object]]]:
+        """altid için depodaki altyazıları içerikleriyle döndürür; kayıt yoksa ya da bir nesne silinmişse None."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT digest, ext, info FROM sources WHERE altid = ? AND lang = ? ORDER BY position", (altid, lang)
+            ).fetchall()
+        items: List[Dict[str, object]] = []
+        for digest, ext, info in rows:
+            try:
+                data = self.read(digest, ext)
+            except FileNotFoundError:
+                return None
+            os.utime(self.object_path(digest, ext))
+            items.append({"sha256": digest, "ext": ext, "data": data, **json.loads(info)})
+        return items or None
+
+    def gc(self, min_age: float = 7 * 24 * 60 * 60) -> Dict[str, int]:
+        """
+        Yerinden silinmiş ya da başka içerikle değiştirilmiş yerleşim kayıtlarını temizler, sonra
+        hiçbir yerleşimi kalmamış ve min_age saniyedir kullanılmamış nesneleri siler.
+        """
+        removed = {"placements": 0, "objects": 0, "bytes": 0}
+        now = time.time()
+        with self.lock:
+            live: Dict[str, int] = {}
+            for path, digest, ext in self.conn.execute("SELECT path, digest, ext FROM placements").fetchall():
+                try:
+                    placed = os.stat(path)
+                    source = os.stat(self.object_path(digest, ext))
+                    same = placed.st_ino == source.st_ino and placed.st_dev == source.st_dev
+                    if not same:
+                        # Kopyalanmış yerleşim: içerik hâlâ aynıysa canlı sayılır
+                        with open(path, "rb") as f:
+                            same = subtitle_digest(f.read()) == digest
+                except OSError:
+                    same = False
+                if same:
+                    live[digest + ext] = live.get(digest + ext, 0) + 1
+                else:
+                    self.conn.execute("DELETE FROM placements WHERE path = ?", (path,))
+                    removed["placements"] += 1
+                    if not os.path.exists(path):
+                        with contextlib.suppress(FileNotFoundError):
+                            os.remove(path + CUE_INDEX_SUFFIX)
+
+            for root, _dirs, files in os.walk(self.objects_dir):
+                for name in files:
+                    if name.endswith(CUE_INDEX_SUFFIX):
+                        continue  # nesnesiyle birlikte silinir
+                    object_path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(object_path)
+                    except FileNotFoundError:
+                        continue
+                    if name in live or stat.st_nlink > 1 or now - stat.st_mtime < min_age:
+                        continue
+                    if name.endswith(".tmp"):
+                        # Yarım kalmış yazma
+                        os.remove(object_path)
+                        continue
+                    os.remove(object_path)
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(object_path + CUE_INDEX_SUFFIX)
+                    digest = name.split(".", 1)[0]
+                    self.conn.execute("DELETE FROM sources WHERE digest = ?", (digest,))
+                    removed["objects"] += 1
+                    removed["bytes"] += stat.st_size
+            self.conn.commit()
+        return removed
+
+
+def cached_get(session: requests.Session, url: str, params: Optional[Dict[str, str]] = None) -> str:
+    """
+    session.response_cache tanımlıysa GET yanıtını önbellekten döndürür, süresi dolmuşsa
+    koşullu istekle doğrular; önbellek yoksa düz bir GET yapar.
+    """
+    cache: Optional[ResponseCache] = getattr(session, "response_cache", None)
+    if cache is None:
+        resp = session.get(url, params=params)
+        resp.raise_for_status()
+        return resp.text
+
+    metrics = current_metrics()
+    normalized = ResponseCache.normalize_url(url, params)
+    key = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+    entry = cache.get(key)
+    if entry is not None and entry["fresh"]:
+        if metrics is not None:
+            metrics.record_cache("hit")
+        return entry["text"]  # type: ignore[return-value]
+
+    headers = {}
+    if entry is not None:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    resp = session.get(url, params=params, headers=headers)
+    if entry is not None and resp.status_code == 304:
+        cache.touch(key)
+        if metrics is not None:
+            metrics.record_cache("revalidated")
+        return entry["text"]  # type: ignore[return-value]
+    if metrics is not None:
+        metrics.record_cache("miss")
+    resp.raise_for_status()
+    cache.put(key, normalized, resp.text, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+    return resp.text
+
+
+def search_query(session: requests.Session, query: str) -> str:
+    params = {"cat": "sub", "find": query}
+    url = f"{BASE}/find.php"
+    return cached_get(session, url, params)
+
+
+
+# --- Hızlı HTML çıkarımı -------------------------------------------------------
+#
+# Aşağıdaki ayrıştırıcılar BeautifulSoup ağacı kurmadan, html.parser olaylarını tek geçişte
+# işler ve yalnızca altsonsez satırlarını ve /ind formlarını ilgilendiren parçaları tutar.
+# Ağaç kurma kuralları (kapanış etiketinin en yakın açık etikete kadar açık etiketleri kapatması,
+# boş elemanlar, script/style metinlerinin get_text'e girmemesi, karakter referansları)
+# BeautifulSoup'un html.parser davranışıyla birebir aynı tutulur; çıktılar bs4 sürümleriyle aynıdır.
+
+_VOID_ELEMENTS = frozenset([
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image",
+    "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source",
+    "spacer", "track", "wbr",
+])
+# Bu etiketlerin içindeki metinler BeautifulSoup'ta get_text() sonucuna girmez
+_NON_TEXT_CONTAINERS = frozenset(["rt", "rp", "style", "script", "template"])
+_ENTITY_TO_CHARACTER: Dict[str, str] = {}
+
+
+def _entity_to_character(name: str) -> Optional[str]:
+    if not _ENTITY_TO_CHARACTER:
+        for name_with_semicolon, character in sorted(html.entities.html5.items()):
+            key = name_with_semicolon[:-1] if name_with_semicolon.endswith(";") else name_with_semicolon
+            _ENTITY_TO_CHARACTER.setdefault(key, character)
+    return _ENTITY_TO_CHARACTER.get(name)
+
+
+def _numeric_reference(number: int) -> str:
+    if number == 0 or number > 0x10FFFF or 0xD800 <= number <= 0xDFFF:
+        return "\ufffd"
+    if 0x80 <= number <= 0x9F:
+        try:
+            return bytes([number]).decode("cp1252")
+        except UnicodeDecodeError:
+            pass
+    return chr(number)
+
+
+def _text_of(strings: List[str]) -> str:
+    """BeautifulSoup get_text(strip=True) karşılığı."""
+    return "".join(part for part in (string.strip() for string in strings) if part)
+
+
+class _Element:
+    __slots__ = ("tag", "attrs", "strings", "first_a", "first_heading")
+
+    def __init__(self, tag: str, attrs: Dict[str, str]):
+        self.tag = tag
+        self.attrs = attrs
+        self.strings: Optional[List[str]] = None  # metni toplanan elemanlar için
+        self.first_a: Optional["_Element"] = None
+        self.first_heading: Optional["_Element"] = None
+
+
+class _StreamingExtractor(HTMLParser):
+    """
+    Açık eleman yığınını ve metin parçalarını BeautifulSoup ile aynı kurallarla takip eden temel sınıf.
+    Alt sınıflar on_start / on_end kancalarını kullanır; metni gereken elemanlar capture() ile işaretlenir.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.root = _Element("[document]", {})
+        self.stack: List[_Element] = [self.root]
+        self.open_counts: Dict[str, int] = {}
+        self.capturing: List[_Element] = []
+        self.pending: List[str] = []
+        self.non_text_depth = 0
+
+    def parse(self, markup: str) -> None:
+        self.feed(markup)
+        self.close()
+        self.flush()
+
+    def capture(self, element: _Element) -> None:
+        if element.strings is None:
+            element.strings = []
+            self.capturing.append(element)
+
+    def flush(self, text_allowed: Optional[bool] = None) -> None:
+        if not self.pending:
+            return
+        data = "".join(self.pending)
+        self.pending = []
+        if text_allowed is None:
+            text_allowed = self.non_text_depth == 0
+        if text_allowed:
+            for element in self.capturing:
+                element.strings.append(data)  # type: ignore[union-attr]
+
+    def on_start(self, element: _Element) -> None:
+        pass
+
+    def on_end(self, element: _Element) -> None:
+        pass
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs)
+        if tag in _VOID_ELEMENTS:
+            self._pop_to(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs)
+        self._pop_to(tag)
+
+    def handle_endtag(self, tag):
+        self.flush()
+        self._pop_to(tag)
+
+    def _start(self, tag, attrs) -> None:
+        self.flush()
+        attr_dict: Dict[str, str] = {}
+        for key, value in attrs:
+            attr_dict[key] = "" if value is None else value
+        element = _Element(tag, attr_dict)
+        self.stack.append(element)
+        self.open_counts[tag] = self.open_counts.get(tag, 0) + 1
+        if tag in _NON_TEXT_CONTAINERS:
+            self.non_text_depth += 1
+        self.on_start(element)
+
+    def _pop_to(self, tag: str) -> None:
+        if not self.open_counts.get(tag):
+            return
+        while len(self.stack) > 1:
+            element = self.stack.pop()
+            self.open_counts[element.tag] -= 1
+            if element.tag in _NON_TEXT_CONTAINERS:
+                self.non_text_depth -= 1
+            if element.strings is not None:
+                self.capturing.remove(element)
+            self.on_end(element)
+            if element.tag == tag:
+                break
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_charref(self, name):
+        base, digits = (16, name[1:]) if name[:1] in ("x", "X") else (10, name)
+        try:
+            self.pending.append(_numeric_reference(int(digits, base)))
+        except ValueError:
+            match = re.match(r"([0-9a-f]+)(.*)" if base == 16 else r"([0-9]+)(.*)", digits)
+            if match is None:
+                self.pending.append(digits)
+            else:
+                self.pending.append(_numeric_reference(int(match.group(1), base)))
+                self.pending.append(match.group(2))
+
+    def handle_entityref(self, name):
+        character = _entity_to_character(name)
+        self.pending.append(character if character is not None else "&%s" % name)
+
+    def _separate_string(self, data: str, text_allowed: bool) -> None:
+        self.flush()
+        self.pending.append(data)
+        self.flush(text_allowed)
+
+    def handle_comment(self, data):
+        self._separate_string(data, False)
+
+    def handle_decl(self, decl):
+        self._separate_string(decl, False)
+
+    def handle_pi(self, data):
+        self._separate_string(data, False)
+
+    def unknown_decl(self, data):
+        if data.upper().startswith("CDATA["):
+            self._separate_string(data[len("CDATA["):], True)
+        else:
+            self._separate_string(data, False)
+
+
+def _classes(element: _Element) -> List[str]:
+    return element.attrs.get("class", "").split()
+
+
+def _class_matches(element: _Element, pattern) -> bool:
+    if "class" not in element.attrs:
+        return False
+    classes = _classes(element)
+    return any(pattern.search(c) for c in classes) or bool(pattern.search(" ".join(classes)))
+
+
+_ROW_CLASS_RE = re.compile(r"altsonsez|row-class")
+_SUB_HREF_RE = re.compile(r"\d+/.*\.html")
+_FLAG_CLASS_RE = re.compile(r"flag(tr|en)")
+
+
+class _SubsRowExtractor(_StreamingExtractor):
+    """parse_Subs için yalnızca altsonsez satırlarının gerekli alanlarını toplar."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows: List[Dict[str, object]] = []
+        self.open_rows: List[Dict[str, object]] = []
+        self.closed = 0  # rows[:closed] tamamlandı (en dıştaki satır kapandı)
+
+    def on_start(self, element: _Element) -> None:
+        tag = element.tag
+        if self.open_rows:
+            if tag == "a":
+                href = element.attrs.get("href")
+                for row in self.open_rows:
+                    if row["link"] is None and href is not None and _SUB_HREF_RE.search(href):
+                        row["link"] = element
+                        self.capture(element)
+                    translator = row["translator"]
+                    if translator is not None and translator in self.stack:
+                        row["translator_links"].append(element)  # type: ignore[union-attr]
+                        self.capture(element)
+            elif tag == "span":
+                for row in self.open_rows:
+                    if row["flag"] is None and _class_matches(element, _FLAG_CLASS_RE):
+                        row["flag"] = element
+            elif tag == "div":
+                classes = _classes(element) if "class" in element.attrs else None
+                if classes is not None:
+                    for row in self.open_rows:
+                        if row["translator"] is None and "alcevirmen" in classes:
+                            row["translator"] = element
+                        if row["downloads"] is None and "alindirme" in classes:
+                            row["downloads"] = element
+                            self.capture(element)
+        if tag == "div" and _class_matches(element, _ROW_CLASS_RE):
+            row: Dict[str, object] = {
+                "element": element, "link": None, "flag": None,
+                "translator": None, "translator_links": [], "downloads": None,
+            }
+            self.rows.append(row)
+            self.open_rows.append(row)
+
+    def on_end(self, element: _Element) -> None:
+        if self.open_rows and self.open_rows[-1]["element"] is element:
+            self.open_rows.pop()
+            if not self.open_rows:
+                self.closed = len(self.rows)
+
+    def iter_rows(self, markup: str, chunk_size: int = 65536) -> Iterable[Dict[str, object]]:
+        """
+        Sayfayı parça parça besler ve tamamlanan satırları sırayla üretir; üretilen satırlar
+        bırakılır, böylece büyük sonuç sayfalarında bellekte yalnızca açık satırlar kalır.
+        """
+        for start in range(0, len(markup), chunk_size):
+            self.feed(markup[start:start + chunk_size])
+            if self.closed:
+                done, self.rows, self.closed = self.rows[:self.closed], self.rows[self.closed:], 0
+                yield from done
+        self.close()
+        self.flush()
+        yield from self.rows
+        self.rows = []
+
+
+class _FormExtractor(_StreamingExtractor):
+    """action="/ind" formlarını ve (isteğe bağlı) parse_candidates için başlık ipuçlarını toplar."""
+
+    def __init__(self, track_titles: bool = False):
+        super().__init__()
+        self.track_titles = track_titles
+        self.forms: List[Dict[str, object]] = []
+        self.open_forms: List[Dict[str, object]] = []
+
+    def on_start(self, element: _Element) -> None:
+        tag = element.tag
+        if self.track_titles:
+            if tag == "a":
+                self._mark_first(element, "first_a")
+            elif tag in ("strong", "b", "h3", "h4"):
+                self._mark_first(element, "first_heading")
+        if tag == "input" and self.open_forms:
+            name = element.attrs.get("name")
+            if name in ("idid", "altid", "sidid"):
+                for form in self.open_forms:
+                    form["inputs"].setdefault(name, element.attrs.get("value", ""))  # type: ignore[union-attr]
+        if tag == "form" and element.attrs.get("action") == "/ind":
+            form: Dict[str, object] = {"element": element, "inputs": {}}
+            if self.track_titles:
+                parent = self.stack[-2]
+                grandparent = self.stack[-3] if len(self.stack) > 2 else None
+                form["context"] = [element, parent, grandparent]
+            self.forms.append(form)
+            self.open_forms.append(form)
+
+    def _mark_first(self, element: _Element, slot: str) -> None:
+        # Yığının üstünden aşağı doğru, ilk kez bu türden bir eleman gören atalar işaretlenir.
+        # Bir ata zaten işaretliyse daha alttakiler de işaretlidir.
+        marked = False
+        for ancestor in reversed(self.stack[:-1]):
+            if getattr(ancestor, slot) is not None:
+                break
+            setattr(ancestor, slot, element)
+            marked = True
+        if marked:
+            self.capture(element)
+
+    def on_end(self, element: _Element) -> None:
+        if self.open_forms and self.open_forms[-1]["element"] is element:
+            self.open_forms.pop()
+
+
+class SubtitleCandidate:
+    """
+    Arama sayfasındaki tek altyazı satırı. Satır başına sözlük yerine sabit alanlı kayıt tutulur;
+    sözlük bekleyen çağıranlar için get(), [] ve to_dict() parse_Subs çıktısıyla aynı anahtarları verir.
+    """
+
+    __slots__ = ("url", "title", "language", "translator", "downloads", "downloads_formatted")
+
+    def __init__(self, url: str, title: str, language: str = "unknown", translator: str = "Bilinmiyor",
+                 downloads: int = 0, downloads_formatted: str = "0"):
+        self.url = url
+        self.title = title
+        self.language = language
+        self.translator = translator
+        self.downloads = downloads
+        self.downloads_formatted = downloads_formatted
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "SubtitleCandidate":
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})  # type: ignore[arg-type]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SubtitleCandidate):
+            return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SubtitleCandidate({self.language}, {self.url!r}, downloads={self.downloads})"
+
+
+def _candidate_from_row(row: Dict[str, object]) -> Optional[SubtitleCandidate]:
+    link = row["link"]
+    if link is None:
+        return None
+    href = link.attrs.get("href", "")  # type: ignore[union-attr]
+    if not href:
+        return None
+    url = href if href.startswith("/sub/") else "/sub/" + href.lstrip("/")
+    title = _text_of(link.strings) or "Bilinmeyen Altyazı"  # type: ignore[union-attr]
+
+    language = "unknown"
+    flag = row["flag"]
+    if flag is not None:
+        flag_classes = _classes(flag)  # type: ignore[arg-type]
+        if "flagtr" in flag_classes:
+            language = "tr"
+        elif "flagen" in flag_classes:
+            language = "en"
+
+    translator = "Bilinmiyor"
+    if row["translator"] is not None:
+        translators = [t for t in (_text_of(a.strings) for a in row["translator_links"]) if t]  # type: ignore[union-attr]
+        if translators:
+            translator = " & ".join(translators)
+
+    downloads, downloads_formatted = 0, "0"
+    if row["downloads"] is not None:
+        downloads_formatted = _text_of(row["downloads"].strings)  # type: ignore[union-attr]
+        download_count = downloads_formatted.replace(",", "").replace(".", "")
+        downloads = int(download_count) if download_count.isdigit() else 0
+    return SubtitleCandidate(url, title, language, translator, downloads, downloads_formatted)
+
+
+def iter_Subs_fast(html: str) -> Iterable[SubtitleCandidate]:
+    """Arama sayfasındaki altyazı satırlarını tamamlandıkça SubtitleCandidate olarak üretir."""
+    for row in _SubsRowExtractor().iter_rows(html):
+        candidate = _candidate_from_row(row)
+        if candidate is not None:
+            yield candidate
+
+
+def parse_Subs_fast(html: str) -> List[Dict[str, str]]:
+    """parse_Subs ile aynı çıktıyı BeautifulSoup ağacı kurmadan üretir."""
+    return [candidate.to_dict() for candidate in iter_Subs_fast(html)]  # type: ignore[misc]
+
+
+def parse_download_forms_fast(html: str) -> List[Dict[str, str]]:
+    """parse_download_forms ile aynı çıktıyı BeautifulSoup ağacı kurmadan üretir."""
+    if not html:
+        return []
+    extractor = _FormExtractor()
+    extractor.parse(html)
+    forms = []
+    for form in extractor.forms:
+        inputs = form["inputs"]
+        if all(name in inputs for name in ("idid", "altid", "sidid")):  # type: ignore[operator]
+            forms.append({name: inputs[name] for name in ("idid", "altid", "sidid")})  # type: ignore[index]
+    return forms
+
+
+def parse_candidates_fast(html: str) -> List[Dict[str, str]]:
+    """parse_candidates ile aynı çıktıyı BeautifulSoup ağacı kurmadan üretir."""
+    extractor = _FormExtractor(track_titles=True)
+    extractor.parse(html)
+    candidates: List[Dict[str, str]] = []
+    for form in extractor.forms:
+        inputs = form["inputs"]
+        if not all(name in inputs for name in ("idid", "altid", "sidid")):  # type: ignore[operator]
+            continue
+        nodes = [node for node in form["context"] if node is not None]  # type: ignore[union-attr]
+        title = next((t for t in (_text_of(n.first_a.strings) for n in nodes if n.first_a) if t), "")
+        if not title:
+            title = next((t for t in (_text_of(n.first_heading.strings) for n in nodes if n.first_heading) if t), "")
+        candidates.append({
+            "idid": inputs["idid"],  # type: ignore[index]
+            "altid": inputs["altid"],  # type: ignore[index]
+            "sidid": inputs["sidid"],  # type: ignore[index]
+            "title": title or "Subtitle candidate",
+        })
+    return candidates
+
+
+# "fast": yukarıdaki akış tabanlı ayrıştırıcılar, "bs4": BeautifulSoup tabanlı başvuru sürümleri
+PARSER_BACKEND = "fast"
+
+
+def parse_Subs(html: str) -> List[Dict[str, str]]:
+    if PARSER_BACKEND == "fast":
+        return parse_Subs_fast(html)
+    return parse_Subs_bs4(html)
+
+
+def iter_Subs(html: str) -> Iterable[SubtitleCandidate]:
+    """parse_Subs'un akış sürümü: adayları liste kurmadan SubtitleCandidate olarak üretir."""
+    if PARSER_BACKEND == "fast":
+        return iter_Subs_fast(html)
+    return (SubtitleCandidate.from_dict(sub) for sub in parse_Subs_bs4(html))
+
+
+def parse_Subs_bs4(html: str) -> List[Dict[str, str]]:
+    """
+    HTML'den altyazı bilgilerini parse eder.
+    Her altyazı için şu bilgileri döndürür:
+    - url: Altyazı adresi (/sub/ ile başlayan)
+    - title: Altyazı başlığı
+    - language: 'tr' veya 'en'
+    - translator: Çevirmen bilgisi (varsa)
+    - downloads: İndirme sayısı (integer)
+    - downloads_formatted: Formatlanmış indirme sayısı (string, virgüllü)
+    """
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    subtitles = []
+    
+    # Altyazı satırlarını bul (genellikle div class içinde)
+    subtitle_rows = soup.find_all("div", class_=re.compile(r"altsonsez|row-class"))
+    
+    for row in subtitle_rows:
+        try:
+            subtitle_info = {}
+            
+            # Altyazı linkini bul
+            link_element = row.find("a", href=re.compile(r"\d+/.*\.html"))
+            if not link_element:
+                continue
                 
-                with session.post(url, data=form_data, headers=headers, stream=True) as r:
-                    r.raise_for_status()
-                    
-                    # Dosya adını belirle
-                    cd = r.headers.get("Content-Disposition", "")
-                    filename = None
-                    m = re.search(r'filename="?([^"]+)"?', cd)
-                    if m:
-                        filename = m.group(1)
-                    else:
-                        filename = f"english_{form_data['altid']}.zip"
-                    
-                    # Dosyayı kaydet
-                    os.makedirs(out_dir, exist_ok=True)
-                    filepath = os.path.join(out_dir, sanitize_filename(filename))
-                    
-                    with open(filepath, "wb") as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
+            href = link_element.get("href", "")
+            if href:
+                # href zaten /sub/ ile başlıyorsa olduğu gibi bırak, yoksa ekle
+                if not href.startswith("/sub/"):
+                    subtitle_info["url"] = "/sub/" + href.lstrip("/")
+                else:
+                    subtitle_info["url"] = href
                     
-                    result["english_file"] = filepath
-                    print(f"✓ İngilizce altyazı indirildi: {filepath}")
+                # Başlığı al
+                title_text = link_element.get_text(strip=True)
+                subtitle_info["title"] = title_text if title_text else "Bilinmeyen Altyazı"
+            
+            # Dil bilgisini bul (flag sınıfından)
+            flag_element = row.find("span", class_=re.compile(r"flag(tr|en)"))
+            if flag_element:
+                flag_class = flag_element.get("class", [])
+                if "flagtr" in flag_class:
+                    subtitle_info["language"] = "tr"
+                elif "flagen" in flag_class:
+                    subtitle_info["language"] = "en"
+                else:
+                    subtitle_info["language"] = "unknown"
             else:
-                print("✗ İngilizce sayfada form bulunamadı")
+                subtitle_info["language"] = "unknown"
+            
+            # Çevirmen bilgisini bul
+            translator_div = row.find("div", class_="alcevirmen")
+            if translator_div:
+                translator_links = translator_div.find_all("a")
+                translators = []
+                for t_link in translator_links:
+                    t_text = t_link.get_text(strip=True)
+                    if t_text:
+                        translators.append(t_text)
+                subtitle_info["translator"] = " & ".join(translators) if translators else "Bilinmiyor"
+            else:
+                subtitle_info["translator"] = "Bilinmiyor"
+            
+            # İndirme sayısını bul
+            download_div = row.find("div", class_="alindirme")
+            if download_div:
+                download_text = download_div.get_text(strip=True)
+                # Virgül ve nokta karakterlerini temizleyerek sayıya çevir
+                try:
+                    download_count = download_text.replace(",", "").replace(".", "")
+                    subtitle_info["downloads"] = int(download_count) if download_count.isdigit() else 0
+                    subtitle_info["downloads_formatted"] = download_text
+                except:
+                    subtitle_info["downloads"] = 0
+                    subtitle_info["downloads_formatted"] = "0"
+            else:
+                subtitle_info["downloads"] = 0
+                subtitle_info["downloads_formatted"] = "0"
+            
+            # Eğer temel bilgiler varsa listeye ekle
+            if "url" in subtitle_info and "title" in subtitle_info:
+                subtitles.append(subtitle_info)
                 
+        except Exception:
+            # Bir satırda hata olursa diğerlerine devam et
+            continue
+    
+    return subtitles
+
+# Desteklenen diller: kod → (çıktı klasörü/dosya öneki, etiket, bayrak)
+LANGUAGES = {
+    "tr": {"key": "turkish", "label": "Türkçe", "flag": "🇹🇷"},
+    "en": {"key": "english", "label": "İngilizce", "flag": "🇺🇸"},
+}
+
+
+def parse_langs(value: str) -> List[str]:
+    """'en,tr' biçimindeki dil listesini doğrular ve sırayı koruyarak tekilleştirir."""
+    langs: List[str] = []
+    for lang in value.split(","):
+        lang = lang.strip().lower()
+        if not lang:
+            continue
+        if lang not in LANGUAGES:
+            raise argparse.ArgumentTypeError(f"desteklenmeyen dil: {lang} (seçenekler: {', '.join(LANGUAGES)})")
+        if lang not in langs:
+            langs.append(lang)
+    if not langs:
+        raise argparse.ArgumentTypeError("en az bir dil verilmeli")
+    return langs
+
+
+class CandidateHeap:
+    """
+    Dil başına en çok indirilen k adayı tek geçişte tutar (her dil için boyutu en fazla k olan
+    min-heap). Eşit indirme sayısında önce görülen aday öne geçer. counts tüm dillerdeki aday
+    sayılarını tutar.
+    """
+
+    def __init__(self, langs: Optional[Iterable[str]] = None, k: int = 1):
+        if k < 1:
+            raise ValueError("k en az 1 olmalı")
+        self.k = k
+        self.heaps: Dict[str, List[Tuple[int, int, object]]] = {
+            lang: [] for lang in (langs if langs is not None else LANGUAGES)}
+        self.counts: Dict[str, int] = {}
+        self.total = 0
+
+    def push(self, candidate) -> None:
+        language = str(candidate.get("language"))
+        self.counts[language] = self.counts.get(language, 0) + 1
+        self.total += 1
+        heap = self.heaps.get(language)
+        if heap is None:
+            return
+        entry = (int(candidate.get("downloads", 0) or 0), -self.total, candidate)
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    def ranked(self) -> Dict[str, list]:
+        """{dil: [en iyi aday, ...]} (en fazla k aday, indirme sayısına göre azalan)"""
+        return {lang: [entry[2] for entry in sorted(heap, key=lambda e: e[:2], reverse=True)]
+                for lang, heap in self.heaps.items()}
+
+    def best(self) -> Dict[str, Optional[Dict[str, str]]]:
+        return {lang: (ranked[0] if ranked else None) for lang, ranked in self.ranked().items()}  # type: ignore[misc]
+
+
+def top_candidates(subtitles: Iterable[Dict[str, str]], langs: Optional[List[str]] = None,
+                   k: int = 1) -> Dict[str, list]:
+    """
+    İstenen her dil için en çok indirilen k altyazıyı azalan sırayla döndürür (langs verilmezse
+    tüm diller). subtitles bir liste ya da iter_Subs üreteci olabilir; tek geçişte tüketilir.
+    """
+    heap = CandidateHeap(langs, k)
+    for sub in subtitles:
+        heap.push(sub)
+    return heap.ranked()
+
+
+def get_Most_Downloaded_Subtitle(subtitles: Iterable[Dict[str, str]],
+                                 langs: Optional[List[str]] = None) -> Dict[str, Optional[Dict[str, str]]]:
+    """
+    İstenen her dil için en çok indirilen altyazıyı döndürür (langs verilmezse tüm diller).
+    Döndürülen sözlük formatı:
+    {
+        'tr': {...} veya None,
+        'en': {...} veya None
+    }
+    """
+    return {lang: (ranked[0] if ranked else None) for lang, ranked in top_candidates(subtitles, langs).items()}
+
+
+def fetch_subtitle_page(session: requests.Session, subtitle_url: str) -> str:
+    """
+    Altyazı sayfasına istek atıp HTML'i döndürür.
+    subtitle_url: /sub/735846/avengers-endgame.html gibi
+    """
+    if not subtitle_url.startswith("/"):
+        subtitle_url = "/" + subtitle_url
+    
+    full_url = BASE + subtitle_url
+    return cached_get(session, full_url)
+
+
+def process_most_downloaded_subtitles(session: requests.Session, most_downloaded_result: Dict[str, Optional[Dict[str, str]]]) -> Dict[str, Optional[str]]:
+    """
+    En çok indirilen altyazıların sayfalarına istek atıp HTML'lerini getirir.
+    Altyazısı bulunmayan diller için istek atılmaz.
+    
+    Args:
+        session: HTTP session
+        most_downloaded_result: get_Most_Downloaded_Subtitle fonksiyonundan gelen sonuç
+        
+    Returns:
+        {dil: HTML string veya None}
+    """
+    result: Dict[str, Optional[str]] = {}
+    for lang, sub in most_downloaded_result.items():
+        result[lang] = None
+        if sub is None:
+            continue
+        label = LANGUAGES[lang]["label"]
+        try:
+            url = sub["url"]
+            print(f"{label} altyazı sayfası getiriliyor: {url}")
+            result[lang] = fetch_subtitle_page(session, url)
+            print(f"✓ {label} sayfa başarıyla getirildi")
+        except DeadlineExceeded:
+            print(f"⏱ Süre doldu; {label} ve sonraki sayfalar getirilmedi")
+            break
+        except (Cancelled, BudgetExhausted):
+            raise
         except Exception as e:
-            print(f"✗ İngilizce altyazı indirilemedi: {e}")
+            print(f"✗ {label} sayfa getirilemedi: {e}")
+    return result
+
+
+def parse_download_forms(html: str) -> List[Dict[str, str]]:
+    if PARSER_BACKEND == "fast":
+        return parse_download_forms_fast(html)
+    return parse_download_forms_bs4(html)
+
+
+def parse_download_forms_bs4(html: str) -> List[Dict[str, str]]:
+    """
+    Altyazı sayfasındaki download formlarını parse eder.
+    
+    Returns:
+        [{'idid': '736104', 'altid': '735915', 'sidid': '98f7497f2cc091a94da701cf1bb09aac'}, ...]
+    """
+    if not html:
+        return []
+    
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    forms = []
+    
+    # action="/ind" olan formları bul
+    download_forms = soup.find_all("form", attrs={"action": "/ind"})
+    
+    for form in download_forms:
+        idid_input = form.find("input", attrs={"name": "idid"})
+        altid_input = form.find("input", attrs={"name": "altid"}) 
+        sidid_input = form.find("input", attrs={"name": "sidid"})
+        
+        if idid_input and altid_input and sidid_input:
+            form_data = {
+                "idid": idid_input.get("value", ""),
+                "altid": altid_input.get("value", ""),
+                "sidid": sidid_input.get("value", "")
+            }
+            forms.append(form_data)
+    
+    return forms
+
+
+# /ind yanıtları önce bellekte tutulur; ARCHIVE_SPOOL_BYTES'ı aşanlar geçici dosyaya taşar,
+# ARCHIVE_MAX_BYTES'ı aşanlar reddedilir. Arşivden yalnızca altyazı dosyaları okunur.
+ARCHIVE_SPOOL_BYTES = 1024 * 1024
+ARCHIVE_MAX_BYTES = 16 * 1024 * 1024
+SUBTITLE_EXTENSIONS = (".srt", ".vtt", ".ass", ".ssa", ".sub")
+ZIP_SIGNATURES = (b"PK\x03\x04", b"PK\x05\x06")
+
+
+class SubtitleArchive:
+    """
+    /ind'den indirilen arşivin bellekteki kopyası. Diske yazılmadan doğrulanır ve
+    yalnızca SUBTITLE_EXTENSIONS uzantılı üyeleri çıkarılır.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.size = 0
+        self.buffer = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_BYTES)
+        self._digest = hashlib.sha1()
+        self._members: Optional[List[Tuple[str, bytes]]] = None
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > ARCHIVE_MAX_BYTES:
+            raise ValueError(f"arşiv {ARCHIVE_MAX_BYTES} bayt sınırını aşıyor")
+        self.buffer.write(chunk)
+        self._digest.update(chunk)
+
+    @property
+    def sha1(self) -> str:
+        return self._digest.hexdigest()
+
+    def subtitle_members(self) -> List[Tuple[str, bytes]]:
+        """
+        ZIP imzasını kontrol eder ve altyazı üyelerini (ad, içerik) olarak döndürür.
+        Üyeler okunurken CRC doğrulanır; bozuk arşivde zipfile.BadZipFile fırlatılır.
+        """
+        if self._members is not None:
+            return self._members
+        self.buffer.seek(0)
+        if self.buffer.read(4) not in ZIP_SIGNATURES:
+            raise ValueError("yanıt geçerli bir ZIP arşivi değil")
+        self.buffer.seek(0)
+        members = []
+        with zipfile.ZipFile(self.buffer) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or os.path.splitext(info.filename)[1].lower() not in SUBTITLE_EXTENSIONS:
+                    continue
+                if info.file_size > ARCHIVE_MAX_BYTES:
+                    raise ValueError(f"{info.filename} {ARCHIVE_MAX_BYTES} bayt sınırını aşıyor")
+                try:
+                    members.append((info.filename, zf.read(info)))
+                except zlib.error as e:
+                    # Bozuk deflate akışı CRC denetimine gelmeden zlib hatası verir
+                    raise zipfile.BadZipFile(f"{info.filename}: {e}") from e
+        if not members:
+            raise ValueError("arşivde altyazı dosyası yok")
+        self._members = members
+        return members
+
+    def close(self) -> None:
+        self.buffer.close()
+
+
+def post_download_form(session: requests.Session, form_data: Dict[str, str], fallback_name: str) -> SubtitleArchive:
+    """
+    /ind formunu POST edip gelen arşivi belleğe alır, doğrular ve SubtitleArchive olarak döndürür.
+    Sunucu dosya adı vermezse fallback_name kullanılır.
+    """
+    url = f"{BASE}/ind"
+    headers = {
+        "Referer": f"{BASE}/sub/{form_data['altid']}/",
+        "Origin": BASE,
+        "Content-Type": "application/x-www-form-urlencoded"
+    }
+
+    # Aynı form tekrar gönderildiğinde aynı arşiv döner; bu yüzden POST da yeniden denenebilir
+    with session.post(url, data=form_data, headers=headers, stream=True, idempotent=True) as r:
+        r.raise_for_status()
+
+        # Dosya adını belirle
+        cd = r.headers.get("Content-Disposition", "")
+        m = re.search(r'filename="?([^"]+)"?', cd)
+        archive = SubtitleArchive(sanitize_filename(m.group(1) if m else fallback_name))
+
+        metrics = current_metrics()
+        try:
+            for chunk in r.iter_content(chunk_size=8192):
+                # Yavaş akan bir gövde iptali ya da süre bütçesini aşmasın
+                check_cancelled()
+                if chunk:
+                    archive.write(chunk)
+                    if metrics is not None:
+                        metrics.add_bytes(len(chunk))
+            archive.subtitle_members()
+        except Exception:
+            archive.close()
+            check_cancelled()
+            raise
+
+    return archive
+
+
+def download_from_page_results(session: requests.Session, page_results: Dict[str, Optional[str]]) -> Dict[str, Dict[str, object]]:
+    """
+    page_results içindeki HTML'lerden form bilgilerini çıkarıp indirme yapar.
     
-    return result   
+    Returns:
+        {dil: {'file': SubtitleArchive, 'form': kullanılan form verisi}}  (yalnızca başarılı diller)
+    """
+    result: Dict[str, Dict[str, object]] = {}
+    for lang, page_html in page_results.items():
+        if page_html is None:
+            continue
+        language = LANGUAGES[lang]
+        try:
+            print(f"{language['flag']} {language['label']} altyazı form bilgileri çıkarılıyor...")
+            forms = parse_download_forms(page_html)
+            if not forms:
+                print(f"✗ {language['label']} sayfada form bulunamadı")
+                continue
+
+            # İlk formu kullan (genellikle tek form var)
+            form_data = forms[0]
+            print(f"   Form bilgileri: idid={form_data['idid']}, altid={form_data['altid']}")
+
+            # POST request at
+            archive = post_download_form(session, form_data, f"{language['key']}_{form_data['altid']}.zip")
+            result[lang] = {"file": archive, "form": form_data}
+            print(f"✓ {language['label']} altyazı indirildi: {archive.name} ({archive.size} bayt)")
+        except DeadlineExceeded:
+            print(f"⏱ Süre doldu; {language['label']} ve sonraki altyazılar indirilmedi")
+            break
+        except (Cancelled, BudgetExhausted):
+            raise
+        except Exception as e:
+            print(f"✗ {language['label']} altyazı indirilemedi: {e}")
+    return result
+
 
 def parse_candidates(html: str) -> List[Dict[str, str]]:
+    if PARSER_BACKEND == "fast":
+        return parse_candidates_fast(html)
+    return parse_candidates_bs4(html)
+
+
+def parse_candidates_bs4(html: str) -> List[Dict[str, str]]:
     """
     Parse result page and extract candidates: {idid, altid, sidid, title?}
     We try to detect a nearby title for each form; if not found, title stays generic.
@@ -393,7 +2000,7 @@ def parse_candidates(html: str) -> List[Dict[str, str]]:
     
     
     
-    soup = BeautifulSoup(html, "html.parser")
+    soup = bs4.BeautifulSoup(html, "html.parser")
     candidates: List[Dict[str, str]] = []
     forms = soup.find_all("form", attrs={"action": "/ind"})
     for f in forms:
@@ -437,261 +2044,1773 @@ def parse_candidates(html: str) -> List[Dict[str, str]]:
     return candidates
 
 
-def download_subtitle(session: requests.Session,
-                      payload: Dict[str, str],
-                      referer: str,
-                      out_dir: str) -> str:
+def sanitize_filename(name: str) -> str:
+    name = name.replace("\r", "").replace("\n", "").strip()
+    # Remove characters not friendly to filesystems
+    return re.sub(r'[\\/*?:"<>|]+', "_", name)
+
+
+# --- Altyazı normalleştirme (SRT / ASS-SSA / MicroDVD → UTF-8 WebVTT) ------------
+#
+# Dosya tek geçişte, satır satır çevrilir: girdi parça parça çözülür ve her seferinde yalnızca
+# tek bir ipucu (cue) bellekte tutulur. Karakter kümesi ilk CHARSET_SAMPLE_BYTES bayttan seçilir.
+
+CHARSET_SAMPLE_BYTES = 8192
+_DECODE_CHUNK_BYTES = 65536
+# cp1254'te tanımsız olup cp1252'de Ž/ž olan baytlar
+_CP1252_ONLY_BYTES = (b"\x8e", b"\x9e")
+
+# --subtitle-format ile ayarlanır: "vtt" (WebVTT'ye çevir) veya "original" (arşivdeki haliyle bırak)
+SUBTITLE_OUTPUT = "vtt"
+
+_TIMING_RE = re.compile(
+    r"^\s*(\d+):(\d{1,2}):(\d{1,2})[,.:](\d{1,3})\s*-->\s*(\d+):(\d{1,2}):(\d{1,2})[,.:](\d{1,3})"
+)
+_ASS_TIME_RE = re.compile(r"^\s*(\d+):(\d{1,2}):(\d{1,2})[.:](\d{1,3})\s*$")
+_MICRODVD_RE = re.compile(r"^\{(\d+)\}\{(\d*)\}(.*)$")
+_ASS_OVERRIDE_RE = re.compile(r"\{[^}]*\}")
+_FONT_TAG_RE = re.compile(r"</?font[^>]*>", re.IGNORECASE)
+_ASS_DEFAULT_FIELDS = ["layer", "start", "end", "style", "name", "marginl", "marginr", "marginv", "effect", "text"]
+MICRODVD_DEFAULT_FPS = 23.976
+
+
+def detect_charset(sample: bytes) -> str:
+    """
+    Dosyanın başından alınan örnekten karakter kümesini seçer: BOM varsa ona göre, örnek
+    geçerli UTF-8 ise utf-8, değilse cp1254 (Türkçe Windows; ISO-8859-9 ile A0-FF aralığı aynı).
+    cp1254'te tanımsız baytlar görülürse cp1252 seçilir.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        # Örnek çok baytlı bir karakterin ortasında bitebilir; final=False bunu hata saymaz
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if any(byte in sample for byte in _CP1252_ONLY_BYTES):
+        return "cp1252"
+    return "cp1254"
+
+
+def _cp1254_fallback(error: UnicodeDecodeError) -> Tuple[str, int]:
+    # Örnek UTF-8 görünüp dosyanın devamında UTF-8 olmayan baytlar çıkarsa bunlar cp1254 ile çözülür
+    bad = error.object[error.start:error.end]
+    return bytes(bad).decode("cp1254", errors="replace"), error.end
+
+
+codecs.register_error("ta_cp1254_fallback", _cp1254_fallback)
+
+
+def _iter_text_lines(stream, sample: bytes, charset: str) -> Iterable[str]:
+    """İkili akışı parça parça çözerek satır sonu karakterleri olmadan satır satır döndürür."""
+    errors = "ta_cp1254_fallback" if charset.startswith("utf-8") else "replace"
+    decoder = codecs.getincrementaldecoder(charset)(errors=errors)
+    pending = ""
+    chunk = sample
+    first = True
+    while True:
+        final = not chunk
+        text = pending + decoder.decode(chunk, final=final)
+        if first:
+            text = text.lstrip("\ufeff")
+            first = False
+        # \r\n parça sınırında bölünebilir; sondaki \r bir sonraki parçaya bırakılır
+        if not final and text.endswith("\r"):
+            text, pending = text[:-1], "\r"
+        else:
+            pending = ""
+        lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        if final:
+            if not lines[-1]:
+                lines.pop()
+            yield from lines
+            return
+        pending = lines.pop() + pending
+        yield from lines
+        chunk = stream.read(_DECODE_CHUNK_BYTES)
+
+
+def _fraction_ms(fraction: str) -> int:
+    # "5" → 500 ms, "50" → 500 ms (ASS santisaniye), "500" → 500 ms
+    return int(fraction.ljust(3, "0")[:3])
+
+
+def _vtt_time(ms: int) -> str:
+    hours, ms = divmod(max(ms, 0), 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d}"
+
+
+def _cue_text(line: str) -> str:
+    # WebVTT'de ipucu metni "-->" içeremez; SRT'lerdeki ASS etiketleri ve <font> desteklenmez
+    line = _FONT_TAG_RE.sub("", _ASS_OVERRIDE_RE.sub("", line))
+    return line.replace("-->", "--&gt;").rstrip()
+
+
+def _srt_cues(lines: Iterable[str]) -> Iterable[Tuple[int, int, List[str]]]:
+    timing: Optional[Tuple[int, int]] = None
+    text: List[str] = []
+    held: Optional[str] = None  # bir sonraki ipucunun sıra numarası olabilecek satır
+    for line in lines:
+        m = _TIMING_RE.match(line)
+        if m:
+            if timing is not None and text:
+                yield timing[0], timing[1], text
+            h1, m1, s1, f1, h2, m2, s2, f2 = m.groups()
+            timing = (
+                ((int(h1) * 60 + int(m1)) * 60 + int(s1)) * 1000 + _fraction_ms(f1),
+                ((int(h2) * 60 + int(m2)) * 60 + int(s2)) * 1000 + _fraction_ms(f2),
+            )
+            text, held = [], None
+            continue
+        if timing is None:
+            continue
+        if held is not None:
+            text.append(held)
+            held = None
+        stripped = line.strip()
+        if not stripped:
+            if text:
+                yield timing[0], timing[1], text
+                timing, text = None, []
+            continue
+        if stripped.isdigit() and text:
+            held = stripped
+            continue
+        cleaned = _cue_text(line)
+        if cleaned.strip():
+            text.append(cleaned)
+    if timing is not None and text:
+        yield timing[0], timing[1], text
+
+
+def _ass_cues(lines: Iterable[str]) -> Iterable[Tuple[int, int, List[str]]]:
+    section = ""
+    fields = _ASS_DEFAULT_FIELDS
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("[") and stripped.endswith("]"):
+            section = stripped.lower()
+            continue
+        if section != "[events]":
+            continue
+        lower = stripped.lower()
+        if lower.startswith("format:"):
+            fields = [field.strip().lower() for field in stripped[7:].split(",")]
+            continue
+        if not lower.startswith("dialogue:"):
+            continue
+        parts = stripped[9:].split(",", len(fields) - 1)
+        if len(parts) < len(fields):
+            continue
+        record = dict(zip(fields, parts))
+        start = _ASS_TIME_RE.match(record.get("start", ""))
+        end = _ASS_TIME_RE.match(record.get("end", ""))
+        if not start or not end:
+            continue
+        body = _ASS_OVERRIDE_RE.sub("", record.get("text", ""))
+        body = body.replace("\\N", "\n").replace("\\n", "\n").replace("\\h", " ")
+        text = [_cue_text(part.strip()) for part in body.split("\n") if part.strip()]
+        if text:
+            yield (
+                ((int(start.group(1)) * 60 + int(start.group(2))) * 60 + int(start.group(3))) * 1000 + _fraction_ms(start.group(4)),
+                ((int(end.group(1)) * 60 + int(end.group(2))) * 60 + int(end.group(3))) * 1000 + _fraction_ms(end.group(4)),
+                text,
+            )
+
+
+def _microdvd_cues(lines: Iterable[str]) -> Iterable[Tuple[int, int, List[str]]]:
+    fps = MICRODVD_DEFAULT_FPS
+    first = True
+    for line in lines:
+        m = _MICRODVD_RE.match(line.strip())
+        if not m:
+            continue
+        start_frame, end_frame, body = int(m.group(1)), m.group(2), m.group(3)
+        if first:
+            first = False
+            # Geleneksel olarak ilk satır {1}{1}23.976 biçiminde kare hızını verir
+            try:
+                if start_frame <= 1 and float(body) > 0:
+                    fps = float(body)
+                    continue
+            except ValueError:
+                pass
+        start = int(start_frame * 1000 / fps)
+        end = int(int(end_frame) * 1000 / fps) if end_frame else start + 3000
+        text = [_cue_text(part.strip().lstrip("/")) for part in body.split("|") if part.strip()]
+        if text:
+            yield start, end, text
+
+
+def _sniff_format(first_line: str, name: str) -> str:
+    head = first_line.strip()
+    if head.startswith("WEBVTT"):
+        return "vtt"
+    if head.lower() in ("[script info]", "[v4 styles]", "[v4+ styles]") or name.lower().endswith((".ass", ".ssa")):
+        return "ass"
+    if _MICRODVD_RE.match(head):
+        return "microdvd"
+    return "srt"
+
+
+_VTT_TIMING_RE = re.compile(r"^\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})\.(\d{1,3})[ \t]+-->[ \t]+(?:(\d+):)?(\d{1,2}):(\d{1,2})\.(\d{1,3})")
+
+
+def _vtt_cues(lines: Iterable[str]) -> Iterable[Tuple[int, int, List[str]]]:
+    timing: Optional[Tuple[int, int]] = None
+    text: List[str] = []
+    for line in lines:
+        m = _VTT_TIMING_RE.match(line)
+        if m:
+            h1, m1, s1, f1, h2, m2, s2, f2 = m.groups()
+            timing = (
+                ((int(h1 or 0) * 60 + int(m1)) * 60 + int(s1)) * 1000 + _fraction_ms(f1),
+                ((int(h2 or 0) * 60 + int(m2)) * 60 + int(s2)) * 1000 + _fraction_ms(f2),
+            )
+            text = []
+        elif timing is not None:
+            if line.strip():
+                text.append(line.rstrip())
+                continue
+            if text:
+                yield timing[0], timing[1], text
+            timing = None
+    if timing is not None and text:
+        yield timing[0], timing[1], text
+
+
+def _open_subtitle(stream, name: str) -> Tuple[str, str, Iterable[str]]:
+    """Karakter kümesini ve biçimi belirler; (biçim, karakter kümesi, satırlar) döndürür."""
+    sample = stream.read(CHARSET_SAMPLE_BYTES)
+    charset = detect_charset(sample)
+    lines = iter(_iter_text_lines(stream, sample, charset))
+    first_line = next((line for line in lines if line.strip()), "")
+    return _sniff_format(first_line, name), charset, itertools.chain([first_line], lines)
+
+
+def iter_subtitle_cues(stream, name: str = "") -> Iterable[Tuple[int, int, List[str]]]:
+    """
+    stream'deki (ikili) altyazının ipuçlarını WebVTT'ye yazmadan (start_ms, end_ms, satırlar)
+    olarak döndürür. Satırlar WebVTT'ye yazılacak hallerindedir (etiketler korunur).
+    """
+    fmt, _, lines = _open_subtitle(stream, name)
+    parse = {"vtt": _vtt_cues, "srt": _srt_cues, "ass": _ass_cues, "microdvd": _microdvd_cues}[fmt]
+    return parse(lines)
+
+
+def normalize_subtitle(stream, out, name: str = "") -> Dict[str, object]:
+    """
+    stream'deki (ikili) SRT, ASS/SSA, MicroDVD veya WebVTT altyazıyı UTF-8 WebVTT olarak out'a
+    (metin akışı) yazar. İpucu bulunamazsa ValueError fırlatır.
+
+    Returns:
+        {'format': 'srt' | 'ass' | 'microdvd' | 'vtt', 'charset': çözülen karakter kümesi, 'cues': ipucu sayısı}
+    """
+    fmt, charset, lines = _open_subtitle(stream, name)
+
+    out.write("WEBVTT\n\n")
+    cues = 0
+    if fmt == "vtt":
+        # Başlık bloğu atlanır, ipuçları olduğu gibi kopyalanır
+        in_header = True
+        for line in lines:
+            if in_header:
+                in_header = bool(line.strip())
+                continue
+            out.write(line.rstrip() + "\n")
+            if "-->" in line:
+                cues += 1
+    else:
+        parse = {"srt": _srt_cues, "ass": _ass_cues, "microdvd": _microdvd_cues}[fmt]
+        for start, end, text in parse(lines):
+            out.write(f"{_vtt_time(start)} --> {_vtt_time(end)}\n")
+            out.write("\n".join(text))
+            out.write("\n\n")
+            cues += 1
+    if cues == 0:
+        raise ValueError("altyazı ipucu bulunamadı")
+    return {"format": fmt, "charset": charset, "cues": cues}
+
+
+# Yaygın kare hızı dönüşümleri (altyazının hazırlandığı fps / videonun fps'i)
+FRAME_RATE_RATIOS = (1.0, 25 / 23.976, 23.976 / 25, 24 / 23.976, 23.976 / 24, 25 / 24, 24 / 25)
+# Son ipucunun video süresine oranı bu aralıktaysa zamanlama makul sayılır (jenerik payı dahil)
+TIMING_MIN_COVERAGE = 0.80
+TIMING_MAX_COVERAGE = 1.0
+# TMDB süresi tam dakikadır; son dakikanın içinde biten ipucu taşma sayılmaz
+TIMING_RUNTIME_SLACK_MS = 60 * 1000
+# Bundan büyük taşmalar sabit kayma değil kare hızı farkı sayılır
+TIMING_MAX_OFFSET_MS = 60 * 1000
+# Saat kısmı isteğe bağlı, "MM:SS.mmm" kısmı sabit 9 bayt; satır başına bağlı olması taramayı hızlandırır
+_VTT_CUE_TIMES_RE = re.compile(rb"^(?:(\d+):)?(\d\d:\d\d\.\d{3})[ \t]+-->[ \t]+(?:(\d+):)?(\d\d:\d\d\.\d{3})", re.M)
+_VTT_CUE_LINE_RE = re.compile(rb"^(?:\d+:)?\d\d:\d\d\.\d{3}[ \t]+-->[ \t]+(?:\d+:)?\d\d:\d\d\.\d{3}", re.M)
+# "MM:SS.mmm" baytlarının ms ağırlıkları; ":" ve "." 0
+_CLOCK_WEIGHTS = (600000, 60000, 0, 10000, 1000, 0, 100, 10, 1)
+# "HH:MM:SS.mmm" konumlarının basamak değerleri ve tabanları; 0 ayraç demektir
+_STAMP_PLACES = (36000000, 3600000, 0, 600000, 60000, 0, 10000, 1000, 0, 100, 10, 1)
+_STAMP_BASES = (10, 10, 1, 6, 10, 1, 6, 10, 1, 10, 10, 10)
+_STAMP_MAX_MS = 100 * 3600000 - 1
+_timing_available: Optional[bool] = None
+
+
+def timing_available() -> bool:
+    """Zamanlama uyumu numpy gerektirir; yüklü değilse altyazılar olduğu gibi bırakılır."""
+    global _timing_available
+    if _timing_available is None:
+        import importlib.util
+        _timing_available = importlib.util.find_spec("numpy") is not None
+    return _timing_available
+
+
+def cue_times(data: bytes):
+    """WebVTT içeriğindeki ipuçlarının başlangıç ve bitiş zamanlarını (ms) iki int64 dizisi olarak döndürür."""
+    matches = _VTT_CUE_TIMES_RE.findall(data)
+    if not matches:
+        empty = numpy.zeros(0, dtype=numpy.int64)
+        return empty, empty
+    start_hours, start_clocks, end_hours, end_clocks = zip(*matches)
+    hours = numpy.array(start_hours + end_hours, dtype="S")
+    hours = numpy.where(hours == b"", b"0", hours).astype(numpy.int64)  # saatsiz (mm:ss.ttt) zamanlar 0
+    clocks = numpy.frombuffer(b"".join(start_clocks + end_clocks), dtype=numpy.uint8).reshape(-1, 9).astype(numpy.int64) - 48
+    times = hours * 3600000 + clocks @ numpy.array(_CLOCK_WEIGHTS, dtype=numpy.int64)
+    return times[:len(matches)], times[len(matches):]
+
+
+def fit_timing(starts, ends, runtime_ms: float) -> Dict[str, object]:
+    """
+    İpuçlarını video süresine göre puanlar. Son ipucu TIMING_MIN_COVERAGE * süre ile
+    TIMING_MAX_COVERAGE * süre + TIMING_RUNTIME_SLACK_MS arasında bitiyorsa dokunulmaz. Bu payı en
+    fazla TIMING_MAX_OFFSET_MS aşan altyazı (ilk ipucu 0'ın altına inmeden) payın sınırına sabit
+    kaymayla geri çekilir; daha büyük sapmalarda aralığa oturtan ve 1'e en yakın kare hızı oranı
+    seçilir. score 1 düzeltmesiz uyum, düzeltilenler için 0.9, makul olmayanlar için daha azdır.
+    """
+    if len(starts) == 0 or runtime_ms <= 0:
+        return {"score": 0.0, "ratio": 1.0, "offsetMs": 0}
+    first, last = float(starts.min()), float(ends.max())
+    low, high = TIMING_MIN_COVERAGE * runtime_ms, TIMING_MAX_COVERAGE * runtime_ms + TIMING_RUNTIME_SLACK_MS
+    ratios = numpy.array(FRAME_RATE_RATIOS)
+    ends_at = last * ratios
+    misses = numpy.maximum(low - ends_at, 0) + numpy.maximum(ends_at - high, 0)
+
+    ratio, offset = 1.0, 0
+    overrun = last - high
+    if misses[0] == 0:
+        pass
+    elif 0 < overrun <= min(first, TIMING_MAX_OFFSET_MS):
+        offset = -int(round(overrun))
+    else:
+        fitting = numpy.flatnonzero(misses == 0)
+        if len(fitting):
+            ratio = float(ratios[fitting[numpy.argmin(numpy.abs(ratios[fitting] - 1))]])
+
+    final = last * ratio + offset
+    miss = (max(low - final, 0.0) + max(final - high, 0.0)) / runtime_ms
+    score = max(0.0, 1.0 - miss / TIMING_MIN_COVERAGE)
+    if ratio != 1.0 or offset:
+        score *= 0.9
+    return {"score": round(score, 4), "ratio": ratio, "offsetMs": offset}
+
+
+def retime(data: bytes, ratio: float, offset_ms: int, cues=None) -> bytes:
+    """
+    WebVTT içeriğindeki tüm ipucu zamanlarını tek vektörel işlemle t * ratio + offset_ms olarak
+    yeniden yazar (0'ın altı 0'a sabitlenir). cues, cue_times(data) sonucu olarak verilebilir.
+    Zaman satırları sabit genişlikte ("HH:MM:SS.mmm --> HH:MM:SS.mmm") tek bir bayt dizisinde
+    basamak basamak üretilip ipucu dışındaki metinle birleştirilir. 100 saat ve üstüne düşen bir
+    zaman iki haneli saat alanına sığmadığından o dosyanın satırları tek tek _vtt_time ile yazılır.
+    """
+    starts, ends = cues if cues is not None else cue_times(data)
+    times = numpy.rint(numpy.stack([starts, ends], axis=1) * ratio + offset_ms).clip(0, None).astype(numpy.int64)
+    pieces = _VTT_CUE_LINE_RE.split(data)
+    out: List[bytes] = [b""] * (2 * len(pieces) - 1)
+    out[0::2] = pieces
+    if len(times) and int(times.max()) > _STAMP_MAX_MS:
+        out[1::2] = [f"{_vtt_time(start)} --> {_vtt_time(end)}".encode("ascii") for start, end in times.tolist()]
+        return b"".join(out)
+    places = numpy.array(_STAMP_PLACES, dtype=numpy.int64)
+    digits = times[:, :, None] // numpy.maximum(places, 1) % numpy.array(_STAMP_BASES, dtype=numpy.int64) + 48
+    separators = numpy.frombuffer(b"00:00:00.000", dtype=numpy.uint8)
+    stamps = numpy.where(places == 0, separators, digits).astype(numpy.uint8)
+    width = 29
+    lines = numpy.empty((len(times), width), dtype=numpy.uint8)
+    lines[:, :12] = stamps[:, 0]
+    lines[:, 12:17] = numpy.frombuffer(b" --> ", dtype=numpy.uint8)
+    lines[:, 17:] = stamps[:, 1]
+    block = lines.tobytes()
+    out[1::2] = [block[i:i + width] for i in range(0, len(block), width)]
+    return b"".join(out)
+
+
+# --- İpucu indeksi (sidecar) ---------------------------------------------------
+#
+# <altyazı>.vtt yanında <altyazı>.vtt.cues: sıralı başlangıç zamanları, bitişlerin kümülatif
+# en büyüğü ve her ipucu bloğunun VTT içindeki bayt konumu. Bir zaman aralığındaki ipuçları iki
+# ikili aramayla bulunup VTT'den tek parça olarak okunur. Başlıktaki (inode, boyut) eşleşmezse
+# (dosya değiştirilmiş) sidecar yok sayılır; değiştirme her yerde geçici dosya + rename ile
+# yapıldığından inode değişir.
+
+CUE_INDEX_SUFFIX = ".cues"
+_CUE_INDEX_MAGIC = b"VTTX"
+_CUE_INDEX_VERSION = 1
+# magic, sürüm, ipucu sayısı, ayrılmış, kaynak inode, kaynak boyutu; ardından uint32 LE diziler:
+# starts[n], max_ends[n], offsets[n + 1] (offsets[n] = dosya sonu, offsets[0] öncesi başlık)
+_CUE_INDEX_HEADER = struct.Struct("<4sIIIQQ")
+
+
+def _clock_ms(hours: bytes, clock: bytes) -> int:
+    # clock: "MM:SS.mmm"
+    return int(hours or 0) * 3600000 + int(clock[0:2]) * 60000 + int(clock[3:5]) * 1000 + int(clock[6:9])
+
+
+def _cue_block_start(data: bytes, floor: int, position: int) -> int:
+    """
+    Zaman satırının ait olduğu bloğun (varsa ipucu kimliği satırıyla) başladığı konum. Boş satır
+    yalnızca önceki ipucunun zaman satırından (floor) sonra aranır.
+    """
+    blank = data.rfind(b"\n\n", floor, position)
+    return blank + 2 if blank >= 0 else position
+
+
+def is_servable_vtt(data: bytes) -> bool:
+    """Sunucunun olduğu gibi gönderdiği WebVTT mi (libraryManager.isServableVtt): başlık, LF, UTF-8."""
+    if not data.startswith(b"WEBVTT") or b"\r" in data:
+        return False
+    try:
+        data.decode("utf-8")
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _le_array(values: "array.array") -> bytes:
+    if sys.byteorder == "big":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def build_cue_index(data: bytes, inode: int, size: int) -> Optional[bytes]:
+    """
+    WebVTT içeriği için sidecar baytlarını üretir. İçerik olduğu gibi sunulabilir değilse, ipucu
+    yoksa ya da başlangıçlar sıralı değilse (ikili arama yapılamaz) None döndürür.
+    """
+    if not is_servable_vtt(data):
+        return None
+    starts, max_ends, offsets = array.array("I"), array.array("I"), array.array("I")
+    running = floor = 0
+    for m in _VTT_CUE_TIMES_RE.finditer(data):
+        start_hours, start_clock, end_hours, end_clock = m.groups()
+        start = _clock_ms(start_hours, start_clock)
+        if starts and start < starts[-1]:
+            return None
+        running = max(running, _clock_ms(end_hours, end_clock))
+        starts.append(start)
+        max_ends.append(running)
+        offsets.append(_cue_block_start(data, floor, m.start()))
+        floor = m.end()
+    if not starts:
+        return None
+    offsets.append(len(data))
+    header = _CUE_INDEX_HEADER.pack(_CUE_INDEX_MAGIC, _CUE_INDEX_VERSION, len(starts), 0, inode, size)
+    return header + _le_array(starts) + _le_array(max_ends) + _le_array(offsets)
+
+
+def write_cue_index(vtt_path: str, data: Optional[bytes] = None) -> Optional[str]:
+    """vtt_path için sidecar'ı yazar (data dosyanın içeriği olmalıdır); üretilemezse eskisini siler."""
+    st = os.stat(vtt_path)
+    if data is None:
+        with open(vtt_path, "rb") as f:
+            data = f.read()
+    index = build_cue_index(data, st.st_ino, st.st_size)
+    sidecar = vtt_path + CUE_INDEX_SUFFIX
+    if index is None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(sidecar)
+        return None
+    tmp_path = f"{sidecar}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(index)
+    os.replace(tmp_path, sidecar)
+    return sidecar
+
+
+class CueIndex:
+    """Okunmuş ve kaynağına göre doğrulanmış sidecar."""
+
+    __slots__ = ("starts", "max_ends", "offsets")
+
+    def __init__(self, starts: "array.array", max_ends: "array.array", offsets: "array.array"):
+        self.starts = starts
+        self.max_ends = max_ends
+        self.offsets = offsets
+
+    @classmethod
+    def load(cls, vtt_path: str) -> Optional["CueIndex"]:
+        """Sidecar yoksa, bozuksa ya da VTT sonradan değiştiyse None döndürür."""
+        try:
+            with open(vtt_path + CUE_INDEX_SUFFIX, "rb") as f:
+                raw = f.read()
+            st = os.stat(vtt_path)
+        except FileNotFoundError:
+            return None
+        if len(raw) < _CUE_INDEX_HEADER.size:
+            return None
+        magic, version, count, _, inode, size = _CUE_INDEX_HEADER.unpack_from(raw)
+        if (magic, version, inode, size) != (_CUE_INDEX_MAGIC, _CUE_INDEX_VERSION, st.st_ino, st.st_size) \
+                or len(raw) != _CUE_INDEX_HEADER.size + 4 * (3 * count + 1):
+            return None
+        values = array.array("I")
+        values.frombytes(raw[_CUE_INDEX_HEADER.size:])
+        if sys.byteorder == "big":
+            values.byteswap()
+        return cls(values[:count], values[count:2 * count], values[2 * count:])
+
+    def window(self, start_ms: int, end_ms: int) -> Tuple[int, int]:
+        """[start_ms, end_ms) aralığıyla kesişen ipuçlarını kapsayan [lo, hi) ipucu aralığı."""
+        lo = bisect.bisect_right(self.max_ends, start_ms)
+        hi = bisect.bisect_left(self.starts, end_ms)
+        return lo, max(lo, hi)
+
+
+def read_cue_window(vtt_path: str, start_ms: int, end_ms: int) -> Optional[bytes]:
+    """
+    [start_ms, end_ms) aralığındaki ipuçlarını başlıkla birlikte geçerli bir WebVTT olarak döndürür.
+    Aralıktaki bloklar dosyadan tek pread ile okunur. Geçerli sidecar yoksa None.
+    """
+    index = CueIndex.load(vtt_path)
+    if index is None:
+        return None
+    lo, hi = index.window(start_ms, end_ms)
+    with open(vtt_path, "rb", buffering=0) as f:
+        header = _pread(f, index.offsets[0], 0)
+        return header + _pread(f, index.offsets[hi] - index.offsets[lo], index.offsets[lo])
+
+
+def _pread(f, size: int, offset: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(f.fileno(), size, offset)
+    f.seek(offset)  # Windows
+    return f.read(size)
+
+
+def _convert_archive(archive: SubtitleArchive, runtime: Optional[float] = None) -> List[Dict[str, object]]:
+    """Arşivdeki altyazı üyelerini _convert_members ile çevirir."""
+    members = archive.subtitle_members()
+    print(f"   Arşivde {len(members)} altyazı dosyası bulundu")
+    return _convert_members(members, runtime)
+
+
+def _convert_members(members: List[Tuple[str, bytes]], runtime: Optional[float] = None) -> List[Dict[str, object]]:
+    """
+    Altyazıları WebVTT'ye çevirir (SUBTITLE_OUTPUT "original" ise özgün uzantı ve içerik
+    korunur). Çevrilemeyen üyeler atlanır. [{'member', 'ext', 'data', 'format', 'charset', 'cues'}] döndürür.
+
+    runtime (dakika, TMDB) verilirse ve numpy yüklüyse her dosya süreye göre puanlanır, kayan
+    dosyalar fit_timing/retime ile düzeltilir ve liste en uyumludan başlayarak sıralanır.
+    """
+    fit = bool(runtime) and SUBTITLE_OUTPUT == "vtt" and timing_available()
+    converted: List[Dict[str, object]] = []
+    for file_name, data in members:
+        info: Dict[str, object] = {}
+        if SUBTITLE_OUTPUT == "vtt":
+            buffer = io.StringIO()
+            try:
+                info = normalize_subtitle(io.BytesIO(data), buffer, file_name)
+            except ValueError as e:
+                print(f"   ✗ {file_name} atlandı: {e}")
+                continue
+            data = buffer.getvalue().encode("utf-8")
+            file_ext = ".vtt"
+        else:
+            file_ext = os.path.splitext(file_name)[1].lower()
+        if fit:
+            cues = cue_times(data)
+            timing = fit_timing(*cues, runtime * 60 * 1000)  # type: ignore[operator]
+            if timing["ratio"] != 1.0 or timing["offsetMs"]:
+                data = retime(data, timing["ratio"], timing["offsetMs"], cues)  # type: ignore[arg-type]
+                print(f"   ⏱ {file_name} yeniden zamanlandı (oran {timing['ratio']:.5f}, kayma {timing['offsetMs']} ms)")
+                metrics = current_metrics()
+                if metrics is not None:
+                    metrics.record_event("retime", member=file_name, **timing)
+            info["timing"] = timing
+        converted.append({"member": file_name, "ext": file_ext, "data": data, **info})
+    if fit:
+        converted.sort(key=lambda item: -item["timing"]["score"])  # type: ignore[index]
+    return converted
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Geçici dosyaya yazıp os.replace ile yerine koyar; kesilen çalıştırma yarım altyazı bırakmaz."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_extracted(items: List[Dict[str, object]], lang: str, clean_query: str, extract_dir: Optional[str],
+                     store: Optional[SubtitleStore]) -> List[Dict[str, object]]:
     """
-    POST /ind with payload to get the file content.
-    Returns the saved file path.
+    Altyazıları <sorgu>.<dil>[.<n>].<uzantı> olarak adlandırır. extract_dir verilirse dosyalar oraya
+    yazılır (store varsa depodaki nesneye sabit bağlantı olarak); verilmezse yalnızca içerikler döndürülür.
     """
-    url = f"{BASE}/ind"
-    # Referer matters on some sites
-    headers = {
-        "Referer": referer,
-        "Origin": BASE,
-    }
-    with session.post(url, data=payload, headers=headers, stream=True, allow_redirects=True) as r:
-        r.raise_for_status()
-        # Content-Disposition usually includes filename
-        cd = r.headers.get("Content-Disposition", "")
-        filename = None
-        m = re.search(r'filename="?([^"]+)"?', cd)
-        if m:
-            filename = m.group(1)
+    if extract_dir is not None:
+        os.makedirs(extract_dir, exist_ok=True)
+    extracted: List[Dict[str, object]] = []
+    for item in items:
+        data: bytes = item["data"]  # type: ignore[assignment]
+        file_ext = str(item["ext"])
+        info = {key: item[key] for key in ("format", "charset", "cues", "timing") if key in item}
+        counter = len(extracted)
+        if counter == 0:
+            new_name = f"{clean_query}.{lang}{file_ext}"
         else:
-            # fallback
-            filename = f"{payload.get('idid','file')}_{payload.get('altid','sub')}.zip"
+            new_name = f"{clean_query}.{lang}.{counter + 1}{file_ext}"
 
-        # Ensure output directory
-        os.makedirs(out_dir, exist_ok=True)
-        filepath = os.path.join(out_dir, sanitize_filename(filename))
+        digest = item.get("sha256")
+        if store is not None and digest is None:
+            digest = store.put(data, file_ext)
+        new_path = None
+        if extract_dir is not None:
+            new_path = os.path.join(extract_dir, new_name)
+            if store is not None:
+                store.place(str(digest), file_ext, new_path)
+            else:
+                _write_atomic(new_path, data)
+                if file_ext == ".vtt":
+                    write_cue_index(new_path, data)
+        entry = {"name": new_name, "path": new_path, "data": data, "ext": file_ext, **info}
+        if digest is not None:
+            entry["sha256"] = digest
+        extracted.append(entry)
+        detail = f" ({info['format']}, {info['charset']}, {info['cues']} ipucu)" if info else ""
+        print(f"   ✓ {item.get('member') or 'depo:' + str(digest)[:12]} → {new_name}{detail}")
+    return extracted
 
-        # Write stream
-        with open(filepath, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-    return filepath
 
+# Hedefe yazılan biçimler: sunucunun oynatıcıya sunabildikleri
+DESTINATION_EXTENSIONS = (".vtt", ".srt")
 
-def sanitize_filename(name: str) -> str:
-    name = name.replace("\r", "").replace("\n", "").strip()
-    # Remove characters not friendly to filesystems
-    return re.sub(r'[\\/*?:"<>|]+', "_", name)
+
+def destination_prefix(media_dir: str, dest: Dict[str, str]) -> str:
+    """
+    {"dir": media'ya göreli klasör, "base": video adı (uzantısız)} hedefini mutlak '<klasör>/<ad>'
+    önekine çevirir. media dışına çıkan klasörler ve '/' içeren adlar ValueError.
+    """
+    base = str(dest.get("base") or "")
+    if not base or base != os.path.basename(base) or base in (os.curdir, os.pardir):
+        raise ValueError(f"geçersiz hedef adı: {base!r}")
+    root = os.path.abspath(media_dir)
+    directory = os.path.abspath(os.path.join(root, str(dest.get("dir") or "")))
+    if directory != root and not directory.startswith(root + os.sep):
+        raise ValueError(f"hedef klasör media dışında: {dest.get('dir')!r}")
+    return os.path.join(directory, base)
 
 
-def extract_and_cleanup_archives(download_results: Dict[str, Optional[str]], query: str) -> Dict[str, List[str]]:
+def write_destination(extracted: Dict[str, List[Dict[str, object]]], media_dir: str, dest: Dict[str, str],
+                      store: Optional[SubtitleStore] = None,
+                      altids: Optional[Dict[str, str]] = None) -> List[Dict[str, object]]:
     """
-    ZIP arşivlerini çıkartır, dosyaları yeniden adlandırır ve arşiv dosyalarını siler.
-    
+    Her dilin ilk oynatılabilir altyazısını doğrudan videonun yanına <ad>.<dil>.<uzantı> olarak
+    yazar: depo varsa nesneye sabit bağlantı, yoksa geçici dosya + os.replace (okuyan hiçbir zaman
+    yarım dosya görmez). .vtt dosyalarının ipucu indeksi de yanına konur.
+
+    Returns:
+        Yazılanların manifesti: [{'lang', 'path' (media'ya göreli), 'format', 'size', 'sha256', 'altid'}]
+    """
+    prefix = destination_prefix(media_dir, dest)
+    root = os.path.abspath(media_dir)
+    os.makedirs(os.path.dirname(prefix), exist_ok=True)
+    manifest: List[Dict[str, object]] = []
+    for lang, items in extracted.items():
+        item = next((i for i in items if str(i["ext"]).lower() in DESTINATION_EXTENSIONS), None)
+        if item is None:
+            continue
+        data: bytes = item["data"]  # type: ignore[assignment]
+        file_ext = str(item["ext"]).lower()
+        target = f"{prefix}.{lang}{file_ext}"
+        digest = item.get("sha256")
+        if store is not None and digest is not None:
+            store.place(str(digest), file_ext, target)
+        else:
+            _write_atomic(target, data)
+            if file_ext == ".vtt":
+                write_cue_index(target, data)
+        entry = {"lang": lang, "path": os.path.relpath(target, root).replace(os.sep, "/"),
+                 "format": file_ext.lstrip("."), "size": len(data), "sha256": digest or subtitle_digest(data),
+                 "altid": (altids or {}).get(lang)}
+        if "timing" in item:
+            entry["timing"] = item["timing"]
+        manifest.append(entry)
+        print(f"   ✓ {LANGUAGES[lang]['flag']} → {entry['path']}")
+    return manifest
+
+
+def extract_subtitle_archives(archives: Dict[str, SubtitleArchive], query: str,
+                              out_dir: Optional[str], store: Optional[SubtitleStore] = None,
+                              stored: Optional[Dict[str, List[Dict[str, object]]]] = None,
+                              runtime: Optional[float] = None) -> Dict[str, List[Dict[str, object]]]:
+    """
+    Bellekteki arşivlerden altyazı dosyalarını çıkarır ve arşivleri kapatır.
+    Dosyalar out_dir/<dil anahtarı>_subtitles (ör. turkish_subtitles) altına yazılır;
+    out_dir None ise hiçbir şey diske yazılmaz.
+
     Args:
-        download_results: download_from_page_results fonksiyonundan gelen sonuç
+        archives: {dil: SubtitleArchive}
         query: Arama sorgusu (dosya adlandırma için kullanılır)
-        
+        out_dir: Çıktı klasörü veya None
+        store: Verilirse altyazılar depoya eklenir ve dosyalar depoya sabit bağlantı olur
+        stored: Arşiv yerine depodan gelen altyazılar ({dil: SubtitleStore.recall sonucu})
+        runtime: Video süresi (dakika); verilirse altyazılar süreye göre puanlanıp gerekirse yeniden zamanlanır
+
     Returns:
-        {
-            'turkish_files': [çıkarılan dosya yolları] veya [],
-            'english_files': [çıkarılan dosya yolları] veya []
-        }
+        {dil: [{'name', 'path', 'data', 'ext', 'sha256'?}, ...]}
     """
-    result = {
-        "turkish_files": [],
-        "english_files": []
-    }
-    
+    result: Dict[str, List[Dict[str, object]]] = {}
+
     # Sorguyu dosya adı için temizle
     clean_query = sanitize_filename(query.strip().lower().replace(" ", "_"))
-    
-    # Türkçe arşivi işle
-    turkish_file = download_results.get("turkish_file")
-    if turkish_file is not None:
+
+    def extract_dir_for(lang: str) -> Optional[str]:
+        return os.path.join(out_dir, f"{LANGUAGES[lang]['key']}_subtitles") if out_dir is not None else None
+
+    for lang, items in (stored or {}).items():
+        language = LANGUAGES[lang]
+        print(f"{language['flag']} {language['label']} altyazı depodan kullanılıyor")
+        result[lang] = _write_extracted(items, lang, clean_query, extract_dir_for(lang), store)
+
+    for lang, archive in archives.items():
+        language = LANGUAGES[lang]
+        result[lang] = []
         try:
-            print(f"🇹🇷 Türkçe arşiv çıkartılıyor: {os.path.basename(turkish_file)}")
-            
-            # Çıkartma klasörü (arşiv dosyasının yanında)
-            extract_dir = os.path.join(os.path.dirname(turkish_file), "turkish_subtitles")
-            os.makedirs(extract_dir, exist_ok=True)
-            
-            # ZIP dosyasını çıkart
-            with zipfile.ZipFile(turkish_file, 'r') as zip_ref:
-                # Dosya listesini al
-                file_list = zip_ref.namelist()
-                print(f"   Arşivde {len(file_list)} dosya bulundu")
-                
-                # Dosyaları çıkart
-                zip_ref.extractall(extract_dir)
-                
-                # Çıkarılan dosyaları yeniden adlandır
-                extracted_files = []
-                subtitle_counter = 0
-                
-                for file_name in file_list:
-                    old_path = os.path.join(extract_dir, file_name)
-                    
-                    if os.path.isfile(old_path):  # Sadece dosyaları işle
-                        # Dosya uzantısını kontrol et
-                        file_ext = os.path.splitext(file_name)[1].lower()
-                        
-                        if file_ext == '.srt':
-                            # SRT dosyalarını yeniden adlandır
-                            if subtitle_counter == 0:
-                                new_name = f"{clean_query}.tr.srt"
-                            else:
-                                new_name = f"{clean_query}.tr.{subtitle_counter + 1}.srt"
-                            subtitle_counter += 1
-                        else:
-                            # Diğer dosyalar için orijinal adı kullan (readme.txt gibi)
-                            new_name = f"{clean_query}.tr.{file_name}"
-                        
-                        new_path = os.path.join(extract_dir, new_name)
-                        
-                        # Dosyayı yeniden adlandır
-                        os.rename(old_path, new_path)
-                        extracted_files.append(new_path)
-                        print(f"   ✓ {file_name} → {new_name}")
-                
-                result["turkish_files"] = extracted_files
-            
-            # Arşiv dosyasını sil
-            os.remove(turkish_file)
-            print(f"   🗑️ Arşiv dosyası silindi: {os.path.basename(turkish_file)}")
-            
+            print(f"{language['flag']} {language['label']} arşiv çıkartılıyor: {archive.name}")
+            result[lang] = _write_extracted(_convert_archive(archive, runtime), lang, clean_query, extract_dir_for(lang), store)
         except Exception as e:
-            print(f"   ✗ Türkçe arşiv işlenirken hata: {e}")
-    
-    # İngilizce arşivi işle
-    english_file = download_results.get("english_file")
-    if english_file is not None:
+            print(f"   ✗ {language['label']} arşiv işlenirken hata: {e}")
+        finally:
+            archive.close()
+
+    return result
+
+
+_ALTID_RE = re.compile(r"/sub/(\d+)")
+
+
+def normalize_variants(queries: Iterable[str]) -> List[str]:
+    """
+    Sorgu varyantlarını sırayı koruyarak temizler. normalize_query'ye göre aynı olan varyantlardan
+    yalnızca ilki (boşlukları sadeleştirilmiş haliyle) kalır.
+    """
+    variants: List[str] = []
+    seen = set()
+    for query in queries:
+        text = " ".join(str(query or "").split())
+        key = normalize_query(text)
+        if key and key not in seen:
+            seen.add(key)
+            variants.append(text)
+    return variants
+
+
+def candidate_altid(candidate: Dict[str, str]) -> str:
+    """Aday altyazının /sub/<altid>/ adresindeki kimliği (bulunamazsa adresin kendisi)."""
+    m = _ALTID_RE.search(candidate.get("url", ""))
+    return m.group(1) if m else candidate.get("url", "")
+
+
+def replay_indexed_downloads(session: requests.Session, index: ResolutionIndex, query: str,
+                             langs: List[str]) -> Dict[str, Dict[str, object]]:
+    """
+    İndekste çözümlemesi bulunan diller için kayıtlı form verisiyle doğrudan /ind'e gider.
+    Başarısız olan (ör. süresi dolmuş form) kayıtlar indeksten silinir ve normal aramaya bırakılır.
+    Altyazısı zaten depoda olan (session.subtitle_store) kayıtlar için hiç istek atılmaz.
+    Dönen sözlük: {dil: {... indeks kaydı ..., 'file': SubtitleArchive}} ya da depodan gelenler için
+    {dil: {... indeks kaydı ..., 'stored': [...]}}
+    """
+    store: Optional[SubtitleStore] = getattr(session, "subtitle_store", None)
+    replayed: Dict[str, Dict[str, object]] = {}
+    for lang, entry in index.lookup(query, langs).items():
+        items = store.recall(candidate_altid(entry), lang) if store is not None else None  # type: ignore[arg-type]
+        if items:
+            print(f"♻️ İndeksteki {lang} altyazısı depoda bulundu: {entry['url']}")
+            replayed[lang] = {**entry, "stored": items}
+            continue
+        form_data = entry["form"]
         try:
-            print(f"🇺🇸 İngilizce arşiv çıkartılıyor: {os.path.basename(english_file)}")
-            
-            # Çıkartma klasörü
-            extract_dir = os.path.join(os.path.dirname(english_file), "english_subtitles")
-            os.makedirs(extract_dir, exist_ok=True)
-            
-            # ZIP dosyasını çıkart
-            with zipfile.ZipFile(english_file, 'r') as zip_ref:
-                # Dosya listesini al
-                file_list = zip_ref.namelist()
-                print(f"   Arşivde {len(file_list)} dosya bulundu")
-                
-                # Dosyaları çıkart
-                zip_ref.extractall(extract_dir)
-                
-                # Çıkarılan dosyaları yeniden adlandır
-                extracted_files = []
-                subtitle_counter = 0
-                
-                for file_name in file_list:
-                    old_path = os.path.join(extract_dir, file_name)
-                    
-                    if os.path.isfile(old_path):  # Sadece dosyaları işle
-                        # Dosya uzantısını kontrol et
-                        file_ext = os.path.splitext(file_name)[1].lower()
-                        
-                        if file_ext == '.srt':
-                            # SRT dosyalarını yeniden adlandır
-                            if subtitle_counter == 0:
-                                new_name = f"{clean_query}.en.srt"
-                            else:
-                                new_name = f"{clean_query}.en.{subtitle_counter + 1}.srt"
-                            subtitle_counter += 1
-                        else:
-                            # Diğer dosyalar için orijinal adı kullan
-                            new_name = f"{clean_query}.en.{file_name}"
-                        
-                        new_path = os.path.join(extract_dir, new_name)
-                        
-                        # Dosyayı yeniden adlandır
-                        os.rename(old_path, new_path)
-                        extracted_files.append(new_path)
-                        print(f"   ✓ {file_name} → {new_name}")
-                
-                result["english_files"] = extracted_files
-            
-            # Arşiv dosyasını sil
-            os.remove(english_file)
-            print(f"   🗑️ Arşiv dosyası silindi: {os.path.basename(english_file)}")
-            
+            print(f"♻️ İndeksten {lang} altyazısı indiriliyor: {entry['url']}")
+            archive = post_download_form(session, form_data, f"{LANGUAGES[lang]['key']}_{form_data['altid']}.zip")  # type: ignore[index]
+        except DeadlineExceeded:
+            # Kayıt silinmez: form geçerli, yalnızca süre yetmedi
+            print(f"⏱ Süre doldu; indeksteki {lang} altyazısı indirilmedi")
+            break
+        except (Cancelled, BudgetExhausted):
+            raise
         except Exception as e:
-            print(f"   ✗ İngilizce arşiv işlenirken hata: {e}")
-    
+            print(f"✗ Kayıtlı form ile indirme başarısız ({lang}): {e}")
+            index.forget(query, lang)
+            continue
+        replayed[lang] = {**entry, "file": archive}
+    return replayed
+
+
+def run_query(session: requests.Session, query, out_dir: str = "./subs",
+              langs: Optional[List[str]] = None, metrics: Optional[RunMetrics] = None,
+              inline: bool = False, runtime: Optional[float] = None, dest: Optional[Dict[str, str]] = None,
+              media_dir: Optional[str] = None, deadline: Optional[float] = None) -> Dict[str, object]:
+    """
+    Tek bir başlık için arama → sayfa → indirme → çıkartma adımlarını çalıştırır.
+    query tek bir sorgu ya da sıralı varyant listesi olabilir (ör. orijinal ad, dosya adı, yerel ad);
+    varyantlar sırayla aranır, adaylar altid'e göre birleştirilir ve istenen her dil için bir aday
+    bulununca kalan varyantlar aranmaz. Her dil için tüm aranan varyantlardaki en iyi aday seçilir.
+    langs verilirse (ör. ['en']) yalnızca bu dillerin sayfaları getirilir ve indirilir.
+    İstekler arası bekleme, oturumun host başına hız sınırlayıcısıyla yapılır.
+    Oturuma bir ResolutionIndex bağlıysa önce indeksteki çözümlemeler ve "sonuç yok" kayıtları kullanılır.
+    Aşama ölçümleri verilen (ya da yeni oluşturulan) RunMetrics'e yazılır.
+    inline=True ise altyazılar diske yazılmaz, 'subtitles' alanında base64 olarak döndürülür.
+    runtime (dakika) verilirse arşivdeki altyazılar süreye uyumlarına göre sıralanır ve kayanlar düzeltilir.
+    dest ({"dir", "base"}) verilirse out_dir kullanılmaz; her dil doğrudan media_dir (varsayılan MEDIA_DIR)
+    altında <dir>/<base>.<dil>.<uzantı> olarak yazılır ve 'manifest' alanı döner (inline yok sayılır).
+    deadline (saniye) verilirse tüm çalıştırma bu sürede biter: süre aşamalara bölünür, dolunca süren
+    istekler kesilir ve o ana kadar alınan dillerle 'partial' (hiçbiri yoksa 'deadline') döner.
+
+    Returns:
+        {
+            'query': ilk varyant,
+            'variants': aranan varyantlar,
+            'status': 'ok' | 'no_candidates' | 'not_downloaded' | 'partial' | 'deadline',
+            'files': {'tr': [...], 'en': [...]},
+            'indexed': indeksten indirilen diller,
+            'sources': {dil: altyazının bulunduğu varyant},
+            'altids': {dil: indirilen altyazının altid'i},
+            'subtitles': {'tr': [{'name', 'data', 'timing'?}], ...} (yalnızca inline=True ise),
+            'manifest': write_destination çıktısı (yalnızca dest verilirse),
+            'deadline': {'budgetMs', 'elapsedMs', 'exceeded': süresi dolan aşamalar, 'missing': alınamayan diller}
+                        (yalnızca deadline verilirse),
+            'metrics': RunMetrics.to_dict()
+        }
+    """
+    variants = normalize_variants([query] if isinstance(query, str) else query)
+    if not variants:
+        raise ValueError("boş sorgu")
+    if dest is not None:
+        destination_prefix(media_dir or MEDIA_DIR, dest)
+    metrics = metrics or RunMetrics(variants[0])
+    limit = Deadline(deadline) if deadline else None
+    token = _current_metrics.set(metrics)
+    deadline_token = _current_deadline.set(limit)
+    try:
+        with _single_flight(session, variants[0], langs):
+            result = _run_query(session, variants, out_dir, langs, metrics, inline or dest is not None, runtime)
+            if dest is not None:
+                _write_result_destination(session, result, dest, media_dir, result["altids"], metrics)  # type: ignore[arg-type]
+    except DeadlineExceeded:
+        # Kiralama beklerken ya da aşamalar dışında dolan süre: alınmış bir şey yok
+        result = {"query": variants[0], "variants": [], "status": "deadline", "files": {lang: [] for lang in LANGUAGES},
+                  "indexed": [], "sources": {}, "altids": {}}
+    finally:
+        _current_deadline.reset(deadline_token)
+        _current_metrics.reset(token)
+    if limit is not None:
+        _finish_deadline(result, limit, langs)
+    if inline and "subtitles" in result:
+        result["subtitles"] = _inline_subtitles(result["subtitles"])  # type: ignore[arg-type]
+    result["metrics"] = metrics.to_dict()
+    return result
+
+
+def _finish_deadline(result: Dict[str, object], deadline: Deadline, langs: Optional[List[str]]) -> None:
+    """Süre bütçesini sonuca yazar; bütçe dolduğu için eksik kalan dil varsa durum 'partial' ya da 'deadline' olur."""
+    got = {lang for lang, paths in result["files"].items() if paths}  # type: ignore[union-attr]
+    got.update(lang for lang, items in (result.get("subtitles") or {}).items() if items)  # type: ignore[union-attr]
+    missing = [lang for lang in (langs if langs is not None else list(LANGUAGES)) if lang in LANGUAGES and lang not in got]
+    info = deadline.to_dict()
+    if info["exceeded"] and missing:
+        info["missing"] = missing
+        result["status"] = "partial" if got else "deadline"
+        print(f"⏱ Süre bütçesi ({deadline.budget:g} sn) doldu; eksik diller: {', '.join(missing)}")
+    result["deadline"] = info
+
+
+def _single_flight(session: requests.Session, query: str, langs: Optional[List[str]]):
+    """Oturuma FlightLeases bağlıysa (sorgu, dil) kiralamalarını tutan bağlam, yoksa boş bağlam."""
+    leases: Optional[FlightLeases] = getattr(session, "flight_leases", None)
+    if leases is None:
+        return contextlib.nullcontext()
+    return leases.hold(query, [lang for lang in (langs if langs is not None else list(LANGUAGES)) if lang in LANGUAGES])
+
+
+def _write_result_destination(session: requests.Session, result: Dict[str, object], dest: Dict[str, str],
+                              media_dir: Optional[str], altids: Dict[str, str], metrics: RunMetrics) -> None:
+    """Sonuçtaki çıkarılmış altyazıları hedefe yazar; 'subtitles' yerine 'manifest' ve 'files' doldurulur."""
+    extracted: Dict[str, List[Dict[str, object]]] = result.pop("subtitles", None) or {}  # type: ignore[assignment]
+    result["manifest"] = []
+    if not extracted:
+        return
+    with metrics.stage("write"):
+        manifest = write_destination(extracted, media_dir or MEDIA_DIR, dest, getattr(session, "subtitle_store", None),
+                                     altids)
+    root = os.path.abspath(media_dir or MEDIA_DIR)
+    result["manifest"] = manifest
+    result["files"].update({entry["lang"]: [os.path.join(root, str(entry["path"]))] for entry in manifest})  # type: ignore[union-attr]
+
+
+def _inline_subtitles(extracted: Dict[str, List[Dict[str, object]]]) -> Dict[str, List[Dict[str, object]]]:
+    """Çıkarılan altyazıları JSON yanıtı için base64'e çevirir."""
+    return {
+        lang: [{"name": item["name"], "format": str(item["ext"]).lstrip("."),
+                "data": base64.b64encode(item["data"]).decode("ascii"),  # type: ignore[arg-type]
+                **{key: item[key] for key in ("sha256", "timing") if key in item}}
+               for item in items]
+        for lang, items in extracted.items()
+    }
+
+
+def _search_variants(session: requests.Session, variants: List[str], langs: List[str],
+                     metrics: RunMetrics) -> Tuple[CandidateHeap, Dict[str, str], List[str]]:
+    """
+    Varyantları sırayla arar ve adayları altid'e göre tekilleştirerek dil başına en iyi adayları
+    tutan bir CandidateHeap'e aktarır. langs'teki her dil için en az bir aday bulunduğunda durur.
+    (heap, {altid: varyant}, aranan varyantlar) döndürür.
+    """
+    heap = CandidateHeap(langs)
+    sources: Dict[str, str] = {}
+    searched: List[str] = []
+    for variant in variants:
+        if searched:
+            print(f"🔁 Sıradaki varyant aranıyor: {variant}")
+        # Step 1: search page
+        try:
+            with metrics.stage("search"):
+                html = search_query(session, variant)
+        except DeadlineExceeded:
+            print("⏱ Arama için ayrılan süre doldu; bulunan adaylarla devam ediliyor")
+            break
+        searched.append(variant)
+
+        # Step 2: parse forms
+        with metrics.stage("parse"):
+            for candidate in iter_Subs(html):
+                altid = candidate_altid(candidate)
+                if altid not in sources:
+                    sources[altid] = variant
+                    heap.push(candidate)
+
+        if all(lang in heap.counts for lang in langs):
+            break
+    return heap, sources, searched
+
+
+def _run_query(session: requests.Session, variants: List[str], out_dir: str,
+               langs: Optional[List[str]], metrics: RunMetrics, inline: bool,
+               runtime: Optional[float] = None) -> Dict[str, object]:
+    query = variants[0]
+    result: Dict[str, object] = {"query": query, "variants": [], "status": "ok",
+                                 "files": {lang: [] for lang in LANGUAGES}, "indexed": [], "sources": {}, "altids": {}}
+    index: Optional[ResolutionIndex] = getattr(session, "resolution_index", None)
+    store: Optional[SubtitleStore] = getattr(session, "subtitle_store", None)
+    wanted = [lang for lang in (langs if langs is not None else list(LANGUAGES)) if lang in LANGUAGES]
+    archives: Dict[str, SubtitleArchive] = {}
+    stored: Dict[str, List[Dict[str, object]]] = {}  # depodan gelen, indirilmeyen diller
+    altids: Dict[str, str] = result["altids"]  # type: ignore[assignment]
+    sources: Dict[str, str] = result["sources"]  # type: ignore[assignment]
+
+    remaining = list(wanted)
+    if index is not None:
+        with metrics.stage("index"):
+            replayed: Dict[str, Dict[str, object]] = {}
+            for variant in variants:
+                pending = [lang for lang in remaining if lang not in replayed]
+                if not pending:
+                    break
+                for lang, entry in replay_indexed_downloads(session, index, variant, pending).items():
+                    replayed[lang] = entry
+                    sources[lang] = variant
+            for lang, entry in replayed.items():
+                altids[lang] = candidate_altid(entry)  # type: ignore[arg-type]
+                if "stored" in entry:
+                    stored[lang] = entry["stored"]  # type: ignore[assignment]
+                    metrics.record_cache("store")
+                    file_hash = entry["file_hash"]
+                else:
+                    archives[lang] = entry["file"]  # type: ignore[assignment]
+                    file_hash = archives[lang].sha1
+                for key in {query, sources[lang]}:
+                    index.record(key, lang, entry["url"], entry["downloads"], entry["form"], file_hash)  # type: ignore[arg-type]
+            # Bir dil ancak tüm varyantlarda "sonuç yok" olarak kayıtlıysa atlanır
+            known_misses = [lang for lang in remaining if lang not in replayed
+                            and all(lang in index.misses(variant, [lang]) for variant in variants)]
+        result["indexed"] = list(replayed)
+        if known_misses:
+            print(f"⏭ Daha önce sonuç bulunamayan diller atlanıyor: {', '.join(known_misses)}")
+        remaining = [lang for lang in remaining if lang not in replayed and lang not in known_misses]
+        if not remaining and not replayed:
+            result["status"] = "no_candidates"
+            return result
+
+    if remaining:
+        candidates, candidate_sources, searched = _search_variants(session, variants, remaining, metrics)
+        result["variants"] = searched
+        metrics.candidates["total"] = candidates.total
+        metrics.candidates.update(candidates.counts)
+
+        if not candidates.total:
+            if index is not None:
+                for variant in searched:
+                    for lang in remaining:
+                        index.record_miss(variant, lang)
+            if not result["indexed"]:
+                result["status"] = "no_candidates"
+                return result
+        else:
+            # get most download subs (yalnızca eksik diller için, tüm varyantlar arasından)
+            with metrics.stage("select"):
+                most_downloaded_result = candidates.best()
+
+            # Aynı altid daha önce indirildiyse sayfa ve indirme adımları atlanır
+            to_fetch = dict(most_downloaded_result)
+            if store is not None:
+                for lang, subtitle in most_downloaded_result.items():
+                    items = store.recall(candidate_altid(subtitle), lang) if subtitle is not None else None
+                    if items:
+                        print(f"♻️ {LANGUAGES[lang]['label']} altyazı depoda bulundu: {subtitle['url']}")  # type: ignore[index]
+                        stored[lang] = items
+                        altids[lang] = candidate_altid(subtitle)  # type: ignore[arg-type]
+                        sources[lang] = candidate_sources[altids[lang]]
+                        metrics.record_cache("store")
+                        to_fetch[lang] = None
+
+            # get results from most downloaded
+            with metrics.stage("pages"):
+                page_results = process_most_downloaded_subtitles(session, to_fetch)
+
+            # Download from page results
+            print("\n=== En Çok İndirilen Altyazıları İndirme ===")
+            with metrics.stage("download"):
+                fresh_results = download_from_page_results(session, page_results)
+
+            for lang in remaining:
+                if lang in stored:
+                    continue
+                subtitle = most_downloaded_result[lang]
+                fresh = fresh_results.get(lang)
+                if fresh is not None:
+                    archive: SubtitleArchive = fresh["file"]  # type: ignore[assignment]
+                    archives[lang] = archive
+                    if subtitle is not None:
+                        altids[lang] = candidate_altid(subtitle)
+                        sources[lang] = candidate_sources[altids[lang]]
+                        if index is not None:
+                            for key in {query, sources[lang]}:
+                                index.record(key, lang, subtitle["url"], int(subtitle.get("downloads", 0)),
+                                             fresh["form"], archive.sha1)  # type: ignore[arg-type]
+                elif index is not None and subtitle is None:
+                    for variant in searched:
+                        index.record_miss(variant, lang)
+
+    for lang in archives:
+        print(f"🎉 {LANGUAGES[lang]['label']} altyazı başarıyla indirildi!")
+
+    if not archives and not stored:
+        print("❌ Hiçbir altyazı indirilemedi!")
+        result["status"] = "not_downloaded"
+        return result
+
+    # Arşivleri çıkart
+    print("\n=== Arşivleri Çıkartma ===")
+    with metrics.stage("extract"):
+        extracted = extract_subtitle_archives(archives, query, None if inline else out_dir, store, stored, runtime)
+        if store is not None:
+            for lang, items in extracted.items():
+                if items and lang in archives and lang in altids:
+                    store.remember(altids[lang], lang, items)
+    if inline:
+        # run_query base64'e çevirir; sağlayıcılar öğeleri olduğu gibi kullanır
+        result["subtitles"] = extracted
+    else:
+        result["files"].update({lang: [item["path"] for item in items] for lang, items in extracted.items()})  # type: ignore[union-attr]
+    return result
+
+
+# Sağlayıcı yarışı: aynı anda sorulan en fazla sağlayıcı ve kabul edilen en düşük süre uyumu
+RACE_WIDTH = 2
+RACE_MIN_SCORE = 0.5
+
+
+class SubtitleProvider(abc.ABC):
+    """
+    Altyazı kaynağı arayüzü. fetch() istenen dillerden bulduklarını (dil, öğeler, kaynak) olarak
+    üretir; öğeler _convert_members biçimindedir, kaynak altid ya da dosya yolu gibi bir kimliktir.
+    Bulunamayan diller atlanır. Oturum istekleri iptali kendisi denetler; ağ dışı uzun işler
+    arada check_cancelled() çağırmalıdır.
+    """
+
+    name = "provider"
+
+    @abc.abstractmethod
+    def fetch(self, session: requests.Session, variants: List[str], langs: List[str],
+              runtime: Optional[float] = None) -> Iterable[Tuple[str, List[Dict[str, object]], Optional[str]]]:
+        ...
+
+
+class TurkceAltyaziProvider(SubtitleProvider):
+    """turkcealtyazi.org akışı (_run_query); oturuma bağlı önbellek, indeks ve depo kullanılır."""
+
+    name = "turkcealtyazi"
+
+    def fetch(self, session, variants, langs, runtime=None):
+        # Yarıştaki her sağlayıcının aşama ölçümleri ayrı tutulur (current_stage paylaşılamaz)
+        metrics = RunMetrics(variants[0])
+        token = _current_metrics.set(metrics)
+        try:
+            result = _run_query(session, variants, "", langs, metrics, True, runtime)
+        finally:
+            _current_metrics.reset(token)
+        altids: Dict[str, str] = result["altids"]  # type: ignore[assignment]
+        for lang, items in (result.get("subtitles") or {}).items():  # type: ignore[union-attr]
+            if items:
+                yield lang, items, altids.get(lang)
+
+
+class LocalDirectoryProvider(SubtitleProvider):
+    """
+    Bir klasördeki <ad>.<dil>[.<n>].<uzantı> altyazılarını sorguyla eşler (testler ve çevrimdışı
+    arşivler için). Ad ile sorgu normalize_query ile karşılaştırılır; '_' ve '.' boşluk sayılır,
+    dil kodu (tr) ya da anahtarı (turkish) kabul edilir. delay saniye (iptal edilebilir) bekletir.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str, delay: float = 0.0):
+        self.root = root
+        self.delay = delay
+
+    @staticmethod
+    def _title_key(text: str) -> str:
+        return normalize_query(text.replace("_", " ").replace(".", " "))
+
+    def _catalog(self) -> Dict[Tuple[str, str], List[str]]:
+        """(başlık anahtarı, dil) → dosya yolları."""
+        codes = {code: code for code in LANGUAGES}
+        codes.update({language["key"]: code for code, language in LANGUAGES.items()})
+        catalog: Dict[Tuple[str, str], List[str]] = {}
+        for directory, _, names in os.walk(self.root):
+            for name in sorted(names):
+                stem, ext = os.path.splitext(name)
+                parts = stem.split(".")
+                if ext.lower() not in SUBTITLE_EXTENSIONS or len(parts) < 2:
+                    continue
+                if len(parts) > 2 and parts[-1].isdigit():
+                    parts.pop()
+                lang = codes.get(parts[-1].lower())
+                if lang is not None:
+                    key = self._title_key(".".join(parts[:-1]))
+                    catalog.setdefault((key, lang), []).append(os.path.join(directory, name))
+        return catalog
+
+    def fetch(self, session, variants, langs, runtime=None):
+        if self.delay:
+            _sleep(self.delay)
+        catalog = self._catalog()
+        keys = [self._title_key(variant) for variant in variants]
+        for lang in langs:
+            paths = next((catalog[(key, lang)] for key in keys if (key, lang) in catalog), None)
+            if not paths:
+                continue
+            members = []
+            for path in paths:
+                with open(path, "rb") as f:
+                    members.append((os.path.basename(path), f.read()))
+            items = _convert_members(members, runtime)
+            if items:
+                yield lang, items, os.path.relpath(paths[0], self.root)
+
+
+def parse_providers(value: str) -> List[SubtitleProvider]:
+    """'turkcealtyazi,local:/yol' biçimindeki sağlayıcı listesini öncelik sırasıyla kurar."""
+    providers: List[SubtitleProvider] = []
+    for spec in value.split(","):
+        spec = spec.strip()
+        if not spec:
+            continue
+        name, _, arg = spec.partition(":")
+        if name in ("turkcealtyazi", "ta") and not arg:
+            providers.append(TurkceAltyaziProvider())
+        elif name == "local" and arg:
+            providers.append(LocalDirectoryProvider(arg))
+        else:
+            raise argparse.ArgumentTypeError(f"desteklenmeyen sağlayıcı: {spec} (seçenekler: turkcealtyazi, local:KLASÖR)")
+    if not providers:
+        raise argparse.ArgumentTypeError("en az bir sağlayıcı verilmeli")
+    return providers
+
+
+class ProviderStats:
+    """
+    Sağlayıcı ve dil başına yarış sonuçları: kazanma, kaybetme (geç kalan ya da iptal edilen),
+    başarısızlık (hata, sonuç yok, geçersiz) sayıları ve gecikmenin üstel ortalaması (ms).
+    rank() sağlayıcıları kazanma oranına, eşitlikte gecikmeye göre sıralar; yarışa önce sıradakiler
+    girer, yavaş ve sonuçsuz sağlayıcılar yalnızca öndekiler bulamazsa denenir.
+    """
+
+    LATENCY_ALPHA = 0.3
+    _COLUMNS = {"won": "wins", "lost": "losses", "cancelled": "losses"}
+
+    def __init__(self, path: str = DEFAULT_PROVIDER_STATS_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = _open_db(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS provider_stats ("
+            " provider TEXT NOT NULL, lang TEXT NOT NULL, wins INTEGER NOT NULL DEFAULT 0,"
+            " losses INTEGER NOT NULL DEFAULT 0, failures INTEGER NOT NULL DEFAULT 0, latency_ms REAL,"
+            " updated_at REAL NOT NULL, PRIMARY KEY (provider, lang))"
+        )
+        self.conn.commit()
+
+    def record(self, provider: str, lang: str, outcome: str, ms: Optional[float] = None) -> None:
+        column = self._COLUMNS.get(outcome, "failures")
+        now = time.time()
+        with self.lock:
+            self.conn.execute("INSERT OR IGNORE INTO provider_stats (provider, lang, updated_at) VALUES (?, ?, ?)",
+                              (provider, lang, now))
+            self.conn.execute(
+                f"UPDATE provider_stats SET {column} = {column} + 1, updated_at = ?,"
+                " latency_ms = CASE WHEN ? IS NULL THEN latency_ms WHEN latency_ms IS NULL THEN ?"
+                " ELSE latency_ms + (? - latency_ms) * ? END WHERE provider = ? AND lang = ?",
+                (now, ms, ms, ms, self.LATENCY_ALPHA, provider, lang),
+            )
+            self.conn.commit()
+
+    def rank(self, providers: List[SubtitleProvider], langs: List[str]) -> List[SubtitleProvider]:
+        totals: Dict[str, List[float]] = {}
+        with self.lock:
+            for provider, wins, runs, latency in self.conn.execute(
+                f"SELECT provider, wins, wins + losses + failures, latency_ms FROM provider_stats"
+                f" WHERE lang IN ({','.join('?' * len(langs))})", langs
+            ):
+                total = totals.setdefault(provider, [0, 0, 0.0])
+                total[0] += wins
+                total[1] += runs
+                total[2] = max(total[2], latency or 0.0)
+
+        def key(provider: SubtitleProvider) -> Tuple[float, float]:
+            wins, runs, latency = totals.get(provider.name, (0, 0, 0.0))
+            # Hiç denenmemiş sağlayıcı 0.5 ile başlar
+            return -(wins + 1) / (runs + 2), latency
+
+        return sorted(providers, key=key)
+
+    def summary(self) -> List[Dict[str, object]]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT provider, lang, wins, losses, failures, latency_ms FROM provider_stats ORDER BY provider, lang"
+            ).fetchall()
+        return [{"provider": provider, "lang": lang, "wins": wins, "losses": losses, "failures": failures,
+                 "latencyMs": round(latency, 1) if latency is not None else None}
+                for provider, lang, wins, losses, failures, latency in rows]
+
+
+def _valid_items(items: List[Dict[str, object]]) -> bool:
+    """Yarışta kabul edilen sonuç: en az bir çevrilmiş altyazı, süre biliniyorsa en iyisi yeterince uyumlu."""
+    if not items:
+        return False
+    timing = items[0].get("timing")
+    return timing is None or timing["score"] >= RACE_MIN_SCORE  # type: ignore[index]
+
+
+def _provider_worker(provider: SubtitleProvider, session: requests.Session, variants: List[str], langs: List[str],
+                     runtime: Optional[float], cancel: threading.Event, results: "queue.Queue",
+                     deadline: Optional[Deadline] = None) -> None:
+    token = _current_cancel.set(cancel)
+    deadline_token = _current_deadline.set(deadline)
+    started = time.perf_counter()
+    error = None
+    try:
+        for lang, items, source in provider.fetch(session, variants, langs, runtime):
+            results.put(("result", provider.name, (lang, items, source, round((time.perf_counter() - started) * 1000, 1))))
+    except Cancelled:
+        error = "cancelled"
+    except Exception as e:
+        print(f"✗ {provider.name} sağlayıcısı hata verdi: {e}")
+        error = str(e) or type(e).__name__
+    finally:
+        _current_deadline.reset(deadline_token)
+        _current_cancel.reset(token)
+        results.put(("done", provider.name, error))
+
+
+def race_providers(session: requests.Session, providers: List[SubtitleProvider], variants: List[str],
+                   langs: List[str], runtime: Optional[float] = None, width: int = RACE_WIDTH,
+                   metrics: Optional[RunMetrics] = None) -> Tuple[Dict[str, Dict[str, object]], Dict[str, Dict[str, object]]]:
+    """
+    Sağlayıcıları dil başına yarıştırır. En iyi sıradaki width sağlayıcı aynı anda başlar; biri
+    bitip hâlâ eksik dil varsa sıradaki başlatılır. Her dil için doğrulanan (_valid_items) ilk sonuç
+    kazanır; tüm diller kazanılınca süren sağlayıcılar iptal edilir (beklenmez). Doğrulanamayan
+    sonuçlar yalnızca hiçbir sağlayıcı geçerli sonuç bulamazsa kullanılır. width=1 sıralı denemedir.
+    Sonuçlar oturumdaki ProviderStats'e ve metrics olaylarına yazılır. Etkin bir Deadline varsa
+    sağlayıcılar onunla çalışır ve süre dolunca yarış o ana kadarki kazananlarla biter.
+
+    Returns:
+        ({dil: {'provider', 'items', 'source', 'ms', 'valid'}},
+         {dil: {'winner', 'results': {sağlayıcı: {'outcome', 'ms'?}}}})
+    """
+    stats: Optional[ProviderStats] = getattr(session, "provider_stats", None)
+    waiting = stats.rank(providers, langs) if stats is not None else list(providers)
+    pending = list(langs)
+    winners: Dict[str, Dict[str, object]] = {}
+    fallbacks: Dict[str, Dict[str, object]] = {}
+    report: Dict[str, Dict[str, object]] = {lang: {"winner": None, "results": {}} for lang in langs}
+    results: "queue.Queue" = queue.Queue()
+    running: Dict[str, threading.Event] = {}
+    asked: Dict[str, List[str]] = {}
+    deadline = _current_deadline.get()
+
+    def settle(name: str, lang: str, outcome: str, ms: Optional[float] = None) -> None:
+        report[lang]["results"][name] = {"outcome": outcome, **({"ms": ms} if ms is not None else {})}  # type: ignore[index]
+        if stats is not None:
+            stats.record(name, lang, outcome, ms)
+        if metrics is not None:
+            metrics.record_event("provider", provider=name, lang=lang, outcome=outcome, ms=ms)
+
+    pool = futures.ThreadPoolExecutor(max_workers=max(1, len(waiting)))
+
+    def start_next() -> None:
+        while waiting and pending and len(running) < max(1, width):
+            provider = waiting.pop(0)
+            running[provider.name] = threading.Event()
+            asked[provider.name] = list(pending)
+            pool.submit(_provider_worker, provider, session, variants, list(pending), runtime,
+                        running[provider.name], results, deadline)
+
+    try:
+        start_next()
+        while running and pending:
+            try:
+                kind, name, payload = results.get(timeout=deadline.remaining() if deadline is not None else None)
+            except queue.Empty:
+                deadline.hits.append("race")  # type: ignore[union-attr]
+                print("⏱ Süre doldu; yarış o ana kadar kazanılan dillerle bitiriliyor")
+                break
+            if kind == "done":
+                del running[name]
+                for lang in asked[name]:
+                    if name not in report[lang]["results"]:  # type: ignore[operator]
+                        settle(name, lang, "failed" if payload not in (None, "cancelled") else "empty")
+                start_next()
+                continue
+            lang, items, source, ms = payload
+            entry = {"provider": name, "items": items, "source": source, "ms": ms}
+            if lang not in pending:
+                settle(name, lang, "lost", ms)
+            elif _valid_items(items):
+                winners[lang] = {**entry, "valid": True}
+                report[lang]["winner"] = name
+                pending.remove(lang)
+                settle(name, lang, "won", ms)
+                print(f"🏁 {LANGUAGES[lang]['label']} altyazıyı {name} buldu ({ms:.0f} ms)")
+            else:
+                fallbacks.setdefault(lang, {**entry, "valid": False})
+                settle(name, lang, "invalid", ms)
+    finally:
+        for name, cancel in running.items():
+            cancel.set()
+            for lang in asked[name]:
+                if name not in report[lang]["results"]:  # type: ignore[operator]
+                    settle(name, lang, "cancelled")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    for lang, entry in fallbacks.items():
+        if lang not in winners:
+            winners[lang] = entry
+            report[lang]["winner"] = entry["provider"]
+    return winners, report
+
+
+def provider_query(session: requests.Session, query, out_dir: str = "./subs", langs: Optional[List[str]] = None,
+                   metrics: Optional[RunMetrics] = None, inline: bool = False, runtime: Optional[float] = None,
+                   width: Optional[int] = None, dest: Optional[Dict[str, str]] = None,
+                   media_dir: Optional[str] = None, deadline: Optional[float] = None) -> Dict[str, object]:
+    """
+    run_query'nin sağlayıcılı karşılığı: session.subtitle_providers (yoksa yalnızca turkcealtyazi)
+    race_providers ile yarıştırılır ve her dilin kazananı run_query ile aynı adlandırmayla yazılır
+    (ya da inline döndürülür, dest verilirse doğrudan hedefe yazılır). width verilmezse
+    session.race_width (varsayılan 1, sıralı) kullanılır. deadline run_query'deki gibidir; süre dolunca
+    yarış kesilir ve o ana kadar kazanılan diller yazılır.
+
+    Returns:
+        run_query ile aynı alanlar ('indexed' hariç); 'sources' kazanan sağlayıcıdaki kaynak
+        (altid ya da dosya), 'altids' yalnızca turkcealtyazi kazananları için, 'winners'
+        {dil: sağlayıcı}, 'providers' race_providers raporu.
+    """
+    variants = normalize_variants([query] if isinstance(query, str) else query)
+    if not variants:
+        raise ValueError("boş sorgu")
+    if dest is not None:
+        destination_prefix(media_dir or MEDIA_DIR, dest)
+        inline = True
+    providers = getattr(session, "subtitle_providers", None) or [TurkceAltyaziProvider()]
+    width = width or getattr(session, "race_width", 1)
+    wanted = [lang for lang in (langs if langs is not None else list(LANGUAGES)) if lang in LANGUAGES]
+    metrics = metrics or RunMetrics(variants[0])
+    result: Dict[str, object] = {"query": variants[0], "variants": variants, "status": "ok",
+                                 "files": {lang: [] for lang in LANGUAGES}, "sources": {}, "altids": {}, "winners": {}}
+    limit = Deadline(deadline) if deadline else None
+    token = _current_metrics.set(metrics)
+    deadline_token = _current_deadline.set(limit)
+    try:
+        with _single_flight(session, variants[0], wanted):
+            with metrics.stage("race"):
+                winners, report = race_providers(session, providers, variants, wanted, runtime, width, metrics)
+            result["providers"] = report
+            if not winners:
+                failed = any(outcome["outcome"] == "failed" for entry in report.values()
+                             for outcome in entry["results"].values())  # type: ignore[attr-defined]
+                print("❌ Hiçbir sağlayıcı altyazı bulamadı!")
+                result["status"] = "not_downloaded" if failed else "no_candidates"
+            else:
+                store: Optional[SubtitleStore] = getattr(session, "subtitle_store", None)
+                clean_query = sanitize_filename(variants[0].strip().lower().replace(" ", "_"))
+                extracted: Dict[str, List[Dict[str, object]]] = {}
+                with metrics.stage("extract"):
+                    for lang, winner in winners.items():
+                        extract_dir = None if inline else os.path.join(out_dir, f"{LANGUAGES[lang]['key']}_subtitles")
+                        extracted[lang] = _write_extracted(winner["items"], lang, clean_query, extract_dir, store)  # type: ignore[arg-type]
+                        result["sources"][lang] = winner["source"]  # type: ignore[index]
+                        result["winners"][lang] = winner["provider"]  # type: ignore[index]
+                        if winner["provider"] == TurkceAltyaziProvider.name and winner["source"]:
+                            result["altids"][lang] = winner["source"]  # type: ignore[index]
+                if dest is not None:
+                    result["subtitles"] = extracted
+                    _write_result_destination(session, result, dest, media_dir, result["altids"], metrics)  # type: ignore[arg-type]
+                elif inline:
+                    result["subtitles"] = _inline_subtitles(extracted)
+                else:
+                    result["files"].update({lang: [item["path"] for item in items] for lang, items in extracted.items()})  # type: ignore[union-attr]
+    except DeadlineExceeded:
+        result["status"] = "deadline"
+    finally:
+        _current_deadline.reset(deadline_token)
+        _current_metrics.reset(token)
+    if limit is not None:
+        _finish_deadline(result, limit, wanted)
+    result["metrics"] = metrics.to_dict()
     return result
 
 
+def warm_session(session: requests.Session) -> None:
+    """Ana sayfaya bir istek atarak TLS bağlantısını önceden kurar (hatalar yok sayılır)."""
+    try:
+        session.get(BASE + "/").close()
+    except requests.RequestException as e:
+        print(f"Oturum ısıtılamadı: {e}", file=sys.stderr)
+
+
+def run_job(session: requests.Session, job: Dict[str, object], default_out: str = "./subs") -> Dict[str, object]:
+    """
+    Bir JSON işini çalıştırır ve stdout'a yazılacak sonuç kaydını döndürür (istisna fırlatmaz).
+    İş tek bir "query" ya da sıralı varyant listesi olarak "queries" taşıyabilir.
+    Oturumda sağlayıcılar tanımlıysa ya da işte "race": true varsa provider_query kullanılır.
+    İşte "deadline" yoksa oturumun varsayılanı (--deadline) kullanılır; null verilirse süre sınırı olmaz.
+    """
+    job_id = job.get("id")
+    queries = job.get("queries") or job.get("query")
+    metrics = RunMetrics(str(queries[0] if isinstance(queries, list) and queries else queries))
+    try:
+        if not queries:
+            raise KeyError("query")
+        deadline = job["deadline"] if "deadline" in job else getattr(session, "deadline", None)
+        if getattr(session, "subtitle_providers", None) or job.get("race"):
+            width = (RACE_WIDTH if job["race"] else 1) if "race" in job else None
+            result = provider_query(session, queries, job.get("out") or default_out, langs=job.get("langs"),
+                                    metrics=metrics, inline=bool(job.get("inline")), runtime=job.get("runtime"),
+                                    width=width, dest=job.get("dest"), deadline=deadline)
+        else:
+            result = run_query(session, queries, job.get("out") or default_out, langs=job.get("langs"), metrics=metrics,
+                               inline=bool(job.get("inline")), runtime=job.get("runtime"), dest=job.get("dest"),
+                               deadline=deadline)
+        response = {"id": job_id, "ok": True, **result}
+    except requests.HTTPError as e:
+        status = getattr(e.response, "status_code", None)
+        response = {"id": job_id, "ok": False, "query": metrics.query, "error": f"HTTP hata: {e}",
+                    "httpStatus": status, "metrics": metrics.to_dict()}
+    except Exception as e:
+        response = {"id": job_id, "ok": False, "query": metrics.query, "error": str(e), "metrics": metrics.to_dict()}
+    write_metrics(response)
+    return response
+
+
+# --metrics ile verilen dosya ('-' ise stderr); her çalıştırma için bir JSON satırı eklenir
+METRICS_PATH: Optional[str] = None
+_metrics_lock = threading.Lock()
+
+
+def write_metrics(response: Dict[str, object]) -> None:
+    if not METRICS_PATH:
+        return
+    record = {"status": response.get("status", "error"), "ok": response.get("ok", True), **response.get("metrics", {})}  # type: ignore[dict-item]
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _metrics_lock:
+        if METRICS_PATH == "-":
+            sys.stderr.write(line)
+            sys.stderr.flush()
+        else:
+            with open(METRICS_PATH, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+def _json_writer(out):
+    def emit(payload: Dict[str, object]) -> None:
+        out.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        out.flush()
+    return emit
+
+
+def serve(session: requests.Session) -> None:
+    """
+    Kalıcı çalışan modu: stdin'den satır satır JSON iş okur, stdout'a satır satır JSON sonuç yazar.
+
+    İş:    {"id": 1, "query": "avengers endgame", "out": "/tmp/x", "langs": ["tr", "en"]}
+           {"id": 2, "queries": ["Avengers: Endgame", "avengers endgame 2019"], "langs": ["en"], "runtime": 181}
+    Sonuç: {"id": 1, "ok": true, "status": "ok", "files": {"tr": [...], "en": [...]}}
+    İşte "inline": true verilirse dosya yazılmaz, altyazılar "subtitles" alanında base64 döner.
+    "dest": {"dir": "Film (2004)", "base": "Film (2004)"} verilirse her dil doğrudan
+    <media>/<dir>/<base>.<dil>.<uzantı> olarak yazılır; sonuçtaki "manifest" yazılanları listeler.
+    "runtime" (dakika) verilirse altyazılar video süresine göre puanlanıp gerekirse yeniden zamanlanır.
+    "race": true/false sağlayıcıların dil başına yarışıp yarışmayacağını iş bazında belirler.
+    "deadline" (saniye) işin toplam süresini sınırlar; dolarsa durum "partial"/"deadline" olur.
+
+    stdout yalnızca sonuç satırlarına ayrılmıştır; ilerleme çıktıları stderr'e yönlendirilir.
+    Tüm işler aynı oturumu (ve bağlantı havuzunu) kullanır.
+    """
+    emit = _json_writer(sys.stdout)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        warm_session(session)
+        emit({"event": "ready"})
+
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError as e:
+                emit({"id": None, "ok": False, "error": f"Geçersiz JSON: {e}"})
+                continue
+            emit(run_job(session, job))
+
+
+def read_batch_jobs(lines: Iterable[str], out_dir: str, langs: Optional[List[str]] = None) -> List[Dict[str, object]]:
+    """
+    Toplu iş satırlarını okur. Her satır ya düz bir sorgu metni ya da serve modundaki gibi bir JSON iştir.
+    Çıktı klasörü verilmeyen işler, eşzamanlı indirmeler çakışmasın diye sorguya özel alt klasöre yazılır.
+    Dil belirtmeyen işler langs dillerini kullanır.
+    """
+    jobs: List[Dict[str, object]] = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            job = json.loads(line)
+        else:
+            job = {"query": line}
+        job.setdefault("id", len(jobs) + 1)
+        if langs is not None:
+            job.setdefault("langs", langs)
+        if not job.get("out"):
+            query = job.get("query") or (job.get("queries") or [""])[0]  # type: ignore[index]
+            job["out"] = os.path.join(out_dir, sanitize_filename(str(query).strip().lower().replace(" ", "_")))
+        jobs.append(job)
+    return jobs
+
+
+def run_batch(session: requests.Session, jobs: List[Dict[str, object]], workers: int = 4) -> int:
+    """
+    İşleri sınırlı bir iş parçacığı havuzunda çalıştırır; her sorgunun sonucu biter bitmez
+    stdout'a bir JSON satırı olarak yazılır. Başarılı iş sayısını döndürür.
+    """
+    emit = _json_writer(sys.stdout)
+    succeeded = 0
+    with contextlib.redirect_stdout(sys.stderr):
+        with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            pending = [pool.submit(run_job, session, job) for job in jobs]
+            for future in futures.as_completed(pending):
+                response = future.result()
+                if response.get("ok") and response.get("status") == "ok":
+                    succeeded += 1
+                emit(response)
+    return succeeded
+
+
+def add_session_store_arguments(parser: argparse.ArgumentParser) -> None:
+    """Yanıt önbelleği, çözümleme indeksi, altyazı deposu ve kiralama seçenekleri (scheduler ve watcher da kullanır)."""
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="Arama ve altyazı sayfaları için yanıt önbelleği (SQLite dosyası)")
+    parser.add_argument("--cache-ttl", type=float, default=24 * 60 * 60, help="Önbellek kaydının yeniden doğrulanmadan kullanılacağı süre (saniye)")
+    parser.add_argument("--cache-max-mb", type=float, default=64, help="Önbelleğin en fazla boyutu (MB); aşılınca en eski kullanılanlar silinir")
+    parser.add_argument("--no-cache", action="store_true", help="Yanıt önbelleğini kullanma")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Sorgu çözümleme indeksi (SQLite dosyası)")
+    parser.add_argument("--miss-ttl", type=float, default=3 * 24 * 60 * 60, help="'Sonuç yok' kayıtlarının geçerlilik süresi (saniye)")
+    parser.add_argument("--no-index", action="store_true", help="Sorgu çözümleme indeksini kullanma")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="İçerik adresli altyazı deposu klasörü")
+    parser.add_argument("--no-store", action="store_true", help="Altyazı deposunu kullanma; dosyalar doğrudan yazılır")
+    parser.add_argument("--leases", default=DEFAULT_LEASE_PATH,
+                        help="Süreçler arası tek uçuş kiralamaları: aynı (sorgu, dil) için ikinci iş ilkini bekler (SQLite dosyası)")
+    parser.add_argument("--no-single-flight", action="store_true", help="Kiralama kullanma; eşzamanlı aynı işler ayrı ayrı çalışır")
+
+
+def attach_session_stores(session: requests.Session, args: argparse.Namespace) -> None:
+    """add_session_store_arguments seçeneklerine göre önbellek, indeks, depo ve kiralamaları oturuma bağlar."""
+    if not args.no_cache:
+        session.response_cache = ResponseCache(args.cache, args.cache_ttl, int(args.cache_max_mb * 1024 * 1024))  # type: ignore[attr-defined]
+    if not args.no_index:
+        session.resolution_index = ResolutionIndex(args.index, args.miss_ttl)  # type: ignore[attr-defined]
+    if not args.no_store:
+        session.subtitle_store = SubtitleStore(args.store)  # type: ignore[attr-defined]
+    if not args.no_single_flight:
+        session.flight_leases = FlightLeases(args.leases)  # type: ignore[attr-defined]
 
 
 def main():
+    global PARSER_BACKEND, METRICS_PATH, PROFILE_DIR, TRACEMALLOC_DIR, SUBTITLE_OUTPUT, MEDIA_DIR
     parser = argparse.ArgumentParser(description="turkcealtyazi.org simple subtitle downloader")
-    parser.add_argument("--query", "-q", required=False, help="Film/dizi arama ifadesi (örn. 'avengers endgame')", default="avengers endgame")
+    parser.add_argument("--query", "-q", action="append", required=False,
+                        help="Film/dizi arama ifadesi (örn. 'avengers endgame'); birden fazla verilirse sırayla denenen varyantlar olur")
     parser.add_argument("--out", "-o", default="./subs", help="Çıktı klasörü")
-    parser.add_argument("--delay", type=float, default=1.0, help="İstekler arası kibar bekleme (saniye)")
+    parser.add_argument("--media", default=MEDIA_DIR, help="Hedeflerin (--dest-dir, işlerdeki \"dest\") göreli olduğu video klasörü")
+    parser.add_argument("--dest-dir", default="", help="Altyazıların yazılacağı klasör (media'ya göreli); --dest-base ile")
+    parser.add_argument("--dest-base", help="Video adı (uzantısız): altyazılar doğrudan <ad>.<dil>.<uzantı> olarak "
+                                            "yazılır ve stdout'a JSON manifest basılır")
+    parser.add_argument("--langs", type=parse_langs, default=list(LANGUAGES),
+                        help=f"İndirilecek diller, virgülle ayrılmış (örn. 'tr' veya 'en,tr'; varsayılan: {','.join(LANGUAGES)})")
+    parser.add_argument("--delay", type=float, default=1.0, help="Aynı siteye istekler arası ortalama kibar bekleme (saniye)")
+    parser.add_argument("--burst", type=int, default=2, help="Hız sınırlayıcının arka arkaya izin verdiği en fazla istek")
+    parser.add_argument("--serve", action="store_true", help="Kalıcı mod: stdin'den JSON-lines iş okur, stdout'a JSON-lines sonuç yazar")
+    parser.add_argument("--batch", metavar="FILE", help="Toplu mod: her satırı bir sorgu (veya JSON iş) olan dosya; '-' ise stdin")
+    parser.add_argument("--workers", type=int, default=4, help="Toplu modda eşzamanlı sorgu sayısı")
+    parser.add_argument("--timeout", type=float, default=20, help="İstek başına zaman aşımı (saniye)")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="Sorgu başına uçtan uca süre bütçesi; aşamalara bölünür, dolunca alınan dillerle 'partial' döner")
+    parser.add_argument("--retries", type=int, default=3, help="Geçici hatalarda (bağlantı, 429/5xx) en fazla yeniden deneme sayısı")
+    parser.add_argument("--backoff", type=float, default=0.5, help="Üstel geri çekilmenin taban süresi (saniye)")
+    parser.add_argument("--max-backoff", type=float, default=30, help="Yeniden denemeler arası en uzun bekleme; Retry-After da bununla sınırlanır (saniye)")
+    parser.add_argument("--pool-size", type=int, help="Host başına bağlantı havuzu boyutu (varsayılan: en az 10 ve --workers)")
+    add_session_store_arguments(parser)
+    parser.add_argument("--store-gc", type=float, metavar="DAYS",
+                        help="Depoda hiçbir yere bağlı olmayan ve DAYS gündür kullanılmayan altyazıları silip çık")
+    parser.add_argument("--providers", type=parse_providers,
+                        help="Altyazı sağlayıcıları, öncelik sırasıyla (örn. 'turkcealtyazi,local:/arsiv/altyazilar')")
+    parser.add_argument("--race", action="store_true",
+                        help="Sağlayıcıları dil başına yarıştır: ilk geçerli sonuç kazanır, diğerleri iptal edilir")
+    parser.add_argument("--race-width", type=int, default=RACE_WIDTH,
+                        help="Yarışta aynı anda sorulan en fazla sağlayıcı; sıralama geçmiş kazanma oranı ve gecikmeye göre")
+    parser.add_argument("--provider-stats", action="store_true", help="Sağlayıcı kazanma/gecikme istatistiklerini yazdırıp çık")
+    parser.add_argument("--parser", choices=["fast", "bs4"], default=PARSER_BACKEND, help="HTML ayrıştırma yöntemi")
+    parser.add_argument("--runtime", type=float, metavar="MINUTES",
+                        help="Video süresi (dakika); altyazılar buna göre puanlanır, kayanlar düzeltilir (numpy gerekir)")
+    parser.add_argument("--subtitle-format", choices=["vtt", "original"], default=SUBTITLE_OUTPUT,
+                        help="Çıkarılan altyazıları UTF-8 WebVTT'ye çevir (vtt) veya arşivdeki haliyle bırak (original)")
+    parser.add_argument("--metrics", metavar="PATH", help="Her çalıştırma için JSON ölçüm kaydını bu dosyaya ekle ('-' ise stderr)")
+    parser.add_argument("--profile", metavar="DIR", help="Her aşama için cProfile dökümünü (.prof) bu klasöre yaz")
+    parser.add_argument("--tracemalloc", metavar="DIR", help="Her aşamadan sonra tracemalloc anlık görüntüsünü bu klasöre yaz")
     args = parser.parse_args()
 
-    session = build_session()
-    # Step 1: search page
-    html = search_query(session, args.query)
-    time.sleep(args.delay)
+    PARSER_BACKEND = args.parser
+    SUBTITLE_OUTPUT = args.subtitle_format
+    METRICS_PATH = args.metrics
+    PROFILE_DIR = args.profile
+    TRACEMALLOC_DIR = args.tracemalloc
+    MEDIA_DIR = args.media
 
+    if args.store_gc is not None:
+        removed = SubtitleStore(args.store).gc(args.store_gc * 24 * 60 * 60)
+        print(f"Depo temizlendi: {removed['objects']} altyazı ({removed['bytes']} bayt), "
+              f"{removed['placements']} eski yerleşim kaydı silindi.")
+        return
 
-    # Step 2: parse forms
-    candidates = parse_Subs(html)
-    if not candidates:
-        print("Aday bulunamadı. Arama ifadenizi değiştirin veya sayfa yapısı değişmiş olabilir.", file=sys.stderr)
-        sys.exit(2)
+    if args.provider_stats:
+        emit = _json_writer(sys.stdout)
+        for row in ProviderStats().summary():
+            emit(row)
+        return
 
-    # get most download subs.
+    rate = 1.0 / args.delay if args.delay > 0 else None
+    retry = RetryPolicy(max(0, args.retries), args.backoff, args.max_backoff)
+    session = build_session(timeout=args.timeout, rate=rate, burst=args.burst,
+                            pool_size=args.pool_size or max(10, args.workers), retry=retry)
+    attach_session_stores(session, args)
+    session.deadline = args.deadline  # type: ignore[attr-defined]
+    if args.providers or args.race:
+        session.subtitle_providers = args.providers or [TurkceAltyaziProvider()]  # type: ignore[attr-defined]
+        session.race_width = max(1, args.race_width) if args.race else 1  # type: ignore[attr-defined]
+        session.provider_stats = ProviderStats()  # type: ignore[attr-defined]
+    if args.serve:
+        serve(session)
+        return
 
-    most_downloaded_result = get_Most_Downloaded_Subtitle(candidates)
-    
-    # get results from most downloaded
-    
-    page_results = process_most_downloaded_subtitles(session, most_downloaded_result)
-    time.sleep(args.delay)
-    
-    # Download from page results
-    print("\n=== En Çok İndirilen Altyazıları İndirme ===")
-    # args.out = "./most_downloaded_subs"
-    download_results = download_from_page_results(session, page_results, args.out)
-    
-    if download_results["turkish_file"]:
-        print(f"🎉 Türkçe altyazı başarıyla indirildi!")
-    
-    if download_results["english_file"]:
-        print(f"🎉 İngilizce altyazı başarıyla indirildi!")
-    
-    if not download_results["turkish_file"] and not download_results["english_file"]:
-        print("❌ Hiçbir altyazı indirilemedi!")
+    if args.batch:
+        if args.batch == "-":
+            jobs = read_batch_jobs(sys.stdin, args.out, args.langs)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                jobs = read_batch_jobs(f, args.out, args.langs)
+        succeeded = run_batch(session, jobs, args.workers)
+        print(f"Toplu iş tamamlandı: {succeeded}/{len(jobs)} sorgu için altyazı indirildi.", file=sys.stderr)
         return
 
-    # Arşivleri çıkart ve temizle
-    print("\n=== Arşivleri Çıkartma ve Temizleme ===")
-    extracted_results = extract_and_cleanup_archives(download_results, args.query)
-    
+    job = {"queries": args.query or ["avengers endgame"], "out": args.out, "langs": args.langs, "runtime": args.runtime}
+    if args.dest_base:
+        # stdout yalnızca manifest satırına ayrılır
+        job["dest"] = {"dir": args.dest_dir, "base": args.dest_base}
+        with contextlib.redirect_stdout(sys.stderr):
+            result = run_job(session, job)
+        if result["ok"]:
+            _json_writer(sys.stdout)({key: result.get(key) for key in ("query", "status", "manifest")})
+    else:
+        result = run_job(session, job)
+    if not result["ok"]:
+        if result.get("httpStatus") is not None:
+            print(f"HTTP hata: {result['error']} - Yanıt: {result['httpStatus']}", file=sys.stderr)
+            sys.exit(3)
+        print(f"Hata: {result['error']}", file=sys.stderr)
+        sys.exit(4)
+    if result["status"] == "no_candidates":
+        print("Aday bulunamadı. Arama ifadenizi değiştirin veya sayfa yapısı değişmiş olabilir.", file=sys.stderr)
+        sys.exit(2)
+    if result["status"] == "deadline":
+        print(f"Süre bütçesi ({args.deadline:g} sn) hiçbir altyazı alınamadan doldu.", file=sys.stderr)
+        sys.exit(5)
+    if result["status"] not in ("ok", "partial") or args.dest_base:
+        return
+
+    files = result["files"]
     print("\n🎉 İşlem Tamamlandı!")
-    if extracted_results["turkish_files"]:
-        print(f"🇹🇷 Türkçe altyazı dosyaları:")
-        for file_path in extracted_results["turkish_files"]:
-            print(f"   📄 {os.path.basename(file_path)}")
-    
-    if extracted_results["english_files"]:
-        print(f"🇺🇸 İngilizce altyazı dosyaları:")
-        for file_path in extracted_results["english_files"]:
-            print(f"   📄 {os.path.basename(file_path)}")
-    
-    total_files = len(extracted_results["turkish_files"]) + len(extracted_results["english_files"])
+    for lang, paths in files.items():
+        if paths:
+            print(f"{LANGUAGES[lang]['flag']} {LANGUAGES[lang]['label']} altyazı dosyaları:")
+            for file_path in paths:
+                print(f"   📄 {os.path.basename(file_path)}")
+
+    total_files = sum(len(paths) for paths in files.values())
     print(f"\nToplam {total_files} altyazı dosyası hazır!")
-    
 
-    
 
 if __name__ == "__main__":
     try:
         main()
-    except requests.HTTPError as e:
-        print(f"HTTP hata: {e} - Yanıt: {getattr(e.response, 'status_code', 'N/A')}", file=sys.stderr)
-        sys.exit(3)
     except Exception as e:
+        # requests hiç yüklenmediyse (ör. argüman hatası) HTTPError olamaz; kontrol onu yüklememeli
+        if "requests" in sys.modules and isinstance(e, requests.HTTPError):
+            print(f"HTTP hata: {e} - Yanıt: {getattr(e.response, 'status_code', 'N/A')}", file=sys.stderr)
+            sys.exit(3)
         print(f"Hata: {e}", file=sys.stderr)
         sys.exit(4)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İndirilen arşivin doğrulanması: bozuk ZIP, ZIP diye gönderilen RAR, hedef klasörün dışına çıkan
+üye yolları ve altyazı içermeyen arşivler.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ta_downloader  # noqa: E402
+
+SRT = b"1\n00:00:01,000 --> 00:00:02,000\nMerhaba\n"
+RAR_HEADER = b"Rar!\x1a\x07\x01\x00"
+
+
+def zip_bytes(members) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def archive(data: bytes, name: str = "tr_1.zip") -> "ta_downloader.SubtitleArchive":
+    result = ta_downloader.SubtitleArchive(name)
+    result.write(data)
+    return result
+
+
+class SubtitleArchiveTest(unittest.TestCase):
+    def test_valid_zip_keeps_only_subtitles(self):
+        data = zip_bytes([("film.srt", SRT), ("oku.txt", b"reklam"), ("alt/film.ass", b"[Script Info]\n")])
+        members = archive(data).subtitle_members()
+        self.assertEqual([name for name, _ in members], ["film.srt", "alt/film.ass"])
+        self.assertEqual(members[0][1], SRT)
+
+    def test_rar_sent_as_zip(self):
+        with self.assertRaisesRegex(ValueError, "ZIP"):
+            archive(RAR_HEADER + b"\x00" * 64, "tr_1.zip").subtitle_members()
+
+    def test_html_error_page_sent_as_zip(self):
+        with self.assertRaisesRegex(ValueError, "ZIP"):
+            archive(b"<!DOCTYPE html><title>Hata</title>").subtitle_members()
+
+    def test_corrupt_member(self):
+        for method in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w", method) as zf:
+                zf.writestr("film.srt", SRT * 20)
+            data = bytearray(buffer.getvalue())
+            # Üye verisinin ortasındaki bir baytı boz; imza ve merkezi dizin sağlam kalır
+            data[30 + len("film.srt") + 10] ^= 0xFF
+            with self.subTest(method=method), self.assertRaises(zipfile.BadZipFile):
+                archive(bytes(data)).subtitle_members()
+
+    def test_truncated_zip(self):
+        data = zip_bytes([("film.srt", SRT)])
+        with self.assertRaises(zipfile.BadZipFile):
+            archive(data[: len(data) // 2]).subtitle_members()
+
+    def test_zip_without_subtitles(self):
+        with self.assertRaisesRegex(ValueError, "altyazı dosyası yok"):
+            archive(zip_bytes([("oku.txt", b"yok")])).subtitle_members()
+
+    def test_size_limit(self):
+        too_big = ta_downloader.SubtitleArchive("buyuk.zip")
+        with self.assertRaises(ValueError):
+            too_big.write(b"\0" * (ta_downloader.ARCHIVE_MAX_BYTES + 1))
+        too_big.close()
+
+
+class ExtractArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out_dir = os.path.join(self.tmp.name, "subs")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def extract(self, archives):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return ta_downloader.extract_subtitle_archives(archives, "Kaçış Filmi", self.out_dir)
+
+    def all_files(self):
+        return sorted(os.path.relpath(os.path.join(directory, name), self.tmp.name)
+                      for directory, _, names in os.walk(self.tmp.name) for name in names)
+
+    def test_member_paths_cannot_escape_target(self):
+        data = zip_bytes([("../../kacak.srt", SRT), ("/tmp/mutlak.srt", SRT), ("..\\..\\windows.srt", SRT)])
+        result = self.extract({"tr": archive(data)})
+        self.assertEqual(len(result["tr"]), 3)
+        target = os.path.join(self.out_dir, "turkish_subtitles")
+        for item in result["tr"]:
+            self.assertEqual(os.path.dirname(os.path.realpath(item["path"])), os.path.realpath(target))
+        # Yalnızca sorgudan türetilen adlar yazılır (ve her .vtt yanında ipucu indeksi)
+        written = {name for name in self.all_files() if not name.endswith(ta_downloader.CUE_INDEX_SUFFIX)}
+        self.assertEqual(written, {f"subs/turkish_subtitles/kaçış_filmi.tr{suffix}.vtt" for suffix in ("", ".2", ".3")})
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "..", "kacak.srt")))
+        self.assertFalse(os.path.exists("/tmp/mutlak.srt"))
+
+    def test_bad_archive_does_not_stop_other_languages(self):
+        bad = archive(RAR_HEADER + b"\x00" * 64)
+        result = self.extract({"tr": bad, "en": archive(zip_bytes([("film.srt", SRT)]))})
+        self.assertEqual(result["tr"], [])
+        self.assertEqual([item["name"] for item in result["en"]], ["kaçış_filmi.en.vtt"])
+        self.assertTrue(bad.buffer.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
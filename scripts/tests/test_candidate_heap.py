@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CandidateHeap / top_candidates testleri: dil başına en çok indirilen k aday, eşit indirme sayısında
+önce görülenin öne geçmesi ve sıralamayla bulunan sonuçla birebir aynılık.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ta_downloader  # noqa: E402
+
+
+def candidate(url: str, language: str, downloads) -> dict:
+    return {"url": url, "title": url, "language": language, "downloads": downloads}
+
+
+def urls(ranked) -> dict:
+    return {lang: [item["url"] for item in items] for lang, items in ranked.items()}
+
+
+class CandidateHeapTest(unittest.TestCase):
+    def test_top_k_in_descending_order(self):
+        subs = [candidate(f"/sub/{n}/", "tr", n) for n in (5, 50, 1, 30, 40)]
+        self.assertEqual(urls(ta_downloader.top_candidates(subs, ["tr"], k=3)), {"tr": ["/sub/50/", "/sub/40/", "/sub/30/"]})
+
+    def test_ties_keep_first_seen(self):
+        subs = [candidate("/a/", "tr", 10), candidate("/b/", "tr", 20), candidate("/c/", "tr", 10),
+                candidate("/d/", "tr", 20), candidate("/e/", "tr", 10)]
+        self.assertEqual(urls(ta_downloader.top_candidates(subs, ["tr"], k=1)), {"tr": ["/b/"]})
+        self.assertEqual(urls(ta_downloader.top_candidates(subs, ["tr"], k=3)), {"tr": ["/b/", "/d/", "/a/"]})
+        self.assertEqual(urls(ta_downloader.top_candidates(subs, ["tr"], k=10)), {"tr": ["/b/", "/d/", "/a/", "/c/", "/e/"]})
+
+    def test_languages_are_ranked_separately(self):
+        subs = [candidate("/tr1/", "tr", 3), candidate("/en1/", "en", 9), candidate("/de/", "de", 99),
+                candidate("/tr2/", "tr", 7)]
+        heap = ta_downloader.CandidateHeap(["tr", "en"], k=1)
+        for sub in subs:
+            heap.push(sub)
+        self.assertEqual(urls(heap.ranked()), {"tr": ["/tr2/"], "en": ["/en1/"]})
+        # İstenmeyen diller yalnızca sayılır
+        self.assertEqual(heap.counts, {"tr": 2, "en": 1, "de": 1})
+        self.assertEqual(heap.total, 4)
+        self.assertEqual(ta_downloader.CandidateHeap(["en"]).best(), {"en": None})
+
+    def test_missing_downloads_count_as_zero(self):
+        subs = [candidate("/bos/", "tr", ""), candidate("/yok/", "tr", None), candidate("/bir/", "tr", 1)]
+        self.assertEqual(urls(ta_downloader.top_candidates(subs, ["tr"], k=3)), {"tr": ["/bir/", "/bos/", "/yok/"]})
+
+    def test_slotted_candidates(self):
+        subs = [ta_downloader.SubtitleCandidate(f"/sub/{n}/", "x", "tr", downloads=n) for n in (2, 8, 8)]
+        best = ta_downloader.get_Most_Downloaded_Subtitle(iter(subs), ["tr"])
+        self.assertIs(best["tr"], subs[1])
+
+    def test_invalid_k(self):
+        with self.assertRaises(ValueError):
+            ta_downloader.CandidateHeap(["tr"], k=0)
+
+    def test_matches_stable_sort(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            subs = [candidate(f"/{i}/", rng.choice(["tr", "en"]), rng.randint(0, 5)) for i in range(rng.randint(0, 40))]
+            k = rng.randint(1, 6)
+            expected = {lang: [sub["url"] for sub in sorted((s for s in subs if s["language"] == lang),
+                                                             key=lambda s: s["downloads"], reverse=True)[:k]]
+                        for lang in ("tr", "en")}
+            self.assertEqual(urls(ta_downloader.top_candidates(subs, ["tr", "en"], k)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
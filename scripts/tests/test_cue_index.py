@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İpucu indeksi (.cues sidecar) testleri: Python'da yazılıp yine Python'da ve server/cueIndex.js ile
+okunması, pencere aramasının sınırları (ilk ipucu, son ipucu, boş pencere) ve bayat sidecar.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import ta_downloader  # noqa: E402
+
+CUE_INDEX_JS = os.path.join(SCRIPTS_DIR, "..", "server", "cueIndex.js")
+
+HEADER = b"WEBVTT\n\nNOTE deneme\n\n"
+# İkinci ipucu uzun: 4 sn'de başlayıp 20 sn'de biter, sonraki ipuçlarıyla örtüşür
+CUES = [
+    (1000, 2000, b"1\n00:00:01.000 --> 00:00:02.000\nilk\n\n"),
+    (4000, 20000, b"2\n00:00:04.000 --> 00:00:20.000\nuzun\n\n"),
+    (6000, 7000, b"00:06.000 --> 00:07.000\nkimliksiz\n\n"),
+    (30000, 31000, "4\n00:00:30.000 --> 00:00:31.000\nara sonrası\n\n".encode("utf-8")),
+    (100 * 3600000, 100 * 3600000 + 500, b"5\n100:00:00.000 --> 100:00:00.500\nson\n"),
+]
+VTT = HEADER + b"".join(block for _, _, block in CUES)
+
+
+class CueIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "film.tr.vtt")
+        with open(self.path, "wb") as f:
+            f.write(VTT)
+        self.assertEqual(ta_downloader.write_cue_index(self.path), self.path + ta_downloader.CUE_INDEX_SUFFIX)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def window(self, start_ms: int, end_ms: int) -> bytes:
+        return ta_downloader.read_cue_window(self.path, start_ms, end_ms)
+
+    def expected(self, *positions: int) -> bytes:
+        return HEADER + b"".join(CUES[i][2] for i in positions)
+
+    def test_round_trip(self):
+        index = ta_downloader.CueIndex.load(self.path)
+        self.assertEqual(list(index.starts), [start for start, _, _ in CUES])
+        self.assertEqual(list(index.max_ends), [2000, 20000, 20000, 31000, 100 * 3600000 + 500])
+        self.assertEqual(index.offsets[0], len(HEADER))
+        self.assertEqual(index.offsets[-1], len(VTT))
+        # Blok konumları kimlik satırını da kapsar
+        for i, (_, _, block) in enumerate(CUES):
+            self.assertEqual(VTT[index.offsets[i]:index.offsets[i + 1]], block)
+
+    def test_first_and_last_cue(self):
+        self.assertEqual(self.window(0, 1500), self.expected(0))
+        self.assertEqual(self.window(0, 1000), HEADER)  # ilk ipucu tam pencere sonunda başlıyor
+        self.assertEqual(self.window(100 * 3600000 + 499, 200 * 3600000), self.expected(4))
+        self.assertEqual(self.window(30500, 200 * 3600000), self.expected(3, 4))
+        self.assertEqual(self.window(0, 200 * 3600000), VTT)
+
+    def test_overlapping_cue_is_included(self):
+        # 10 sn'de yalnızca uzun ipucu görünür; arada başlayıp biten ipucu da aralıkta kalır
+        self.assertEqual(self.window(10000, 11000), self.expected(1, 2))
+        # Sıfır uzunluklu pencere o anda görünen ipucunu verir
+        self.assertEqual(self.window(5000, 5000), self.expected(1))
+
+    def test_empty_windows(self):
+        self.assertEqual(self.window(2000, 4000), HEADER)  # ilk ipucu tam pencere başında bitiyor
+        self.assertEqual(self.window(21000, 29000), HEADER)
+        self.assertEqual(self.window(25000, 25000), HEADER)
+        self.assertEqual(self.window(200 * 3600000, 201 * 3600000), HEADER)
+
+    def test_stale_sidecar_is_ignored(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(VTT + b"\n")
+        os.replace(tmp_path, self.path)
+        self.assertIsNone(ta_downloader.CueIndex.load(self.path))
+        self.assertIsNone(self.window(0, 1500))
+
+    def test_unservable_or_unsorted_vtt_has_no_index(self):
+        self.assertIsNone(ta_downloader.build_cue_index(VTT.replace(b"\n", b"\r\n"), 1, 1))
+        unsorted = HEADER + CUES[1][2] + CUES[0][2]
+        self.assertIsNone(ta_downloader.build_cue_index(unsorted, 1, len(unsorted)))
+
+    @unittest.skipUnless(shutil.which("node"), "node yüklü değil")
+    def test_node_reads_python_sidecar(self):
+        script = """
+const cueIndex = require(process.argv[1]);
+const fs = require('fs');
+(async () => {
+  const [vttPath, windows] = [process.argv[2], JSON.parse(process.argv[3])];
+  const stat = fs.statSync(vttPath, { bigint: true });
+  const built = cueIndex.buildCueIndex(fs.readFileSync(vttPath), stat);
+  const bodies = [];
+  for (const [start, end] of windows) {
+    const result = await cueIndex.readCueWindow(vttPath, start, end);
+    bodies.push(result && result.body.toString('latin1'));
+  }
+  process.stdout.write(JSON.stringify({ built: built.toString('latin1'), bodies }));
+})();
+"""
+        windows = [[0, 1500], [0, 1000], [10000, 11000], [5000, 5000], [2000, 4000], [21000, 29000],
+                   [30500, 200 * 3600000], [200 * 3600000, 201 * 3600000]]
+        output = subprocess.run(["node", "-e", script, os.path.abspath(CUE_INDEX_JS), self.path, json.dumps(windows)],
+                                check=True, capture_output=True, timeout=30).stdout
+        result = json.loads(output)
+        with open(self.path + ta_downloader.CUE_INDEX_SUFFIX, "rb") as f:
+            self.assertEqual(result["built"].encode("latin1"), f.read())
+        for (start, end), body in zip(windows, result["bodies"]):
+            self.assertEqual(body.encode("latin1"), self.window(start, end), (start, end))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Deadline testleri: bütçenin DEADLINE_STAGES ağırlıklarıyla aşamalara bölünmesi, artan sürenin
+sonraki aşamalara kalması ve süre dolunca iptal, bekleme ve sonuç davranışı.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "bench"))
+
+import ta_downloader  # noqa: E402
+from standin import StandInConfig, start_standin  # noqa: E402
+
+WEIGHTS = dict(ta_downloader.DEADLINE_STAGES)
+TOTAL_WEIGHT = sum(WEIGHTS.values())
+
+
+class Clock:
+    """time.monotonic yerine elle ilerletilen saat."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class DeadlineSplitTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch.object(ta_downloader.time, "monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stages_share_budget_by_weight(self):
+        # Bütçe ağırlıkların toplamı kadarsa her aşama tam payını kullanınca payı ağırlığına eşit olur
+        deadline = ta_downloader.Deadline(TOTAL_WEIGHT)
+        for name, weight in ta_downloader.DEADLINE_STAGES:
+            stage = deadline.for_stage(name)
+            self.assertEqual(stage.stage_name, name)
+            self.assertAlmostEqual(stage.remaining(), weight)
+            self.clock.now += weight
+        self.assertEqual(deadline.remaining(), 0.0)
+
+    def test_unused_time_carries_over(self):
+        deadline = ta_downloader.Deadline(TOTAL_WEIGHT)
+        deadline.for_stage("index")
+        self.clock.now += 0.25  # index payının çeyreği kullanıldı
+        later = TOTAL_WEIGHT - WEIGHTS["index"]
+        self.assertAlmostEqual(deadline.for_stage("search").remaining(),
+                               (TOTAL_WEIGHT - 0.25) * WEIGHTS["search"] / later)
+        # Atlanan aşamaların payı da sonrakilere kalır; son aşama kalanın tamamını alır
+        self.assertAlmostEqual(deadline.for_stage("write").remaining(), TOTAL_WEIGHT - 0.25)
+
+    def test_unlisted_stage_uses_enclosing_share(self):
+        pages = ta_downloader.Deadline(10).for_stage("pages")
+        self.assertIs(pages.for_stage("parse"), pages)
+        self.assertEqual(pages.for_stage("parse").stage_name, "pages")
+
+    def test_stage_cannot_outlive_run(self):
+        deadline = ta_downloader.Deadline(2)
+        self.clock.now += 5
+        stage = deadline.for_stage("search")
+        self.assertEqual(stage.remaining(), 0.0)
+        self.assertEqual(stage.stage_expires_at, self.clock.now)
+
+    def test_clip(self):
+        stage = ta_downloader.Deadline(TOTAL_WEIGHT).for_stage("index")
+        self.assertAlmostEqual(stage.clip(None), 1.0)
+        self.assertAlmostEqual(stage.clip(20), 1.0)
+        self.assertEqual(stage.clip(0.5), 0.5)
+        connect, read = stage.clip((3.05, None))
+        self.assertAlmostEqual(connect, 1.0)
+        self.assertAlmostEqual(read, 1.0)
+        self.clock.now += 10
+        # Süre dolmuşken bile zaman aşımı 0 olmaz (requests 0'ı engelleyici sayar)
+        self.assertEqual(stage.clip(20), 0.001)
+
+
+class DeadlineExhaustionTest(unittest.TestCase):
+    def test_expired_stage_cancels_and_is_reported_once(self):
+        deadline = ta_downloader.Deadline(5)
+        stage = deadline.for_stage("search")
+        stage.stage_expires_at = time.monotonic() - 0.01
+        token = ta_downloader._current_deadline.set(stage)
+        try:
+            for _ in range(2):
+                with self.assertRaises(ta_downloader.DeadlineExceeded) as raised:
+                    ta_downloader.check_cancelled()
+                self.assertIn("search", str(raised.exception))
+        finally:
+            ta_downloader._current_deadline.reset(token)
+        # Kopyalar hits listesini paylaşır; to_dict tekrarları atar
+        self.assertEqual(deadline.hits, ["search", "search"])
+        self.assertEqual(deadline.to_dict()["exceeded"], ["search"])
+        self.assertIsInstance(raised.exception, ta_downloader.Cancelled)
+
+    def test_sleep_that_would_overrun_fails_at_once(self):
+        token = ta_downloader._current_deadline.set(ta_downloader.Deadline(0.5))
+        try:
+            started = time.monotonic()
+            with self.assertRaises(ta_downloader.DeadlineExceeded):
+                ta_downloader._sleep(2)
+            self.assertLess(time.monotonic() - started, 0.1)
+            ta_downloader._sleep(0.01)  # sığan bekleme yapılır
+        finally:
+            ta_downloader._current_deadline.reset(token)
+
+
+class RunQueryDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = StandInConfig(latency_ms=400)
+        self.server = start_standin(self.config)
+        host, port = self.server.server_address[:2]
+        self.base = ta_downloader.BASE
+        ta_downloader.BASE = f"http://{host}:{port}"
+
+    def tearDown(self):
+        ta_downloader.BASE = self.base
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def run_query(self, deadline: float):
+        session = ta_downloader.build_session(retry=ta_downloader.RetryPolicy(retries=0))
+        with contextlib.redirect_stdout(io.StringIO()):
+            return ta_downloader.run_query(session, "Deadline Film", self.tmp.name, langs=["tr", "en"], deadline=deadline)
+
+    def test_exhausted_budget_returns_deadline_status(self):
+        # İndeks boş geçer; arama payı kalan ~1 sn'nin 1.5/6.25'i (~0.24 sn), 400 ms'lik istek yetişemez
+        started = time.monotonic()
+        result = self.run_query(1.0)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(result["status"], "deadline")
+        self.assertEqual(result["deadline"]["exceeded"], ["search"])
+        self.assertEqual(result["deadline"]["missing"], ["tr", "en"])
+        self.assertEqual(result["deadline"]["budgetMs"], 1000)
+
+    def test_sufficient_budget_reports_without_changing_status(self):
+        result = self.run_query(60)
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["deadline"]["exceeded"], [])
+        self.assertNotIn("missing", result["deadline"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FlightLeases için testler: dillerin ya hep ya hiç alınması, bayat kiralamaların devralınması,
+tutulan kiralamanın uzatılması ve bekleyen işin sonucu istek atmadan indeks/depodan alması.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import contextlib
+import io
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "bench"))
+
+import ta_downloader  # noqa: E402
+from standin import StandInConfig, start_standin  # noqa: E402
+
+
+def dead_pid() -> int:
+    """Bitmiş bir alt sürecin pid'i (aynı makinede artık yaşamayan sahip)."""
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    child.wait()
+    return child.pid
+
+
+class FlightLeaseTableTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "leases.sqlite")
+        # Ayrı örnekler ayrı süreçlerdeki bağlantılar gibi davranır
+        self.first = ta_downloader.FlightLeases(self.path)
+        self.second = ta_downloader.FlightLeases(self.path)
+
+    def tearDown(self):
+        self.first.conn.close()
+        self.second.conn.close()
+        self.tmp.cleanup()
+
+    def insert(self, lang: str, host: str, pid: int, expires_at: float) -> None:
+        self.first.conn.execute(
+            "INSERT OR REPLACE INTO leases (query, lang, owner, host, pid, acquired_at, expires_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ("film", lang, f"{host}:{pid}:1", host, pid, time.time(), expires_at),
+        )
+        self.first.conn.commit()
+
+    def owners(self):
+        return dict(self.first.conn.execute("SELECT lang, owner FROM leases WHERE query = 'film'"))
+
+    def test_all_or_nothing(self):
+        self.assertEqual(self.first.try_acquire("Film", ["tr"], "a"), [])
+        self.assertEqual(self.second.try_acquire("film", ["tr", "en"], "b"), [("tr", "a")])
+        # Engellenen iş en'i de almamış olmalı
+        self.assertEqual(self.owners(), {"tr": "a"})
+        self.assertEqual(self.second.try_acquire("film", ["en"], "c"), [])
+        self.first.release("film", ["tr"], "a")
+        self.assertEqual(self.second.try_acquire("film", ["tr", "en"], "b"), [("en", "c")])
+        self.assertEqual(self.owners(), {"en": "c"})
+
+    def test_takes_over_dead_owner(self):
+        self.insert("tr", socket.gethostname(), dead_pid(), time.time() + 600)
+        self.assertEqual(self.second.try_acquire("film", ["tr"], "b"), [])
+        self.assertEqual(self.owners(), {"tr": "b"})
+
+    def test_takes_over_expired_remote_owner(self):
+        self.insert("tr", "baska-makine", 1, time.time() - 1)
+        self.assertEqual(self.second.try_acquire("film", ["tr"], "b"), [])
+
+    def test_live_remote_owner_blocks(self):
+        self.insert("tr", "baska-makine", 1, time.time() + 600)
+        self.assertEqual(self.second.try_acquire("film", ["tr"], "b"), [("tr", "baska-makine:1:1")])
+
+    def test_hold_renews_lease(self):
+        leases = ta_downloader.FlightLeases(self.path, ttl=0.3)
+        try:
+            with leases.hold("film", ["tr"]):
+                time.sleep(1.0)
+                # ttl'nin üç katı geçti; uzatılmasaydı ikinci iş devralırdı
+                self.assertEqual(len(self.second.try_acquire("film", ["tr"], "b")), 1)
+            self.assertEqual(self.second.try_acquire("film", ["tr"], "b"), [])
+        finally:
+            leases.conn.close()
+
+
+class SingleFlightQueryTest(unittest.TestCase):
+    """İki iş parçacığı, ayrı oturumlar ve ayrı FlightLeases örnekleriyle aynı başlığı ister."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = StandInConfig(latency_ms=150)
+        self.server = start_standin(self.config)
+        host, port = self.server.server_address[:2]
+        self.base = ta_downloader.BASE
+        ta_downloader.BASE = f"http://{host}:{port}"
+
+    def tearDown(self):
+        ta_downloader.BASE = self.base
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def session(self):
+        session = ta_downloader.build_session(retry=ta_downloader.RetryPolicy(retries=0))
+        session.resolution_index = ta_downloader.ResolutionIndex(os.path.join(self.tmp.name, "index.sqlite"))
+        session.subtitle_store = ta_downloader.SubtitleStore(os.path.join(self.tmp.name, "store"))
+        session.flight_leases = ta_downloader.FlightLeases(os.path.join(self.tmp.name, "leases.sqlite"))
+        return session
+
+    def run_query(self, name: str, results: dict) -> None:
+        metrics = ta_downloader.RunMetrics("Single Flight")
+        result = ta_downloader.run_query(self.session(), "Single Flight", os.path.join(self.tmp.name, name),
+                                         langs=["tr", "en"], metrics=metrics)
+        results[name] = (result, metrics.to_dict())
+
+    def test_waiter_reuses_first_result(self):
+        results: dict = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = threading.Thread(target=self.run_query, args=("first", results))
+            first.start()
+            # İkinci iş ancak ilk iş kiralamayı aldıktan sonra başlasın
+            while not self.config.requests:
+                time.sleep(0.01)
+            second = threading.Thread(target=self.run_query, args=("second", results))
+            second.start()
+            first.join(30)
+            second.join(30)
+
+        first_result, first_metrics = results["first"]
+        second_result, second_metrics = results["second"]
+        self.assertEqual(first_result["status"], "ok")
+        self.assertEqual(second_result["status"], "ok")
+        self.assertGreater(first_metrics["http"]["requests"], 0)
+        self.assertEqual(second_metrics["http"]["requests"], 0)
+        self.assertIn("flight_wait", [event["event"] for event in second_metrics["events"]])
+        for lang in ("tr", "en"):
+            self.assertTrue(second_result["files"][lang])
+            self.assertTrue(all(os.path.exists(path) for path in second_result["files"][lang]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+normalize_subtitle testleri: BOM, cp1254 ve UTF-16 girdiler, bozuk zamanlamalar, ASS etiketleri
+ve 99 saati aşan zamanlar.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import codecs
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ta_downloader  # noqa: E402
+
+SRT = "1\r\n00:00:01,000 --> 00:00:02,500\r\nŞeker ığdır\r\n\r\n2\r\n00:00:03,000 --> 00:00:04,000\r\nçok güzel\r\n"
+SRT_VTT = "WEBVTT\n\n00:00:01.000 --> 00:00:02.500\nŞeker ığdır\n\n00:00:03.000 --> 00:00:04.000\nçok güzel\n\n"
+
+ASS_HEADER = ("[Script Info]\nTitle: test\n\n[Events]\n"
+              "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
+
+
+def normalize(data: bytes, name: str = ""):
+    out = io.StringIO()
+    info = ta_downloader.normalize_subtitle(io.BytesIO(data), out, name)
+    return info, out.getvalue()
+
+
+class CharsetTest(unittest.TestCase):
+    def test_utf8_bom(self):
+        info, text = normalize(codecs.BOM_UTF8 + SRT.encode("utf-8"))
+        self.assertEqual(info, {"format": "srt", "charset": "utf-8-sig", "cues": 2})
+        self.assertEqual(text, SRT_VTT)
+
+    def test_cp1254(self):
+        info, text = normalize(SRT.encode("cp1254"))
+        self.assertEqual(info["charset"], "cp1254")
+        self.assertEqual(text, SRT_VTT)
+
+    def test_utf16_with_bom(self):
+        for encoding in ("utf-16-le", "utf-16-be"):
+            bom = codecs.BOM_UTF16_LE if encoding.endswith("le") else codecs.BOM_UTF16_BE
+            info, text = normalize(bom + SRT.encode(encoding))
+            self.assertEqual(info["charset"], "utf-16")
+            self.assertEqual(text, SRT_VTT)
+
+    def test_cp1254_after_utf8_sample(self):
+        # Örnek UTF-8 görünür; örnekten sonra gelen cp1254 baytları yine Türkçe çözülmeli
+        padding = "".join(f"{i}\n00:00:{i:02d},000 --> 00:00:{i:02d},500\nsatır\n\n" for i in range(1, 60)) * 6
+        self.assertGreater(len(padding), ta_downloader.CHARSET_SAMPLE_BYTES)
+        data = padding.encode("utf-8") + "999\n01:00:00,000 --> 01:00:01,000\nŞık ığ\n".encode("cp1254")
+        info, text = normalize(data)
+        self.assertEqual(info["charset"], "utf-8")
+        self.assertTrue(text.endswith("01:00:00.000 --> 01:00:01.000\nŞık ığ\n\n"))
+
+
+class TimingTest(unittest.TestCase):
+    def test_malformed_timings_are_skipped(self):
+        data = (b"1\n00:00:01,000 --> bozuk\nbir\n\n"
+                b"2\n00:00:03 --> 00:00:04\niki\n\n"
+                b"3\n00:00:05,000 --> 00:00:06,000\nuc\n")
+        info, text = normalize(data)
+        self.assertEqual(info["cues"], 1)
+        self.assertEqual(text, "WEBVTT\n\n00:00:05.000 --> 00:00:06.000\nuc\n\n")
+
+    def test_no_cues_raises(self):
+        with self.assertRaises(ValueError):
+            normalize(b"1\nbozuk --> bozuk\nmetin\n")
+
+    def test_short_fractions_and_dot_separator(self):
+        _, text = normalize(b"1\n0:0:1.5 --> 0:0:2.50\nx\n")
+        self.assertEqual(text, "WEBVTT\n\n00:00:01.500 --> 00:00:02.500\nx\n\n")
+
+    def test_hours_past_99(self):
+        _, text = normalize(b"1\n99:59:59,000 --> 100:00:01,000\nuzun\n")
+        self.assertEqual(text, "WEBVTT\n\n99:59:59.000 --> 100:00:01.000\nuzun\n\n")
+        _, text = normalize((ASS_HEADER + "Dialogue: 0,123:00:00.00,123:00:01.50,Default,,0,0,0,,son\n").encode())
+        self.assertEqual(text, "WEBVTT\n\n123:00:00.000 --> 123:00:01.500\nson\n\n")
+
+    def test_text_arrow_is_escaped(self):
+        _, text = normalize(b"1\n00:00:01,000 --> 00:00:02,000\na --> b\n")
+        self.assertIn("a --&gt; b\n", text)
+
+
+class AssTest(unittest.TestCase):
+    def test_override_tags_and_line_breaks(self):
+        data = (ASS_HEADER
+                + "Dialogue: 0,0:00:01.50,0:00:02.00,Default,,0,0,0,,{\\i1}Merhaba{\\i0}\\N{\\pos(10,20)}dünya,\\hevet\n"
+                + "Dialogue: 0,bozuk,0:00:03.00,Default,,0,0,0,,atlanır\n"
+                + "Dialogue: 0,0:00:04.00,0:00:05.00,Default,,0,0,0,,{\\an8}\n").encode("utf-8")
+        info, text = normalize(data)
+        self.assertEqual(info, {"format": "ass", "charset": "utf-8", "cues": 1})
+        self.assertEqual(text, "WEBVTT\n\n00:00:01.500 --> 00:00:02.000\nMerhaba\ndünya, evet\n\n")
+
+    def test_override_tags_inside_srt(self):
+        _, text = normalize(b"1\n00:00:01,000 --> 00:00:02,000\n<font color=red>{\\an8}kirmizi</font> <i>ok</i>\n")
+        self.assertEqual(text, "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nkirmizi <i>ok</i>\n\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sağlayıcı yarışı testleri (race_providers): kaybedenlerin iptali, hata veren sağlayıcının kazananı
+gizlememesi, sıralı deneme ve geçersiz sonuçların yalnızca yedek olarak kullanılması.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ta_downloader  # noqa: E402
+
+
+def items(name: str, score=None):
+    item = {"member": f"{name}.vtt", "ext": ".vtt", "data": b"WEBVTT\n\n", "format": "vtt", "cues": 1}
+    if score is not None:
+        item["timing"] = {"score": score, "ratio": 1.0, "offsetMs": 0}
+    return [item]
+
+
+class StubProvider(ta_downloader.SubtitleProvider):
+    """delay saniye (iptal edilebilir) bekler, sonra her dil için sonuç verir ya da error fırlatır."""
+
+    def __init__(self, name: str, delay: float = 0.0, error: Exception = None, score=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.score = score
+        self.cancelled = threading.Event()
+
+    def fetch(self, session, variants, langs, runtime=None):
+        try:
+            if self.delay:
+                ta_downloader._sleep(self.delay)
+        except ta_downloader.Cancelled:
+            self.cancelled.set()
+            raise
+        if self.error is not None:
+            raise self.error
+        for lang in langs:
+            yield lang, items(self.name, self.score), f"{self.name}:{lang}"
+
+
+def outcomes(report, lang="tr"):
+    return {name: result["outcome"] for name, result in report[lang]["results"].items()}
+
+
+class RaceProvidersTest(unittest.TestCase):
+    def race(self, providers, langs=("tr",), width=2, session=None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return ta_downloader.race_providers(session or types.SimpleNamespace(), providers, ["film"],
+                                                list(langs), width=width)
+
+    def test_provider_is_abstract(self):
+        with self.assertRaises(TypeError):
+            ta_downloader.SubtitleProvider()
+
+        class Incomplete(ta_downloader.SubtitleProvider):
+            name = "eksik"
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_losers_are_cancelled(self):
+        slow = StubProvider("yavas", delay=30)
+        fast = StubProvider("hizli", delay=0.05)
+        winners, report = self.race([slow, fast], langs=("tr", "en"))
+        self.assertEqual({lang: winner["provider"] for lang, winner in winners.items()}, {"tr": "hizli", "en": "hizli"})
+        self.assertEqual(winners["tr"]["source"], "hizli:tr")
+        self.assertTrue(winners["tr"]["valid"])
+        for lang in ("tr", "en"):
+            self.assertEqual(report[lang]["winner"], "hizli")
+            self.assertEqual(outcomes(report, lang), {"hizli": "won", "yavas": "cancelled"})
+        # Yarış beklemeden döner; kaybeden kendi iş parçacığında iptali görür
+        self.assertTrue(slow.cancelled.wait(5))
+
+    def test_failing_provider_does_not_hide_winner(self):
+        failing = StubProvider("bozuk", error=RuntimeError("bağlantı koptu"))
+        winner = StubProvider("iyi", delay=0.1)
+        winners, report = self.race([failing, winner])
+        self.assertEqual(winners["tr"]["provider"], "iyi")
+        self.assertEqual(outcomes(report), {"bozuk": "failed", "iyi": "won"})
+
+    def test_failure_starts_next_provider_when_sequential(self):
+        failing = StubProvider("bozuk", error=RuntimeError("bağlantı koptu"))
+        empty = StubProvider("bos", error=None)
+        empty.fetch = lambda *args, **kwargs: iter(())
+        winner = StubProvider("iyi")
+        winners, report = self.race([failing, empty, winner], width=1)
+        self.assertEqual(winners["tr"]["provider"], "iyi")
+        self.assertEqual(outcomes(report), {"bozuk": "failed", "bos": "empty", "iyi": "won"})
+
+    def test_later_result_for_won_language_is_lost(self):
+        class Staggered(StubProvider):
+            # tr hemen, en 30 sn sonra
+            def fetch(self, session, variants, langs, runtime=None):
+                yield "tr", items(self.name), None
+                try:
+                    ta_downloader._sleep(30)
+                except ta_downloader.Cancelled:
+                    self.cancelled.set()
+                    raise
+                yield "en", items(self.name), None
+
+        staggered = Staggered("kademeli")
+        winners, report = self.race([staggered, StubProvider("ikinci", delay=0.1)], langs=("tr", "en"))
+        self.assertEqual({lang: winner["provider"] for lang, winner in winners.items()}, {"tr": "kademeli", "en": "ikinci"})
+        self.assertEqual(outcomes(report, "tr"), {"kademeli": "won", "ikinci": "lost"})
+        self.assertEqual(outcomes(report, "en"), {"ikinci": "won", "kademeli": "cancelled"})
+        self.assertTrue(staggered.cancelled.wait(5))
+
+    def test_invalid_result_is_only_a_fallback(self):
+        poor = StubProvider("kaymis", score=0.2)
+        good = StubProvider("uyumlu", delay=0.1, score=0.9)
+        winners, report = self.race([poor, good])
+        self.assertEqual(winners["tr"]["provider"], "uyumlu")
+        self.assertEqual(outcomes(report), {"kaymis": "invalid", "uyumlu": "won"})
+
+        winners, report = self.race([StubProvider("kaymis", score=0.2), StubProvider("bos", error=ValueError("yok"))])
+        self.assertEqual(winners["tr"]["provider"], "kaymis")
+        self.assertFalse(winners["tr"]["valid"])
+        self.assertEqual(report["tr"]["winner"], "kaymis")
+
+    def test_results_are_recorded_in_stats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stats = ta_downloader.ProviderStats(os.path.join(tmp, "stats.sqlite"))
+            try:
+                session = types.SimpleNamespace(provider_stats=stats)
+                slow = StubProvider("yavas", delay=30)
+                self.race([slow, StubProvider("hizli", delay=0.05)], session=session)
+                self.assertTrue(slow.cancelled.wait(5))
+                summary = {row["provider"]: row for row in stats.summary()}
+                self.assertEqual((summary["hizli"]["wins"], summary["yavas"]["losses"]), (1, 1))
+                # Kazanan bir sonraki yarışta öne alınır
+                ranked = stats.rank([StubProvider("yavas"), StubProvider("hizli")], ["tr"])
+                self.assertEqual([provider.name for provider in ranked], ["hizli", "yavas"])
+            finally:
+                stats.conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ResolutionIndex testleri: çözümlemelerin saklanması, "sonuç yok" kayıtlarının miss_ttl sonunda
+düşmesi ve run_query'nin süresi dolmamış kayıt için arama yapmaması.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "bench"))
+
+import ta_downloader  # noqa: E402
+from standin import StandInConfig, start_standin  # noqa: E402
+
+FORM = {"idid": "1", "altid": "42", "sidid": "abc"}
+
+
+class ResolutionIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index.sqlite")
+        self.index = ta_downloader.ResolutionIndex(self.path, miss_ttl=60)
+
+    def tearDown(self):
+        self.index.conn.close()
+        self.tmp.cleanup()
+
+    def test_resolution_round_trip(self):
+        self.index.record("Film  Adı", "tr", "/sub/42/film", 120, FORM, "ab12")
+        reopened = ta_downloader.ResolutionIndex(self.path)
+        try:
+            # Sorgu NFKC + boşluk + büyük/küçük harf bakımından normalize edilir
+            self.assertEqual(reopened.lookup("film adı", ["tr", "en"]),
+                             {"tr": {"url": "/sub/42/film", "downloads": 120, "form": FORM, "file_hash": "ab12"}})
+        finally:
+            reopened.conn.close()
+        self.index.forget("FILM Adı", "tr")
+        self.assertEqual(self.index.lookup("film adı", ["tr"]), {})
+
+    def test_miss_expires_after_ttl(self):
+        now = time.time()
+        with mock.patch.object(ta_downloader.time, "time", return_value=now):
+            self.index.record_miss("Film", "tr")
+            self.assertEqual(self.index.misses("film", ["tr", "en"]), ["tr"])
+        with mock.patch.object(ta_downloader.time, "time", return_value=now + 59):
+            self.assertEqual(self.index.misses("film", ["tr"]), ["tr"])
+        with mock.patch.object(ta_downloader.time, "time", return_value=now + 60):
+            self.assertEqual(self.index.misses("film", ["tr"]), [])
+
+    def test_repeated_miss_extends_ttl(self):
+        now = time.time()
+        with mock.patch.object(ta_downloader.time, "time", return_value=now):
+            self.index.record_miss("film", "tr")
+        with mock.patch.object(ta_downloader.time, "time", return_value=now + 50):
+            self.index.record_miss("film", "tr")
+        with mock.patch.object(ta_downloader.time, "time", return_value=now + 100):
+            self.assertEqual(self.index.misses("film", ["tr"]), ["tr"])
+
+    def test_resolution_clears_miss(self):
+        self.index.record_miss("film", "tr")
+        self.index.record("film", "tr", "/sub/42/film", 1, FORM, None)
+        self.assertEqual(self.index.misses("film", ["tr"]), [])
+
+
+class RunQueryMissTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = StandInConfig()
+        self.server = start_standin(self.config)
+        host, port = self.server.server_address[:2]
+        self.base = ta_downloader.BASE
+        ta_downloader.BASE = f"http://{host}:{port}"
+        self.index = ta_downloader.ResolutionIndex(os.path.join(self.tmp.name, "index.sqlite"), miss_ttl=60)
+
+    def tearDown(self):
+        ta_downloader.BASE = self.base
+        self.index.conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def run_query(self, query: str):
+        session = ta_downloader.build_session(retry=ta_downloader.RetryPolicy(retries=0))
+        session.resolution_index = self.index
+        with contextlib.redirect_stdout(io.StringIO()):
+            return ta_downloader.run_query(session, query, self.tmp.name, langs=["tr", "en"])
+
+    def test_negative_entry_skips_search_until_expiry(self):
+        # Taklit sunucu "yok" içeren aramalara boş sonuç sayfası döndürür
+        self.assertEqual(self.run_query("Film yok")["status"], "no_candidates")
+        self.assertEqual(self.config.requests["search"], 1)
+        self.assertEqual(sorted(self.index.misses("film yok", ["tr", "en"])), ["en", "tr"])
+
+        self.assertEqual(self.run_query("film  YOK")["status"], "no_candidates")
+        self.assertEqual(self.config.requests["search"], 1)
+
+        later = time.time() + 61
+        with mock.patch.object(ta_downloader.time, "time", return_value=later):
+            self.run_query("Film yok")
+        self.assertEqual(self.config.requests["search"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
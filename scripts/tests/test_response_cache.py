@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ResponseCache ve cached_get testleri: taze kayıt, ETag / Last-Modified ile 304 yeniden doğrulaması,
+değişen kaynak, doğrulayıcısız kayıt ve boyut sınırında en eski kaydın silinmesi.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ta_downloader  # noqa: E402
+
+LAST_MODIFIED = "Wed, 01 Oct 2025 10:00:00 GMT"
+
+
+class Origin:
+    """Yol başına gövde ve doğrulayıcı tutan küçük HTTP sunucusu; gelen koşullu başlıkları kaydeder."""
+
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):  # noqa: A002
+                pass
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                body, etag, last_modified = origin.pages[path]
+                conditional = {key: self.headers[key] for key in ("If-None-Match", "If-Modified-Since") if key in self.headers}
+                origin.requests.append((path, conditional))
+                not_modified = (etag is not None and conditional.get("If-None-Match") == etag) or \
+                    (etag is None and last_modified is not None and conditional.get("If-Modified-Since") == last_modified)
+                self.send_response(304 if not_modified else 200)
+                if etag:
+                    self.send_header("ETag", etag)
+                if last_modified:
+                    self.send_header("Last-Modified", last_modified)
+                payload = b"" if not_modified else body.encode("utf-8")
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class CachedGetTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.origin = Origin()
+        self.cache = ta_downloader.ResponseCache(os.path.join(self.tmp.name, "cache.sqlite"), ttl=3600)
+        self.session = ta_downloader.build_session(retry=ta_downloader.RetryPolicy(retries=0))
+        self.session.response_cache = self.cache
+        self.metrics = ta_downloader.RunMetrics("cache")
+        self.token = ta_downloader._current_metrics.set(self.metrics)
+
+    def tearDown(self):
+        ta_downloader._current_metrics.reset(self.token)
+        self.cache.conn.close()
+        self.origin.close()
+        self.tmp.cleanup()
+
+    def get(self, path: str, params=None) -> str:
+        return ta_downloader.cached_get(self.session, self.origin.base + path, params)
+
+    def cache_counts(self):
+        counts = self.metrics.to_dict()["cache"]
+        return {key: counts[key] for key in ("hit", "revalidated", "miss")}
+
+    def expire_all(self):
+        with self.cache.lock:
+            self.cache.conn.execute("UPDATE responses SET stored_at = stored_at - ?", (self.cache.ttl + 1,))
+            self.cache.conn.commit()
+
+    def test_fresh_entry_is_served_without_request(self):
+        self.origin.pages["/find.php"] = ("sonuç", '"v1"', None)
+        self.assertEqual(self.get("/find.php", {"find": "film", "cat": "sub"}), "sonuç")
+        # Parametre sırası anahtarı değiştirmez
+        self.assertEqual(self.get("/find.php?cat=sub", {"find": "film"}), "sonuç")
+        self.assertEqual(len(self.origin.requests), 1)
+        self.assertEqual(self.cache_counts(), {"hit": 1, "revalidated": 0, "miss": 1})
+
+    def test_etag_revalidation(self):
+        self.origin.pages["/sub/1/"] = ("sayfa", '"v1"', LAST_MODIFIED)
+        self.get("/sub/1/")
+        self.expire_all()
+        self.assertEqual(self.get("/sub/1/"), "sayfa")
+        self.assertEqual(self.origin.requests[-1][1], {"If-None-Match": '"v1"', "If-Modified-Since": LAST_MODIFIED})
+        self.assertEqual(self.cache_counts()["revalidated"], 1)
+        # 304 kaydı yeniden taze yapar
+        self.assertEqual(self.get("/sub/1/"), "sayfa")
+        self.assertEqual(len(self.origin.requests), 2)
+
+    def test_last_modified_revalidation(self):
+        self.origin.pages["/sub/2/"] = ("eski", None, LAST_MODIFIED)
+        self.get("/sub/2/")
+        self.expire_all()
+        self.assertEqual(self.get("/sub/2/"), "eski")
+        self.assertEqual(self.origin.requests[-1][1], {"If-Modified-Since": LAST_MODIFIED})
+        self.assertEqual(self.cache_counts()["revalidated"], 1)
+
+    def test_changed_resource_replaces_entry(self):
+        self.origin.pages["/sub/3/"] = ("v1", '"v1"', None)
+        self.get("/sub/3/")
+        self.expire_all()
+        self.origin.pages["/sub/3/"] = ("v2", '"v2"', None)
+        self.assertEqual(self.get("/sub/3/"), "v2")
+        self.assertEqual(self.cache_counts(), {"hit": 0, "revalidated": 0, "miss": 2})
+        self.expire_all()
+        self.get("/sub/3/")
+        self.assertEqual(self.origin.requests[-1][1], {"If-None-Match": '"v2"'})
+
+    def test_entry_without_validators_is_fetched_again(self):
+        self.origin.pages["/sub/4/"] = ("düz", None, None)
+        self.get("/sub/4/")
+        self.expire_all()
+        self.origin.pages["/sub/4/"] = ("yeni", None, None)
+        self.assertEqual(self.get("/sub/4/"), "yeni")
+        self.assertEqual(self.origin.requests[-1][1], {})
+
+
+class ResponseCacheEvictionTest(unittest.TestCase):
+    def test_least_recently_used_is_evicted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ta_downloader.ResponseCache(os.path.join(tmp, "cache.sqlite"), max_bytes=250)
+            try:
+                for key in ("a", "b"):
+                    cache.put(key, key, key * 100, None, None)
+                cache.conn.execute("UPDATE responses SET accessed_at = accessed_at - 10 WHERE key = 'b'")
+                self.assertIsNotNone(cache.get("a"))  # a yeniden kullanıldı; en eski b
+                cache.put("c", "c", "c" * 100, None, None)
+                self.assertIsNone(cache.get("b"))
+                self.assertEqual(cache.get("a")["text"], "a" * 100)
+                self.assertEqual(cache.get("c")["text"], "c" * 100)
+            finally:
+                cache.conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+subtitle_index testleri: güncellemede değişmeyen dosyaların atlanması, değişen ve silinen
+dosyaların ipuçları, Türkçe harf katlamalı arama ve --raw ile bozuk FTS5 ifadesi.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import subtitle_index  # noqa: E402
+
+TR_SRT = ("1\n00:00:01,000 --> 00:00:03,000\nIşığı SÖNDÜR, çabuk!\n\n"
+          "2\n00:01:00,000 --> 00:01:02,000\n<i>Şimdi</i> gidiyoruz &amp; dönmüyoruz.\n\n"
+          "3\n00:02:00,000 --> 00:02:02,000\nIşık nerede? Söndür onu.\n")
+EN_VTT = "WEBVTT\n\n00:00:05.000 --> 00:00:06.000\nI'll be back.\n"
+LIBRARY = {"videos": [{"id": "v1", "fileName": "Film/Film.mkv"}]}
+
+
+def fts5_available() -> bool:
+    try:
+        subtitle_index.SubtitleIndex(":memory:").close()
+    except RuntimeError:
+        return False
+    return True
+
+
+@unittest.skipUnless(fts5_available(), "SQLite FTS5 yok")
+class SubtitleIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.media = os.path.join(self.tmp.name, "media")
+        self.write("Film/Film.tr.srt", TR_SRT.encode("cp1254"))
+        self.write("Film/Film.en.vtt", EN_VTT.encode("utf-8"))
+        self.db = os.path.join(self.tmp.name, "index.sqlite")
+        self.index = subtitle_index.SubtitleIndex(self.db)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def write(self, relative: str, data: bytes) -> None:
+        path = os.path.join(self.media, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def update(self):
+        return self.index.update(self.media, LIBRARY)
+
+    def texts(self, query: str, **kwargs):
+        return [hit["text"] for hit in self.index.search(query, **kwargs)]
+
+    def test_update_skips_unchanged_and_removes_deleted(self):
+        self.assertEqual(self.update(), {"indexed": 2, "skipped": 0, "removed": 0, "failed": 0, "cues": 4})
+        self.assertEqual(self.update(), {"indexed": 0, "skipped": 2, "removed": 0, "failed": 0, "cues": 0})
+
+        self.write("Film/Film.en.vtt", (EN_VTT + "\n00:00:07.000 --> 00:00:08.000\nHasta la vista.\n").encode("utf-8"))
+        self.assertEqual(self.update(), {"indexed": 1, "skipped": 1, "removed": 0, "failed": 0, "cues": 2})
+        self.assertEqual(self.texts("hasta la vista"), ["Hasta la vista."])
+        self.assertEqual(self.index.stats(), {"files": 2, "videos": 1, "cues": 5})
+
+        os.remove(os.path.join(self.media, "Film/Film.tr.srt"))
+        self.assertEqual(self.update()["removed"], 1)
+        self.assertEqual(self.texts("söndür"), [])
+        self.assertEqual(self.index.stats(), {"files": 1, "videos": 1, "cues": 2})
+
+    def test_unreadable_file_is_counted_as_failed(self):
+        self.write("Film/Film.de.srt", b"bozuk dosya\n")
+        self.assertEqual(self.update()["failed"], 1)
+
+    def test_turkish_folding_search(self):
+        self.update()
+        expected = ["Işığı SÖNDÜR, çabuk!"]
+        for query in ("ışığı söndür", "ISIGI SONDUR", "isigi sondur", "IŞIĞI söndür"):
+            self.assertEqual(self.texts(query)[:1], expected, query)
+        # Etiketler ve HTML varlıkları atılır
+        self.assertEqual(self.texts("simdi gidiyoruz"), ["Şimdi gidiyoruz & dönmüyoruz."])
+
+    def test_hits_carry_video_language_and_time(self):
+        self.update()
+        hit = self.index.search("söndür", lang="tr")[0]
+        self.assertEqual((hit["videoId"], hit["lang"], hit["path"], hit["startMs"], hit["endMs"]),
+                         ("v1", "tr", os.path.join("Film", "Film.tr.srt"), 1000, 3000))
+        # Sözcükler bitişik olmasa da aynı ipucunda yakın geçiyorsa eşleşir (NEAR)
+        self.assertEqual(self.texts("ışık söndür"), ["Işık nerede? Söndür onu."])
+        self.assertEqual(self.texts("be back", lang="tr"), [])
+        self.assertEqual(self.texts("be back", video_id="v1"), ["I'll be back."])
+
+    def test_raw_expression(self):
+        self.update()
+        self.assertEqual(sorted(self.texts("sond*", raw=True)), ["Işık nerede? Söndür onu.", "Işığı SÖNDÜR, çabuk!"])
+        self.assertEqual(self.texts("back NOT söndür", raw=True), ["I'll be back."])
+
+    def test_malformed_raw_expression_exits_with_one_line(self):
+        for expression in ('"kapanmamış', "a AND OR"):
+            process = subprocess.run(
+                [sys.executable, os.path.join(SCRIPTS_DIR, "subtitle_index.py"), "--db", self.db, "-s", expression, "--raw"],
+                capture_output=True, text=True, timeout=30,
+            )
+            self.assertEqual(process.returncode, 1, process.stderr)
+            self.assertEqual(len(process.stderr.strip().splitlines()), 1, process.stderr)
+            self.assertTrue(process.stderr.startswith("Hata: geçersiz arama ifadesi"), process.stderr)
+            self.assertEqual(process.stdout, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
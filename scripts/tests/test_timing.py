@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Zamanlama uyumu testleri: cue_times, fit_timing (dakika payı, sabit kayma, kare hızı farkı) ve retime.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ta_downloader  # noqa: E402
+
+RUNTIME_MS = 120 * 60000
+
+
+@unittest.skipUnless(ta_downloader.timing_available(), "numpy yüklü değil")
+class FitTimingTest(unittest.TestCase):
+    def fit(self, starts, ends, runtime_ms=RUNTIME_MS):
+        numpy = ta_downloader.numpy
+        return ta_downloader.fit_timing(numpy.array(starts), numpy.array(ends), runtime_ms)
+
+    def test_last_partial_minute_is_not_an_overrun(self):
+        # Film 120 dk 18 sn; TMDB 120 dk der. Doğru zamanlanmış altyazıya dokunulmamalı
+        self.assertEqual(self.fit([60000, 7215000], [62000, 7218000]), {"score": 1.0, "ratio": 1.0, "offsetMs": 0})
+
+    def test_overrun_past_headroom_is_shifted_back(self):
+        result = self.fit([60000, 7290000], [62000, 7292000])
+        self.assertEqual(result["ratio"], 1.0)
+        self.assertEqual(result["offsetMs"], -(7292000 - RUNTIME_MS - ta_downloader.TIMING_RUNTIME_SLACK_MS))
+        self.assertEqual(result["score"], 0.9)
+
+    def test_pal_subtitle_on_film_video_is_rescaled(self):
+        # 23.976 fps videoda biten zamanlar, 25 fps için hazırlanmış altyazıda 25/23.976 kat uzar
+        drift = 25 / 23.976
+        starts = [60000 * drift, 3600000 * drift, 7150000 * drift]
+        ends = [62000 * drift, 3602000 * drift, 7152000 * drift]
+        result = self.fit(starts, ends)
+        self.assertEqual(result["offsetMs"], 0)
+        # Yalnızca son ipucuna bakıldığından 24/25 ile 23.976/25 (binde bir fark) ayırt edilemez
+        self.assertAlmostEqual(result["ratio"], 23.976 / 25, delta=0.002)
+        corrected = ends[-1] * result["ratio"]
+        self.assertLessEqual(abs(corrected - 7152000), 0.002 * 7152000)
+        self.assertEqual(result["score"], 0.9)
+
+    def test_film_subtitle_on_pal_video_within_range_is_kept(self):
+        # Kısalan altyazı hâlâ sürenin %80'inden sonra bitiyorsa (jenerik payı) dokunulmaz
+        drift = 23.976 / 25
+        result = self.fit([60000 * drift, 7150000 * drift], [62000 * drift, 7152000 * drift])
+        self.assertEqual((result["ratio"], result["offsetMs"]), (1.0, 0))
+
+    def test_empty_or_unknown_runtime(self):
+        self.assertEqual(self.fit([], [])["score"], 0.0)
+        self.assertEqual(self.fit([1000], [2000], runtime_ms=0)["score"], 0.0)
+
+
+@unittest.skipUnless(ta_downloader.timing_available(), "numpy yüklü değil")
+class CueTimesTest(unittest.TestCase):
+    def test_hourless_and_long_hours(self):
+        data = (b"WEBVTT\n\n00:01.500 --> 00:02.000\na\n\n"
+                b"01:00:00.000 --> 01:00:01.250\nb\n\n"
+                b"123:00:00.000 --> 123:00:00.500\nc\n")
+        starts, ends = ta_downloader.cue_times(data)
+        self.assertEqual(starts.tolist(), [1500, 3600000, 123 * 3600000])
+        self.assertEqual(ends.tolist(), [2000, 3601250, 123 * 3600000 + 500])
+
+    def test_retime_round_trip(self):
+        data = b"WEBVTT\n\n1\n00:00:10.000 --> 00:00:12.000\nbir\n\n2\n99:59:59.000 --> 100:00:01.000\niki\n"
+        shifted = ta_downloader.retime(data, 1.0, -2000)
+        starts, ends = ta_downloader.cue_times(shifted)
+        self.assertEqual(starts.tolist(), [8000, 100 * 3600000 - 3000])
+        self.assertEqual(ends.tolist(), [10000, 100 * 3600000 - 1000])
+        self.assertIn(b"\nbir\n", shifted)
+        # 0'ın altına inen zamanlar 0'a sabitlenir
+        self.assertTrue(ta_downloader.retime(data, 1.0, -20000).startswith(b"WEBVTT\n\n1\n00:00:00.000 --> 00:00:00.000"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+const fs = require('fs/promises');
+
+// scripts/ta_downloader.py (build_cue_index) ile aynı biçim:
+// 32 baytlık başlık ("VTTX", sürüm, ipucu sayısı, ayrılmış, kaynak inode, kaynak boyutu), ardından
+// uint32 LE diziler: başlangıçlar[n], bitişlerin kümülatif en büyüğü[n], blok konumları[n + 1]
+const CUE_INDEX_SUFFIX = '.cues';
+const MAGIC = Buffer.from('VTTX');
+const VERSION = 1;
+const HEADER_SIZE = 32;
+// Son kullanılan indeksler; her istekte VTT'nin inode/boyutuyla yeniden doğrulanır
+const CACHE_LIMIT = 32;
+const cache = new Map();
+const CUE_TIMES_RE = /^(?:(\d+):)?(\d\d):(\d\d)\.(\d{3})[ \t]+-->[ \t]+(?:(\d+):)?(\d\d):(\d\d)\.(\d{3})/gm;
+
+function clockMs(hours, minutes, seconds, millis) {
+  return Number(hours || 0) * 3600000 + Number(minutes) * 60000 + Number(seconds) * 1000 + Number(millis);
+}
+
+// Yalnızca olduğu gibi sunulabilen (LF, UTF-8) WebVTT için çağrılır
+function buildCueIndex(buffer, { ino, size }) {
+  // latin1: karakter konumları bayt konumlarıyla aynı kalır
+  const text = buffer.toString('latin1');
+  const starts = [];
+  const maxEnds = [];
+  const offsets = [];
+  let running = 0;
+  let floor = 0;
+  CUE_TIMES_RE.lastIndex = 0;
+  let match;
+  while ((match = CUE_TIMES_RE.exec(text)) !== null) {
+    const start = clockMs(match[1], match[2], match[3], match[4]);
+    if (starts.length && start < starts[starts.length - 1]) {
+      return null;
+    }
+    running = Math.max(running, clockMs(match[5], match[6], match[7], match[8]));
+    // İpucu kimliği satırı da bloğa dahil: önceki zaman satırından sonraki son boş satır
+    const blank = text.slice(floor, match.index).lastIndexOf('\n\n');
+    starts.push(start);
+    maxEnds.push(running);
+    offsets.push(blank >= 0 ? floor + blank + 2 : match.index);
+    floor = match.index + match[0].length;
+  }
+  if (!starts.length) {
+    return null;
+  }
+  offsets.push(buffer.length);
+
+  const count = starts.length;
+  const out = Buffer.alloc(HEADER_SIZE + 4 * (3 * count + 1));
+  MAGIC.copy(out, 0);
+  out.writeUInt32LE(VERSION, 4);
+  out.writeUInt32LE(count, 8);
+  out.writeBigUInt64LE(BigInt(ino), 16);
+  out.writeBigUInt64LE(BigInt(size), 24);
+  let position = HEADER_SIZE;
+  for (const values of [starts, maxEnds, offsets]) {
+    for (const value of values) {
+      out.writeUInt32LE(value, position);
+      position += 4;
+    }
+  }
+  return out;
+}
+
+async function writeCueIndex(vttPath, buffer) {
+  const stat = await fs.stat(vttPath, { bigint: true });
+  const index = buildCueIndex(buffer, stat);
+  const sidecar = `${vttPath}${CUE_INDEX_SUFFIX}`;
+  if (!index) {
+    await fs.unlink(sidecar).catch(() => {});
+    return null;
+  }
+  const tmpFile = `${sidecar}.${process.pid}.tmp`;
+  await fs.writeFile(tmpFile, index);
+  await fs.rename(tmpFile, sidecar);
+  return remember(vttPath, parseCueIndex(index, stat));
+}
+
+function remember(vttPath, index) {
+  cache.delete(vttPath);
+  if (index) {
+    cache.set(vttPath, index);
+    if (cache.size > CACHE_LIMIT) {
+      cache.delete(cache.keys().next().value);
+    }
+  }
+  return index;
+}
+
+function parseCueIndex(raw, stat) {
+  if (raw.length < HEADER_SIZE || !raw.subarray(0, 4).equals(MAGIC) || raw.readUInt32LE(4) !== VERSION) {
+    return null;
+  }
+  const count = raw.readUInt32LE(8);
+  if (raw.readBigUInt64LE(16) !== BigInt(stat.ino) || raw.readBigUInt64LE(24) !== BigInt(stat.size)
+    || raw.length !== HEADER_SIZE + 4 * (3 * count + 1)) {
+    return null;
+  }
+  const at = base => i => raw.readUInt32LE(HEADER_SIZE + 4 * (base + i));
+  return {
+    count,
+    ino: BigInt(stat.ino),
+    size: BigInt(stat.size),
+    startAt: at(0),
+    maxEndAt: at(count),
+    offsetAt: at(2 * count)
+  };
+}
+
+// Sidecar yoksa, bozuksa ya da VTT sonradan değiştiyse (inode/boyut) null
+async function loadCueIndex(vttPath) {
+  try {
+    const stat = await fs.stat(vttPath, { bigint: true });
+    const cached = cache.get(vttPath);
+    if (cached && cached.ino === stat.ino && cached.size === stat.size) {
+      return remember(vttPath, cached);
+    }
+    const raw = await fs.readFile(`${vttPath}${CUE_INDEX_SUFFIX}`);
+    return remember(vttPath, parseCueIndex(raw, stat));
+  } catch (error) {
+    if (error.code === 'ENOENT') {
+      return null;
+    }
+    throw error;
+  }
+}
+
+// get(i) değerleri artan sırada: value'dan büyük (strict) / büyük-eşit ilk konum
+function upperBound(count, get, value) {
+  let lo = 0;
+  let hi = count;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (get(mid) <= value) lo = mid + 1; else hi = mid;
+  }
+  return lo;
+}
+
+function lowerBound(count, get, value) {
+  let lo = 0;
+  let hi = count;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (get(mid) < value) lo = mid + 1; else hi = mid;
+  }
+  return lo;
+}
+
+/**
+ * [startMs, endMs) aralığıyla kesişen ipuçlarını VTT başlığıyla birlikte döndürür.
+ * İpucu blokları dosyadan tek okuma ile alınır. Geçerli sidecar yoksa null (çağıran tüm dosyaya düşer).
+ */
+async function readCueWindow(vttPath, startMs, endMs, index = null) {
+  index = index || await loadCueIndex(vttPath);
+  if (!index) {
+    return null;
+  }
+  const first = upperBound(index.count, index.maxEndAt, startMs);
+  const last = Math.max(first, lowerBound(index.count, index.startAt, endMs));
+  const handle = await fs.open(vttPath, 'r');
+  try {
+    // İndeks ile açılan dosya arasında değiştirildiyse yarım blok göndermemek için
+    const stat = await handle.stat({ bigint: true });
+    if (stat.ino !== index.ino) {
+      return null;
+    }
+    const headerLength = index.offsetAt(0);
+    const bodyStart = index.offsetAt(first);
+    const body = Buffer.alloc(headerLength + index.offsetAt(last) - bodyStart);
+    await handle.read(body, 0, headerLength, 0);
+    await handle.read(body, headerLength, body.length - headerLength, bodyStart);
+    return { body, first, last, count: index.count };
+  } finally {
+    await handle.close();
+  }
+}
+
+module.exports = {
+  CUE_INDEX_SUFFIX,
+  buildCueIndex,
+  writeCueIndex,
+  loadCueIndex,
+  readCueWindow
+};
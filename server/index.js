@@ -1,3 +1,4 @@
+const fs = require('fs/promises');
 const path = require('path');
 const express = require('express');
 const { LibraryManager } = require('./libraryManager');
@@ -5,6 +6,22 @@ const { TorrentManager, searchTorrents } = require('./torrentService');
 const { StorageService } = require('./storageService');
 
 const PORT = process.env.PORT || 3000;
+// Tarayıcıdaki izleme ilerlemesinin kopyası; scripts/subtitle_scheduler.py izlenen videoları öne alır
+const PROGRESS_FILE = path.join(__dirname, '..', 'data', 'progress.json');
+
+async function writeProgress(progress) {
+  const entries = {};
+  for (const [id, item] of Object.entries(progress)) {
+    if (item && Number.isFinite(item.time) && Number.isFinite(item.duration)) {
+      entries[id] = { time: item.time, duration: item.duration, updatedAt: Number(item.updatedAt) || Date.now() };
+    }
+  }
+  await fs.mkdir(path.dirname(PROGRESS_FILE), { recursive: true });
+  const tmpPath = `${PROGRESS_FILE}.${process.pid}.tmp`;
+  await fs.writeFile(tmpPath, JSON.stringify(entries, null, 2), 'utf-8');
+  await fs.rename(tmpPath, PROGRESS_FILE);
+  return Object.keys(entries).length;
+}
 
 async function createServer() {
   const app = express();
@@ -155,9 +172,59 @@ async function createServer() {
     }
   });
 
+  app.post('/api/subtitles/refresh', async (req, res, next) => {
+    try {
+      const fileName = req.body?.fileName;
+      if (!fileName) {
+        return res.status(400).json({ error: 'fileName alanı zorunludur' });
+      }
+      const video = await manager.refreshSubtitles(fileName, {
+        attempted: req.body?.attempted === true,
+        succeeded: req.body?.succeeded === true
+      });
+      if (!video) {
+        // Henüz kütüphanede değil; bir sonraki taramada altyazılarıyla eklenir
+        return res.status(404).json({ error: 'Video bulunamadı' });
+      }
+      res.json({ id: video.id, subtitles: video.subtitles });
+    } catch (error) {
+      next(error);
+    }
+  });
+
+  app.post('/api/progress', async (req, res, next) => {
+    try {
+      const progress = req.body?.progress;
+      if (!progress || typeof progress !== 'object' || Array.isArray(progress)) {
+        return res.status(400).json({ error: 'progress alanı zorunludur' });
+      }
+      const count = await writeProgress(progress);
+      res.json({ count });
+    } catch (error) {
+      next(error);
+    }
+  });
+
   app.get('/api/subtitles/:videoId/:trackId', async (req, res, next) => {
     try {
       const { videoId, trackId } = req.params;
+      // ?start=&end= (ms) verilirse yalnızca o aralıktaki ipuçları gönderilir
+      const startMs = Number.parseInt(req.query?.start, 10);
+      const endMs = Number.parseInt(req.query?.end, 10);
+      if (Number.isFinite(startMs) || Number.isFinite(endMs)) {
+        const window = await manager.getSubtitleWindow(
+          videoId,
+          trackId,
+          Number.isFinite(startMs) ? Math.max(startMs, 0) : 0,
+          Number.isFinite(endMs) ? endMs : Number.MAX_SAFE_INTEGER
+        );
+        if (window) {
+          res.setHeader('Content-Type', 'text/vtt; charset=utf-8');
+          res.setHeader('Cache-Control', 'no-store');
+          res.setHeader('X-Subtitle-Cues', `${window.first}-${window.last}/${window.count}`);
+          return res.send(window.body);
+        }
+      }
       const payload = await manager.getSubtitleContent(videoId, trackId);
       if (!payload) {
         return res.status(404).json({ error: 'Altyazı bulunamadı' });
@@ -1,20 +1,22 @@
 require('dotenv').config();
 const fs = require('fs/promises');
 const path = require('path');
-const os = require('os');
 const zlib = require('zlib');
 const { promisify } = require('util');
-const { execFile } = require('child_process');
+const { isUtf8 } = require('buffer');
 const iconv = require('iconv-lite');
 const chardet = require('chardet');
 const JSZip = require('jszip');
+const { SubtitleScriptWorker } = require('./subtitleScriptWorker');
+const { CUE_INDEX_SUFFIX, writeCueIndex, loadCueIndex, readCueWindow } = require('./cueIndex');
 
 const DATA_FILE = path.join(__dirname, '..', 'data', 'videos.json');
+// scripts/subtitle_scheduler.py bu alanları videos.json'a doğrudan yazar; save() onları ezmez
+const SCRIPT_STAMP_FIELDS = ['subtitleScriptLastAttempt', 'subtitleScriptLastSuccess'];
 const MEDIA_DIR = path.join(__dirname, '..', 'media');
 const TMDB_API_KEY = process.env.TMDB_API_KEY;
 const fetch = global.fetch ? global.fetch.bind(global) : ((...args) => import('node-fetch').then(({ default: fetch }) => fetch(...args)));
 const gunzip = promisify(zlib.gunzip);
-const execFileAsync = promisify(execFile);
 const OPENSUBTITLES_API_KEY = process.env.OPENSUBTITLES_API_KEY;
 const OPENSUBTITLES_USER_AGENT = process.env.OPENSUBTITLES_USER_AGENT || 'homeVideoDB/1.0';
 const SUBDL_API_KEY = process.env.SUBDL_API_KEY;
@@ -23,6 +25,13 @@ const DISABLE_OPENSUBTITLES = String(process.env.DISABLE_OPENSUBTITLES || '').to
 const ENABLE_SUBDL = !DISABLE_SUBDL && String(process.env.ENABLE_SUBDL || '').toLowerCase() !== 'false';
 const ENABLE_OPENSUBTITLES = !DISABLE_OPENSUBTITLES && String(process.env.ENABLE_OPENSUBTITLES || '').toLowerCase() !== 'false';
 const ENABLE_SCRIPT_SUBTITLES = String(process.env.ENABLE_SCRIPT_SUBTITLES || '').toLowerCase() === 'true';
+// false ise tarama altyazı indirmez; eksikler scripts/subtitle_scheduler.py ile arka planda tamamlanır
+const ENABLE_SCAN_SUBTITLE_FETCH = String(process.env.ENABLE_SCAN_SUBTITLE_FETCH || '').toLowerCase() !== 'false';
+const SUBTITLE_SCRIPT_PATH = path.join(__dirname, '..', 'scripts', 'ta_downloader.py');
+// Script işi başına toplam süre (sn); dolunca o ana kadar inen diller 'partial' olarak döner
+const SUBTITLE_SCRIPT_DEADLINE = Number(process.env.SUBTITLE_SCRIPT_DEADLINE) || 45;
+// Script süreyi kendisi uygular; işçi bu payı da aşarsa takılmış sayılıp yeniden başlatılır
+const SUBTITLE_SCRIPT_GRACE_MS = 15000;
 
 // OpenSubtitles login token cache
 let cachedToken = null;
@@ -255,6 +264,15 @@ function formatRuntime(minutes) {
   return parts.join(' ') || `${minutes} dk`;
 }
 
+// formatRuntime çıktısını ("2 sa 1 dk") dakikaya geri çevirir
+function parseRuntimeMinutes(duration) {
+  const match = /^\s*(?:(\d+)\s*sa)?\s*(?:(\d+)\s*dk)?\s*$/.exec(String(duration || ''));
+  if (!match || (!match[1] && !match[2])) {
+    return null;
+  }
+  return Number(match[1] || 0) * 60 + Number(match[2] || 0);
+}
+
 function resolveSubtitleLanguageFromHint(hint) {
   const normalized = (hint || '').toLowerCase();
   if (!normalized) {
@@ -295,6 +313,16 @@ function ensureVttContent(content) {
   return `WEBVTT\n\n${normalized}`;
 }
 
+const VTT_SIGNATURE = Buffer.from('WEBVTT');
+
+// BOM ve CR içermeyen geçerli UTF-8 WebVTT dosyaları (ör. ta_downloader çıktısı) olduğu gibi sunulabilir
+function isServableVtt(buffer) {
+  return buffer.length > VTT_SIGNATURE.length
+    && buffer.subarray(0, VTT_SIGNATURE.length).equals(VTT_SIGNATURE)
+    && !buffer.includes(0x0d)
+    && (typeof isUtf8 !== 'function' || isUtf8(buffer));
+}
+
 function decodeBufferToUtf8(buffer, fallbackEncoding = 'utf-8') {
   if (!buffer) {
     return '';
@@ -355,6 +383,14 @@ function parseFileName(relativePath) {
   };
 }
 
+// Altyazılar ta_downloader deposundaki nesnelere sabit bağlantı olabilir; yerinde yazmak deponun
+// kopyasını da değiştireceğinden yeni dosya yazılıp eskisinin yerine taşınır.
+async function writeFileReplacing(absoluteFile, content) {
+  const tmpFile = `${absoluteFile}.${process.pid}.tmp`;
+  await fs.writeFile(tmpFile, content, 'utf-8');
+  await fs.rename(tmpFile, absoluteFile);
+}
+
 function isMetadataComplete(video) {
   return Boolean(video.description && video.poster);
 }
@@ -367,6 +403,16 @@ class LibraryManager {
       lastScan: null
     };
     this.scanning = false;
+    this.scriptWorker = null;
+    this.subtitleFlights = new Map();
+  }
+
+  getScriptWorker() {
+    if (!this.scriptWorker) {
+      // İşlerdeki dest klasörleri bu media klasörüne göre çözülür
+      this.scriptWorker = new SubtitleScriptWorker({ scriptPath: SUBTITLE_SCRIPT_PATH, args: ['--media', MEDIA_DIR] });
+    }
+    return this.scriptWorker;
   }
 
   async load() {
@@ -411,7 +457,36 @@ class LibraryManager {
   async save() {
     // Ensure the data directory exists before attempting to write the file
     await fs.mkdir(path.dirname(DATA_FILE), { recursive: true });
-    await fs.writeFile(DATA_FILE, JSON.stringify(this.data, null, 2), 'utf-8');
+    await this.mergeScriptStamps();
+    // Zamanlayıcı dosyayı okurken yarım yazılmış hâlini görmesin
+    const tmpPath = `${DATA_FILE}.${process.pid}.tmp`;
+    await fs.writeFile(tmpPath, JSON.stringify(this.data, null, 2), 'utf-8');
+    await fs.rename(tmpPath, DATA_FILE);
+  }
+
+  // Bellekteki kopya yüklendikten sonra diske yazılmış daha yeni script damgalarını korur
+  async mergeScriptStamps() {
+    let stored;
+    try {
+      stored = JSON.parse(await fs.readFile(DATA_FILE, 'utf-8'));
+    } catch (error) {
+      return;
+    }
+    const storedVideos = Array.isArray(stored) ? stored : stored?.videos;
+    if (!Array.isArray(storedVideos) || !Array.isArray(this.data?.videos)) {
+      return;
+    }
+    const byId = new Map(storedVideos.filter(video => video?.id).map(video => [video.id, video]));
+    for (const video of this.data.videos) {
+      const onDisk = byId.get(video.id);
+      if (!onDisk) continue;
+      for (const field of SCRIPT_STAMP_FIELDS) {
+        // Her iki taraf da toISOString biçiminde yazar; metin karşılaştırması zaman sırasıdır
+        if (onDisk[field] && (!video[field] || onDisk[field] > video[field])) {
+          video[field] = onDisk[field];
+        }
+      }
+    }
   }
 
   async listMediaFiles(dir = MEDIA_DIR, prefix = '') {
@@ -521,15 +596,18 @@ class LibraryManager {
       if (!sanitized) {
         try {
           await fs.unlink(absoluteFile);
+          await fs.unlink(`${absoluteFile}${CUE_INDEX_SUFFIX}`);
         } catch (error) {
           // Yoksay
         }
         continue;
       }
-      try {
-        await fs.writeFile(absoluteFile, sanitized, 'utf-8');
-      } catch (error) {
-        console.warn('Altyazı UTF-8 olarak kaydedilemedi', absoluteFile, error.message);
+      if (sanitized !== fileContent) {
+        try {
+          await writeFileReplacing(absoluteFile, sanitized);
+        } catch (error) {
+          console.warn('Altyazı UTF-8 olarak kaydedilemedi', absoluteFile, error.message);
+        }
       }
       const rawId = slugify(`${language.code || 'und'}-${candidateBase}`) || slugify(candidateBase) || `subtitle-${subtitles.length + 1}`;
       let id = rawId;
@@ -643,25 +721,30 @@ class LibraryManager {
       missingLangs.length > 0 &&
       (!video.subtitleScriptLastAttempt || (now - new Date(video.subtitleScriptLastAttempt).getTime()) > SCRIPT_COOLDOWN_MS)
     ) {
-      for (const query of titleCandidates) {
-        try {
-          const success = await this.downloadSubtitlesWithScript({ query, baseName, relativeDir });
-          video.subtitleScriptLastAttempt = new Date().toISOString();
-          if (success) {
-            downloaded = true;
-            await this.ensureSubtitles(video, relativePath);
-            existingLangs.clear();
-            for (const item of Array.isArray(video.subtitles) ? video.subtitles : []) {
-              if (item?.lang) existingLangs.add(item.lang);
-            }
-            missingLangs = languages.filter(lang => !existingLangs.has(lang));
-            video.subtitleScriptLastSuccess = new Date().toISOString();
-            break;
+      // Tüm başlık adayları tek işte gönderilir; script bunları sırayla dener
+      try {
+        const success = await this.downloadSubtitlesWithScript({
+          queries: titleCandidates,
+          baseName,
+          relativeDir,
+          langs: missingLangs,
+          // Script altyazı zamanlamasını film süresine göre puanlar/düzeltir
+          runtime: video.runtimeMinutes || parseRuntimeMinutes(video.duration)
+        });
+        video.subtitleScriptLastAttempt = new Date().toISOString();
+        if (success) {
+          downloaded = true;
+          await this.ensureSubtitles(video, relativePath);
+          existingLangs.clear();
+          for (const item of Array.isArray(video.subtitles) ? video.subtitles : []) {
+            if (item?.lang) existingLangs.add(item.lang);
           }
-        } catch (error) {
-          console.warn('Altyazı scripti başarısız:', error.message || error);
-          video.subtitleScriptLastAttempt = new Date().toISOString();
+          missingLangs = languages.filter(lang => !existingLangs.has(lang));
+          video.subtitleScriptLastSuccess = new Date().toISOString();
         }
+      } catch (error) {
+        console.warn('Altyazı scripti başarısız:', error.message || error);
+        video.subtitleScriptLastAttempt = new Date().toISOString();
       }
     }
 
@@ -826,6 +909,7 @@ class LibraryManager {
         originalTitle: detailData.original_title || candidate.original_title || query.title,
         year: releaseYear,
         duration: runtime,
+        runtimeMinutes: detailData.runtime || null,
         description: detailData.overview || '',
         poster,
         backdrop,
@@ -844,6 +928,7 @@ class LibraryManager {
       originalTitle: metadata.originalTitle || metadata.title || video.originalTitle || video.title,
       year: metadata.year || video.year,
       duration: metadata.duration || video.duration,
+      runtimeMinutes: metadata.runtimeMinutes || video.runtimeMinutes || null,
       description: metadata.description || video.description,
       poster: metadata.poster || video.poster,
       backdrop: metadata.backdrop || video.backdrop,
@@ -912,7 +997,9 @@ class LibraryManager {
         
         // TMDB'den metadata çekildikten SONRA altyazı ara
         // (originalTitle TMDB'den geliyor ve genelde İngilizce)
-        await this.tryFetchRemoteSubtitles(video, relativePath, parsed);
+        if (ENABLE_SCAN_SUBTITLE_FETCH) {
+          await this.tryFetchRemoteSubtitles(video, relativePath, parsed);
+        }
       }
 
       this.data.videos = this.data.videos.filter(video => {
@@ -1205,13 +1292,32 @@ class LibraryManager {
     const relativeFile = relativeDir ? path.join(relativeDir, fileName) : fileName;
     const absoluteFile = path.join(MEDIA_DIR, relativeFile);
     await fs.mkdir(path.dirname(absoluteFile), { recursive: true });
-    await fs.writeFile(absoluteFile, normalized, 'utf-8');
+    await writeFileReplacing(absoluteFile, normalized);
+    const buffer = Buffer.from(normalized, 'utf-8');
+    if (isServableVtt(buffer)) {
+      await writeCueIndex(absoluteFile, buffer).catch(error => {
+        console.warn('İpucu indeksi yazılamadı', absoluteFile, error.message);
+      });
+    }
     console.log(`Altyazı kaydedildi: ${relativeFile}`);
     return true;
   }
 
-  async downloadSubtitlesWithScript({ query, baseName, relativeDir }) {
-    const scriptPath = path.join(__dirname, '..', 'scripts', 'ta_downloader.py');
+  // Aynı video ve diller için süren bir iş varsa (ör. tarama ile elle eşleştirme) onun sonucu paylaşılır;
+  // başka süreçlerle (zamanlayıcı, izleyici) eşgüdüm scriptteki kiralamalarla yapılır
+  downloadSubtitlesWithScript(options) {
+    const key = JSON.stringify([options.relativeDir || '', options.baseName, [...options.langs].sort()]);
+    const pending = this.subtitleFlights.get(key);
+    if (pending) {
+      return pending;
+    }
+    const flight = this.runSubtitleScript(options).finally(() => this.subtitleFlights.delete(key));
+    this.subtitleFlights.set(key, flight);
+    return flight;
+  }
+
+  async runSubtitleScript({ queries, baseName, relativeDir, langs, runtime }) {
+    const scriptPath = SUBTITLE_SCRIPT_PATH;
     try {
       await fs.access(scriptPath);
     } catch (error) {
@@ -1219,75 +1325,65 @@ class LibraryManager {
       return false;
     }
 
-    const tempDir = await fs.mkdtemp(path.join(os.tmpdir(), 'hv-sub-'));
     let success = false;
 
     try {
-      const args = ['-q', query, '-o', tempDir];
-      const { stdout, stderr } = await execFileAsync('python3', [scriptPath, ...args], {
-        env: process.env,
-        maxBuffer: 10 * 1024 * 1024
+      // dest: script altyazıları doğrudan <ad>.<dil>.<uzantı> olarak videonun yanına yazar
+      // (geçici dosya + rename) ve yazdıklarını manifest olarak döndürür
+      const job = { queries, langs, dest: { dir: relativeDir || '', base: baseName }, deadline: SUBTITLE_SCRIPT_DEADLINE };
+      if (runtime) {
+        job.runtime = runtime;
+      }
+      const response = await this.getScriptWorker().request(job, {
+        timeoutMs: SUBTITLE_SCRIPT_DEADLINE * 1000 + SUBTITLE_SCRIPT_GRACE_MS
       });
-
-      if (stdout) {
-        console.log(stdout.trim());
+      if (!response.ok) {
+        console.warn('Altyazı scripti hata döndürdü:', response.error);
+        return false;
       }
-      if (stderr) {
-        console.warn(stderr.trim());
+      if (response.status === 'partial') {
+        const missing = response.deadline && response.deadline.missing;
+        console.warn(`Altyazı süresi doldu (${baseName}); eksik diller: ${(missing || []).join(', ') || '-'}`);
+      } else if (response.status !== 'ok') {
+        if (response.status === 'deadline') {
+          console.warn(`Altyazı süresi doldu (${baseName}); hiçbir dil indirilemedi`);
+        }
+        return false;
       }
 
-      const languageDirs = [
-        { dir: 'turkish_subtitles', lang: 'tr' },
-        { dir: 'english_subtitles', lang: 'en' }
-      ];
-
-      for (const { dir, lang } of languageDirs) {
-        const absoluteDir = path.join(tempDir, dir);
-        let stat;
-        try {
-          stat = await fs.stat(absoluteDir);
-        } catch (error) {
-          continue;
-        }
-        if (!stat.isDirectory()) {
-          continue;
-        }
-        const entries = await fs.readdir(absoluteDir).catch(() => []);
-        for (const entry of entries) {
-          const entryPath = path.join(absoluteDir, entry);
-          const entryStat = await fs.stat(entryPath).catch(() => null);
-          if (!entryStat || !entryStat.isFile()) {
-            continue;
-          }
-          try {
-            const buffer = await fs.readFile(entryPath);
-            const decoded = decodeBufferToUtf8(buffer);
-            const ext = entry.toLowerCase().endsWith('.vtt') ? 'vtt' : 'srt';
-            const stored = await this.storeSubtitleContent({
-              rawContent: decoded,
-              format: ext,
-              lang,
-              baseName,
-              relativeDir,
-              origin: `script:${query}:${lang}:${entry}`
-            });
-            if (stored) {
-              success = true;
-            }
-          } catch (error) {
-            console.warn('Script altyazısı kaydedilemedi:', error.message || error);
-          }
-        }
+      for (const entry of Array.isArray(response.manifest) ? response.manifest : []) {
+        console.log(`Altyazı kaydedildi: ${entry.path} (${entry.lang}, altid ${entry.altid || '-'}, ${entry.size} bayt)`);
+        success = true;
       }
     } catch (error) {
       console.warn('Altyazı scripti çalıştırılamadı:', error.message || error);
-    } finally {
-      await fs.rm(tempDir, { recursive: true, force: true }).catch(() => {});
     }
 
     return success;
   }
 
+  // Dışarıdan (ör. scripts/subtitle_watcher.py) yanına altyazı eklenen tek videonun listesini yeniler
+  async refreshSubtitles(fileName, { attempted = false, succeeded = false } = {}) {
+    await this.load();
+    const normalized = String(fileName || '').split(path.sep).join('/');
+    const video = this.data.videos.find(item => String(item.fileName || '').split(path.sep).join('/') === normalized);
+    if (!video) {
+      return null;
+    }
+    if (attempted) {
+      // Python zamanlayıcı/izleyici damgaları buradan yazar; videos.json'ı kendileri yeniden yazsalar
+      // sunucunun kaydetmediği değişiklikleri ezebilirlerdi
+      const now = new Date().toISOString();
+      video.subtitleScriptLastAttempt = now;
+      if (succeeded) {
+        video.subtitleScriptLastSuccess = now;
+      }
+    }
+    await this.ensureSubtitles(video, video.fileName);
+    await this.save();
+    return video;
+  }
+
   async getSubtitleEntry(videoId, trackId) {
     await this.load();
     const video = this.data.videos.find(item => item.id === videoId);
@@ -1307,16 +1403,19 @@ class LibraryManager {
     if (!entry) {
       return null;
     }
-    let raw;
+    let buffer;
     try {
-      const buffer = await fs.readFile(entry.absolute);
-      raw = decodeBufferToUtf8(buffer);
+      buffer = await fs.readFile(entry.absolute);
     } catch (error) {
       if (error.code === 'ENOENT') {
         return null;
       }
       throw error;
     }
+    if (entry.track.format !== 'srt' && isServableVtt(buffer)) {
+      return { ...entry, body: buffer };
+    }
+    const raw = decodeBufferToUtf8(buffer);
     const body = normalizeSubtitleToVtt(raw, entry.track.format === 'srt' ? 'srt' : 'vtt', `stream:${entry.track.file}`);
     if (!body) {
       return null;
@@ -1324,6 +1423,36 @@ class LibraryManager {
     return { ...entry, body };
   }
 
+  // Yalnızca [startMs, endMs) aralığındaki ipuçları; sidecar kullanılamıyorsa null (tüm dosya gönderilir)
+  async getSubtitleWindow(videoId, trackId, startMs, endMs) {
+    const entry = await this.getSubtitleEntry(videoId, trackId);
+    if (!entry || entry.track.format === 'srt') {
+      return null;
+    }
+    let index = await loadCueIndex(entry.absolute);
+    if (!index) {
+      // Sidecar'ı olmayan ya da sonradan değişmiş dosya: bir kez okunup indekslenir
+      let buffer;
+      try {
+        buffer = await fs.readFile(entry.absolute);
+      } catch (error) {
+        if (error.code === 'ENOENT') {
+          return null;
+        }
+        throw error;
+      }
+      if (!isServableVtt(buffer)) {
+        return null;
+      }
+      index = await writeCueIndex(entry.absolute, buffer);
+      if (!index) {
+        return null;
+      }
+    }
+    const window = await readCueWindow(entry.absolute, startMs, endMs, index);
+    return window ? { ...entry, ...window } : null;
+  }
+
   async renameVideo(id, newTitle) {
     await this.load();
     const video = this.data.videos.find(item => item.id === id);
@@ -1466,6 +1595,8 @@ class LibraryManager {
       
       try {
         await fs.rename(oldSubPath, newSubPath);
+        // rename inode'u korur; ipucu indeksi yeni adla geçerli kalır
+        await fs.rename(`${oldSubPath}${CUE_INDEX_SUFFIX}`, `${newSubPath}${CUE_INDEX_SUFFIX}`).catch(() => {});
         console.log(`  ✓ Altyazı yeniden adlandırıldı: ${entry.name} -> ${newSubFileName}`);
       } catch (error) {
         console.warn(`  ⚠ Altyazı yeniden adlandırılamadı: ${entry.name} (${error.message})`);
@@ -1501,5 +1632,6 @@ class LibraryManager {
 module.exports = {
   LibraryManager,
   parseFileName,
-  formatRuntime
+  formatRuntime,
+  parseRuntimeMinutes
 };
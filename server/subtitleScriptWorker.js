@@ -0,0 +1,124 @@
+const { spawn } = require('child_process');
+const readline = require('readline');
+
+const DEFAULT_JOB_TIMEOUT_MS = 5 * 60 * 1000; // 5 dakika
+
+class SubtitleScriptWorker {
+  constructor({ scriptPath, pythonBinary, args = [] } = {}) {
+    if (!scriptPath) {
+      throw new Error('scriptPath parametresi zorunludur');
+    }
+    this.scriptPath = scriptPath;
+    this.binary = pythonBinary || process.env.PYTHON_BINARY || 'python3';
+    this.args = args;
+    this.process = null;
+    this.readyPromise = null;
+    this.pending = new Map();
+    this.nextId = 1;
+    // Script işleri sırayla yürütür; zamanlayıcı iş sıraya girdiğinde değil gönderildiğinde başlasın
+    this.queue = Promise.resolve();
+  }
+
+  start() {
+    if (this.readyPromise) {
+      return this.readyPromise;
+    }
+
+    const child = spawn(this.binary, [this.scriptPath, '--serve', ...this.args], {
+      env: process.env,
+      stdio: ['pipe', 'pipe', 'pipe']
+    });
+    this.process = child;
+
+    this.readyPromise = new Promise((resolve, reject) => {
+      const lines = readline.createInterface({ input: child.stdout });
+      lines.on('line', line => {
+        let message;
+        try {
+          message = JSON.parse(line);
+        } catch (error) {
+          console.warn(`[ta_downloader] Geçersiz yanıt: ${line}`);
+          return;
+        }
+        if (message.event === 'ready') {
+          resolve();
+          return;
+        }
+        const entry = this.pending.get(message.id);
+        if (!entry) {
+          return;
+        }
+        this.pending.delete(message.id);
+        clearTimeout(entry.timer);
+        entry.resolve(message);
+      });
+
+      child.stderr.on('data', chunk => {
+        const text = chunk.toString().trim();
+        if (text) {
+          console.log(`[ta_downloader] ${text}`);
+        }
+      });
+      child.stdin.on('error', () => {
+        // İşçi kapanırken yazılan işler exit olayında reddedilir
+      });
+      child.on('error', error => {
+        reject(error);
+        this.handleExit(child, error);
+      });
+      child.on('exit', (code, signal) => {
+        const reason = signal ? `sinyal ${signal}` : `kod ${code}`;
+        const error = new Error(`Altyazı işçisi sona erdi (${reason})`);
+        reject(error);
+        this.handleExit(child, error);
+      });
+    });
+
+    return this.readyPromise;
+  }
+
+  handleExit(child, error) {
+    if (this.process !== child) {
+      return;
+    }
+    this.process = null;
+    this.readyPromise = null;
+    for (const entry of this.pending.values()) {
+      clearTimeout(entry.timer);
+      entry.reject(error);
+    }
+    this.pending.clear();
+  }
+
+  request(job, options) {
+    const run = this.queue.then(() => this.send(job, options));
+    this.queue = run.catch(() => {});
+    return run;
+  }
+
+  async send(job, { timeoutMs = DEFAULT_JOB_TIMEOUT_MS } = {}) {
+    await this.start();
+    const id = this.nextId++;
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error('Altyazı işçisi zaman aşımına uğradı'));
+        // Takılan işçiyi yeniden başlatılmak üzere kapat
+        this.stop();
+      }, timeoutMs);
+      this.pending.set(id, { resolve, reject, timer });
+      this.process.stdin.write(`${JSON.stringify({ id, ...job })}\n`);
+    });
+  }
+
+  stop() {
+    if (this.process) {
+      this.process.stdin.end();
+      this.process.kill();
+    }
+  }
+}
+
+module.exports = {
+  SubtitleScriptWorker
+};